@@ -0,0 +1,10 @@
+"""IBM HR attrition analysis as a library.
+
+Importing the package is cheap: it only loads the report section registry. Modules with heavy
+dependencies (modeling and scoring need scikit-learn, charts and chart_engine need
+matplotlib/seaborn) are imported by the sections and commands that use them.
+
+    from hr_attrition import run_report, build_report
+    python -m hr_attrition --sections attrition,compensation
+"""
+from .report import SECTIONS, build_report, format_report, run_report, write_report
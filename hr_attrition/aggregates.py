@@ -0,0 +1,192 @@
+"""Memoized aggregate layer shared by the text report and the charts.
+
+Sections 2-6 and Section 8 ask for the same crosstabs and group means many times. The cache
+computes each one once, keyed by what actually determines the result, and counts hits and
+misses so the saved recomputation is visible.
+
+The text report only talks to this interface (never to the row-level frame), so the same
+report can also be produced from ``streaming.StreamingAggregates``, which answers the same
+questions from incrementally merged chunk statistics.
+"""
+import numpy as np
+import pandas as pd
+
+from .correlation import CorrelationEngine
+from .group_stats import column_stats, describe_frame
+
+# Rows are encoded in blocks of this size so the combined-code matrix stays small on huge frames
+COUNT_BLOCK_ROWS = 1 << 20
+
+
+def _codes(series):
+    """Integer codes (-1 for missing) and the matching labels index for a column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        labels = pd.CategoricalIndex(series.cat.categories, categories=series.cat.categories,
+                                     ordered=series.cat.ordered, name=series.name)
+        return series.cat.codes.to_numpy(), labels
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, pd.Index(uniques, name=series.name)
+
+
+def count_codes(encoded, target_codes, n_target):
+    """Flat ``code x target`` counts of ``[(codes, labels), ...]`` columns: ``(counts, offsets, sizes)``.
+
+    Column i owns ``counts[offsets[i]:offsets[i] + sizes[i]]``, its ``len(labels) x n_target`` table
+    in row-major order. Rows with a missing code (-1) are left out of that column's table only.
+    """
+    sizes = np.array([len(labels) * n_target for _, labels in encoded], dtype=np.intp)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+    counts = np.zeros(int(sizes.sum()), dtype=np.int64)
+    for start in range(0, len(target_codes), COUNT_BLOCK_ROWS):
+        block = slice(start, start + COUNT_BLOCK_ROWS)
+        codes = np.column_stack([column_codes[block] for column_codes, _ in encoded]).astype(np.intp)
+        block_target = target_codes[block].astype(np.intp)[:, None]
+        valid = (codes >= 0) & (block_target >= 0)
+        combined = offsets + codes * n_target + block_target
+        counts += np.bincount(combined[valid], minlength=len(counts))
+    return counts, offsets, sizes
+
+
+def count_tables(df, columns, target='Attrition'):
+    """Build the ``column x target`` count table of every column in one vectorized pass.
+
+    Each column's codes are shifted into its own slot range of a single combined code
+    (``offset[column] + code * n_target + target_code``), so one ``np.bincount`` over the
+    code matrix produces all tables at once instead of one ``pd.crosstab`` scan per column.
+    Tables match ``pd.crosstab(df[column], df[target])``: missing values are ignored and
+    categories that never occur are dropped.
+    """
+    target_codes, target_labels = _codes(df[target])
+    n_target = len(target_labels)
+    encoded = [_codes(df[column]) for column in columns]
+    counts, offsets, sizes = count_codes(encoded, target_codes, n_target)
+
+    tables = {}
+    for column, (_, labels), offset, size in zip(columns, encoded, offsets, sizes):
+        table = pd.DataFrame(counts[offset:offset + size].reshape(len(labels), n_target),
+                             index=labels, columns=target_labels)
+        tables[column] = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+    return tables
+
+
+def normalize_table(table, normalize):
+    """Normalize a count table the way ``pd.crosstab(..., normalize=normalize)`` does."""
+    if normalize is False:
+        return table
+    if normalize == 'index':
+        return table.div(table.sum(axis=1), axis=0)
+    if normalize == 'columns':
+        return table.div(table.sum(axis=0), axis=1)
+    return table / table.to_numpy().sum()
+
+
+class AggregateCache:
+    """Aggregates computed from an in-memory cleaned frame.
+
+    ``quantiles='approximate'`` reads the quartiles of the describe tables from grid histograms
+    instead of sorting (see group_stats.py); counts, means and standard deviations stay exact.
+    """
+
+    def __init__(self, df, dimensions=(), target='Attrition', corr_dtype=np.float64, quantiles='exact'):
+        self.df = df
+        self.quantiles = quantiles
+        # Computes nothing until a correlation is asked for; every later pair reads the same matrix
+        self.correlations = CorrelationEngine(df, dtype=corr_dtype)
+        self._store = {}
+        self.hits = 0
+        self.misses = 0
+        if dimensions:
+            self.precompute_counts(dimensions, target)
+
+    def precompute_counts(self, columns, target='Attrition'):
+        """Fill the cache with the count tables of all ``columns`` from a single scan."""
+        pending = [column for column in columns if ('counts', column, target) not in self._store]
+        if pending:
+            for column, table in count_tables(self.df, pending, target).items():
+                self._store[('counts', column, target)] = table
+            self.misses += len(pending)
+
+    def _get(self, key, compute):
+        if key in self._store:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._store[key] = compute()
+        return self._store[key]
+
+    def counts(self, column, target='Attrition'):
+        """``pd.crosstab(df[column], df[target])`` counts, read from the single-pass tables."""
+        return self._get(('counts', column, target),
+                         lambda: count_tables(self.df, [column], target)[column])
+
+    def crosstab(self, column, target='Attrition', normalize='index'):
+        """``pd.crosstab(df[column], df[target], normalize=normalize)``, computed once.
+
+        The returned frame is shared between callers and must not be modified in place.
+        """
+        return self._get(('crosstab', column, target, normalize),
+                         lambda: normalize_table(self.counts(column, target), normalize))
+
+    def rate_table(self, column, target='Attrition'):
+        """Percentage of each ``target`` outcome within every ``column`` category (rows sum to 100).
+
+        Returns a new frame on every call, so it is safe to sort or edit in place.
+        """
+        return self.crosstab(column, target, 'index') * 100
+
+    def group_mean(self, value, by='Attrition'):
+        """Mean of ``value`` per ``by`` group (all categories kept, as ``observed=False``)."""
+        return self._get(('mean', by, value),
+                         lambda: self.df.groupby(by, observed=False)[value].mean())
+
+    @property
+    def shape(self):
+        return self.df.shape
+
+    def duplicate_count(self):
+        return self._get(('duplicates',), lambda: int(self.df.duplicated().sum()))
+
+    def missing_counts(self):
+        return self._get(('missing',), lambda: self.df.isnull().sum())
+
+    def describe(self, column=None):
+        """``df.describe()`` of all numeric columns, or ``df[column].describe()``."""
+        if column is None:
+            return self._get(('describe', None), lambda: describe_frame(self.df, self.quantiles))
+        return self._get(('describe', column), lambda: self._describe_column(column))
+
+    def _describe_column(self, column):
+        if not pd.api.types.is_numeric_dtype(self.df[column]):
+            return self.df[column].describe()
+        if ('describe', None) in self._store:
+            # Already part of the table of every numeric column
+            return self._store[('describe', None)][column]
+        return describe_frame(self.df[[column]], self.quantiles)[column]
+
+    def _column_stats(self, value):
+        """The column sorted (or histogrammed) once, shared by every grouping it is described by."""
+        return self._get(('column_stats', value), lambda: column_stats(self.df[value], self.quantiles))
+
+    def value_counts(self, column, normalize=False):
+        return self._get(('value_counts', column, normalize),
+                         lambda: self.df[column].value_counts(normalize=normalize))
+
+    def group_describe(self, value, by):
+        """``df.groupby(by)[value].describe()`` (all categories kept, as ``observed=False``)."""
+        def compute():
+            if not pd.api.types.is_numeric_dtype(self.df[value]):
+                return self.df.groupby(by, observed=False)[value].describe()
+            return self._column_stats(value).describe_by(*_codes(self.df[by]))
+        return self._get(('group_describe', by, value), compute)
+
+    def corr(self, a, b, method='pearson'):
+        """Correlation of two columns; categorical columns are correlated by their codes."""
+        return self._get(('corr', a, b, method), lambda: self.correlations.pair(a, b, method))
+
+    def corr_matrix(self, columns=None, method='pearson'):
+        """Correlation matrix over ``columns`` (default: numeric columns and categorical codes)."""
+        key = ('corr_matrix', None if columns is None else tuple(columns), method)
+        return self._get(key, lambda: self.correlations.matrix(columns, method))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._store)}
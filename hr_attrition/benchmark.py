@@ -0,0 +1,188 @@
+"""Benchmarks of the analysis pipeline on synthetic employee files of growing size.
+
+``synthesize`` writes a CSV with the columns of WA_Fn-UseC_-HR-Employee-Attrition.csv in which
+every column is drawn independently from the empirical distribution of that column in the real
+file. Category frequencies and numeric value distributions are preserved, so the aggregates,
+crosstabs and charts do the same work as on real data (cross-column correlations are not). Files
+are generated in chunks and kept in .hr_bench/ for later runs.
+
+Each size is benchmarked in a fresh worker process, so peak memory belongs to that size alone.
+Every stage is recorded by an ``Instrumentation`` (see instrumentation.py): the CSV load, the
+Section 1 cleaning, the aggregate cache, each report section, each chart and the report write.
+The wall and CPU time of each stage and the process peak RSS so far are written to a JSON file. With ``--baseline``, every stage is compared
+with an earlier run, and stages slower (or peaks larger) than the tolerance are flagged as
+regressions; the exit status is then 1.
+
+    python -m hr_attrition.benchmark --sizes 1500,100000 --output bench.json
+    python -m hr_attrition.benchmark --sizes 1500,100000 --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import DATA_FILE, ID_COLUMN, clean, read_options
+from .instrumentation import Instrumentation, peak_rss
+
+DEFAULT_SIZES = [1_500, 100_000, 1_000_000, 10_000_000]
+DEFAULT_DATA_DIR = '.hr_bench'
+DEFAULT_OUTPUT = 'benchmark_results.json'
+GENERATE_CHUNKSIZE = 1_000_000
+# A stage regresses when it is this much slower (fraction) than the baseline ...
+DEFAULT_TOLERANCE = 0.25
+# ... and slower by at least this many seconds, so that timer noise on tiny stages is not flagged
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def synthesize(n_rows, path, source=DATA_FILE, seed=0, chunksize=GENERATE_CHUNKSIZE):
+    """Write ``n_rows`` synthetic employees to ``path``, sampling every column from ``source``."""
+    template = pd.read_csv(source)
+    distributions = {}
+    for column in template.columns:
+        values, counts = np.unique(template[column].to_numpy(), return_counts=True)
+        distributions[column] = (values, counts / counts.sum())
+    rng = np.random.default_rng(seed)
+    partial = f"{path}.partial"
+    for start in range(0, n_rows, chunksize):
+        size = min(chunksize, n_rows - start)
+        chunk = pd.DataFrame({column: rng.choice(values, size=size, p=probabilities)
+                              for column, (values, probabilities) in distributions.items()})
+        chunk[ID_COLUMN] = np.arange(start + 1, start + size + 1)
+        chunk.to_csv(partial, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    os.replace(partial, path)  # An interrupted run never leaves a truncated file behind
+    return path
+
+
+def synthetic_file(n_rows, data_dir=DEFAULT_DATA_DIR, seed=0):
+    """Path of the synthetic file of ``n_rows`` rows, generated on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"employees_{n_rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        synthesize(n_rows, path, seed=seed)
+    return path
+
+
+def run_pipeline(path, output_dir, models=False, charts=True):
+    """Run every pipeline stage on the CSV at ``path`` and return its stage timings.
+
+    The stages are recorded by an ``Instrumentation``; the sections and charts are the report's
+    own, run through ``report.run_report`` and ``chart_engine.render_charts``.
+    """
+    import seaborn as sns
+
+    from .aggregates import AggregateCache
+    from .chart_engine import render_charts
+    from .report import attrition_dimensions, build_report, report_file, run_report
+
+    sns.set_style("whitegrid")
+    instrumentation = Instrumentation()
+    with instrumentation.stage('csv_load') as stage:
+        raw = pd.read_csv(path, **read_options(path))
+        stage['rows'] = len(raw)
+    with instrumentation.stage('cleaning', rows=len(raw)):
+        df = clean(raw)
+    del raw
+    with instrumentation.stage('aggregates', rows=len(df)):
+        agg = AggregateCache(df, dimensions=attrition_dimensions)
+
+    # The sweep parallelises on its own; one worker keeps the timings comparable across machines
+    results = run_report(df, agg, model_workers=1, train_models=models, instrumentation=instrumentation)
+    os.makedirs(output_dir, exist_ok=True)
+    if charts:
+        render_charts(results['visualizations']['charts'], output_dir, max_workers=1, instrumentation=instrumentation)
+    with instrumentation.stage('report_write'):
+        build_report(results).write(os.path.join(output_dir, report_file()))
+    stages = {record['name']: {'seconds': record['wall_seconds'], 'cpu_seconds': record['cpu_seconds'],
+                               'peak_rss': record['peak_rss']}
+              for record in sorted(instrumentation.records, key=lambda record: record['start_ns'])}
+    return {'rows': len(df), 'stages': stages, 'peak_rss': peak_rss()}
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, data_dir=DEFAULT_DATA_DIR, seed=0, models=False, charts=True):
+    """Benchmark every size in its own process; returns the JSON-ready results."""
+    results = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+               'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                               'numpy': np.__version__, 'platform': platform.platform(),
+                               'cpus': os.cpu_count()},
+               'options': {'seed': seed, 'models': models, 'charts': charts},
+               'sizes': {}}
+    for n_rows in sizes:
+        # The file is generated here, and each size runs in a fresh process, so the peak RSS of a
+        # size covers neither the generator nor the previous size
+        path = synthetic_file(n_rows, data_dir, seed)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results['sizes'][str(n_rows)] = pool.submit(run_pipeline, path, os.path.join(data_dir, f"output_{n_rows}"),
+                                                        models=models, charts=charts).result()
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_seconds=MIN_REGRESSION_SECONDS):
+    """Stages of ``results`` that regressed against ``baseline``, as a list of dicts.
+
+    Only sizes and stages present in both runs are compared. A stage regresses when its time
+    grows by more than ``tolerance`` (and ``min_seconds``), or its peak RSS by more than ``tolerance``.
+    """
+    regressions = []
+    for size, run in results['sizes'].items():
+        base_run = baseline['sizes'].get(size)
+        if base_run is None:
+            continue
+        for stage, timing in run['stages'].items():
+            base = base_run['stages'].get(stage)
+            if base is None:
+                continue
+            if (timing['seconds'] > base['seconds'] * (1 + tolerance)
+                    and timing['seconds'] - base['seconds'] >= min_seconds):
+                regressions.append({'size': size, 'stage': stage, 'metric': 'seconds',
+                                    'baseline': base['seconds'], 'current': timing['seconds']})
+        if run['peak_rss'] > base_run['peak_rss'] * (1 + tolerance):
+            regressions.append({'size': size, 'stage': 'total', 'metric': 'peak_rss',
+                                'baseline': base_run['peak_rss'], 'current': run['peak_rss']})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated row counts (default: %(default)s)')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='synthetic files and outputs (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the synthetic files (default: %(default)s)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='results JSON (default: %(default)s)')
+    parser.add_argument('--baseline', help='earlier results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown as a fraction of the baseline (default: %(default)s)')
+    parser.add_argument('--models', action='store_true', help='include the Section 7 model sweep (slow on large sizes)')
+    parser.add_argument('--skip-charts', action='store_true', help='leave out chart rendering')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = run_benchmarks(sizes, args.data_dir, args.seed, models=args.models, charts=not args.skip_charts)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for size, run in results['sizes'].items():
+        total = sum(timing['seconds'] for timing in run['stages'].values())
+        slowest = sorted(run['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True)[:3]
+        print(f"{int(size):>10,} rows: {total:8.2f} s, peak RSS {run['peak_rss'] / 2**20:8.1f} MB; slowest: "
+              + ', '.join(f"{stage} {timing['seconds']:.2f} s" for stage, timing in slowest))
+    print(f"Saved the results to {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {int(regression['size']):,} rows, {regression['stage']} {regression['metric']}: "
+                  f"{regression['baseline']:.3f} -> {regression['current']:.3f}")
+        print(f"{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}).")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
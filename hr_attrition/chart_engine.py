@@ -0,0 +1,260 @@
+"""Declarative chart specs and a parallel renderer for the Section 8 visualizations.
+
+Each chart is described by a ChartSpec holding the (already aggregated) data it plots plus
+its styling. Specs are plain picklable objects, so they can be rendered in worker processes
+with the Agg backend, or serially in the current process for comparison/debugging.
+
+Because a spec holds everything that determines its image, rendered charts are cached by
+content: ``chart_digest`` hashes the spec (data and styling, not the file name) together with
+``CHART_CACHE_VERSION`` and the matplotlib/seaborn/pandas versions, and ``render_charts(...,
+cache_dir=...)`` copies the PNG of an unchanged chart from ``<cache_dir>/<digest>.png`` instead of
+drawing it again. Only charts whose input aggregate or styling changed are rendered.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+
+import matplotlib
+matplotlib.use('Agg')  # Headless backend, safe to use from worker processes
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .instrumentation import current_rss
+
+CHART_CACHE_DIR = os.path.join('.hr_cache', 'charts')
+# Bump whenever a renderer changes what it draws, so PNGs cached with the old look are not reused
+CHART_CACHE_VERSION = 1
+
+
+@dataclass
+class ChartSpec:
+    filename: str
+    kind: str  # One of RENDERERS: 'bar', 'pie', 'hist', 'box', 'stacked_bar', 'heatmap', 'step'
+    data: object  # Source aggregate (crosstab / counts / series / frame) to plot
+    title: str
+    xlabel: str = None
+    ylabel: str = None
+    figsize: tuple = (10, 6)
+    palette: object = None
+    color: object = None
+    xtick_rotation: int = None
+    xtick_ha: str = None
+    tight_layout: bool = False
+    options: dict = field(default_factory=dict)  # Extra kind-specific keyword arguments
+
+
+def _bar(ax, spec):
+    # Attrition-rate bar chart from a crosstab normalized by index (one bar per category)
+    data = spec.data
+    sns.barplot(x=data.index, y=data['Yes'], hue=data.index, palette=spec.palette, legend=False, ax=ax)
+
+
+def _pie(ax, spec):
+    ax.pie(spec.data, labels=spec.data.index, autopct='%1.1f%%', startangle=90, colors=spec.palette)
+
+
+def _hist(ax, spec):
+    sns.histplot(spec.data, color=spec.color, ax=ax, **spec.options)
+
+
+def _box(ax, spec):
+    x, y = spec.options['x'], spec.options['y']
+    sns.boxplot(x=x, y=y, hue=x, data=spec.data, palette=spec.palette, legend=False, ax=ax)
+
+
+def _stacked_bar(ax, spec):
+    spec.data.plot(kind='bar', stacked=True, color=spec.color, ax=ax)
+    ax.legend(title=spec.options.get('legend_title'))
+
+
+def _heatmap(ax, spec):
+    sns.heatmap(spec.data, ax=ax, **spec.options)
+
+
+def _step(ax, spec):
+    # Retention curves: one step line per column of a (duration x stratum) survival table
+    colors = spec.palette or [None] * len(spec.data.columns)
+    for column, color in zip(spec.data.columns, colors):
+        ax.step(spec.data.index, spec.data[column], where='post', color=color, label=str(column))
+    ax.legend(title=spec.options.get('legend_title'))
+
+
+RENDERERS = {
+    'bar': _bar,
+    'pie': _pie,
+    'hist': _hist,
+    'box': _box,
+    'stacked_bar': _stacked_bar,
+    'heatmap': _heatmap,
+    'step': _step,
+}
+
+
+class FigureManager:
+    """Owns the single Agg figure each process renders into.
+
+    The figure is created outside pyplot, so it is never registered in pyplot's global
+    figure list, and it is cleared and reused for every chart instead of allocating a new
+    one. Memory therefore stays flat however many charts or reports run in one process.
+    The manager records the peak number of live figures and the peak RSS it has observed.
+    """
+
+    def __init__(self):
+        self._figure = None
+        self.open_figures = 0
+        self.peak_figures = 0
+        self.peak_rss = 0
+        self.charts_rendered = 0
+
+    @contextmanager
+    def figure(self, figsize):
+        if self._figure is None:
+            self._figure = Figure()
+            FigureCanvasAgg(self._figure)
+        fig = self._figure
+        fig.set_size_inches(figsize)
+        # tight_layout() on a previous chart moves the subplot margins; restore the rc defaults
+        fig.subplots_adjust(**{key: matplotlib.rcParams[f'figure.subplot.{key}']
+                               for key in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+        self.open_figures += 1
+        self.peak_figures = max(self.peak_figures, self.open_figures + len(plt.get_fignums()))
+        try:
+            yield fig
+        finally:
+            fig.clear()
+            self.open_figures -= 1
+            self.charts_rendered += 1
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def stats(self):
+        return {'charts_rendered': self.charts_rendered, 'peak_figures': self.peak_figures,
+                'peak_rss': self.peak_rss}
+
+
+# One manager per process: the main process for serial rendering, one per pool worker otherwise
+FIGURES = FigureManager()
+
+
+def _init_worker():
+    sns.set_style("whitegrid")
+
+
+def _render_in_worker(spec, output_dir, instrumentation_options=None):
+    if instrumentation_options is None:
+        return render_chart(spec, output_dir), {'worker': os.getpid(), **FIGURES.stats()}, []
+    from .instrumentation import Instrumentation
+
+    instrumentation = Instrumentation(**instrumentation_options)
+    path = _render_instrumented(spec, output_dir, instrumentation)
+    return path, {'worker': os.getpid(), **FIGURES.stats()}, instrumentation.records
+
+
+def _render_instrumented(spec, output_dir, instrumentation):
+    with instrumentation.stage(f'chart:{spec.filename}', 'chart', rows=len(spec.data)):
+        return render_chart(spec, output_dir)
+
+
+def render_chart(spec, output_dir='.', figures=None):
+    """Render a single spec to ``output_dir/spec.filename`` and return the written path."""
+    with (figures or FIGURES).figure(spec.figsize) as fig:
+        _draw(fig, spec)
+        path = os.path.join(output_dir, spec.filename)
+        fig.savefig(path)
+    return path
+
+
+def _draw(fig, spec):
+    ax = fig.add_subplot()
+    RENDERERS[spec.kind](ax, spec)
+    ax.set_title(spec.title, fontsize=16)
+    if spec.xlabel is not None:
+        ax.set_xlabel(spec.xlabel, fontsize=12)
+    if spec.ylabel is not None:
+        ax.set_ylabel(spec.ylabel, fontsize=12)
+    if spec.xtick_rotation is not None:
+        for label in ax.get_xticklabels():
+            label.set_rotation(spec.xtick_rotation)
+            if spec.xtick_ha is not None:
+                label.set_horizontalalignment(spec.xtick_ha)
+    if spec.tight_layout:
+        fig.tight_layout()
+
+
+def chart_digest(spec):
+    """SHA-256 of everything that determines a rendered chart: its data and styling, and the plotting code."""
+    # pandas draws the stacked bars itself (DataFrame.plot), so its version matters too
+    digest = hashlib.sha256(f"{CHART_CACHE_VERSION}:{matplotlib.__version__}:{sns.__version__}:{pd.__version__}".encode())
+    # The file name is where the chart goes, not what it shows; identical charts share one entry
+    digest.update(pickle.dumps(replace(spec, filename=os.path.splitext(spec.filename)[1]),
+                               protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def _cached_file(spec, digest, cache_dir):
+    return os.path.join(cache_dir, digest + os.path.splitext(spec.filename)[1])
+
+
+def render_charts(specs, output_dir='.', max_workers=None, instrumentation=None, cache_dir=None):
+    """Render all specs, fanning out to a process pool unless ``max_workers == 1``.
+
+    ``max_workers=None`` uses every core. The serial path goes through exactly the same
+    ``render_chart`` code, so both modes write identical files. Returns a summary dict with
+    the written paths and the figure/RSS high-water marks across all rendering processes.
+    With an ``Instrumentation``, every chart is recorded as a stage (in the worker that drew it).
+
+    With ``cache_dir``, charts whose ``chart_digest`` is already cached are copied from the cache
+    instead of rendered, and newly rendered charts are added to it; the summary then counts
+    ``cache_hits`` and ``cache_misses`` (``charts_rendered`` only counts the misses).
+    """
+    specs = list(specs)
+    if cache_dir is None:
+        return _render_all(specs, output_dir, max_workers, instrumentation)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cached = {spec.filename: _cached_file(spec, chart_digest(spec), cache_dir) for spec in specs}
+    paths = {}
+    for spec in specs:
+        if os.path.exists(cached[spec.filename]):
+            paths[spec.filename] = shutil.copyfile(cached[spec.filename], os.path.join(output_dir, spec.filename))
+    stale = [spec for spec in specs if spec.filename not in paths]
+    summary = _render_all(stale, output_dir, max_workers, instrumentation)
+    for spec, path in zip(stale, summary['paths']):
+        # Copied in under a temporary name, so a concurrent run never reads a half-written entry
+        partial = f"{cached[spec.filename]}.{os.getpid()}.partial"
+        shutil.copyfile(path, partial)
+        os.replace(partial, cached[spec.filename])
+        paths[spec.filename] = path
+    return {**summary, 'paths': [paths[spec.filename] for spec in specs],
+            'cache_hits': len(specs) - len(stale), 'cache_misses': len(stale)}
+
+
+def _render_all(specs, output_dir, max_workers, instrumentation):
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(specs) <= 1:
+        _init_worker()
+        if instrumentation is None:
+            paths = [render_chart(spec, output_dir) for spec in specs]
+        else:
+            paths = [_render_instrumented(spec, output_dir, instrumentation) for spec in specs]
+        return {'paths': paths, 'charts_rendered': len(paths),
+                'peak_figures': FIGURES.peak_figures, 'peak_rss': FIGURES.peak_rss}
+
+    options = None if instrumentation is None else instrumentation.options()
+    with ProcessPoolExecutor(max_workers=min(workers, len(specs)), initializer=_init_worker) as pool:
+        results = list(pool.map(_render_in_worker, specs, [output_dir] * len(specs), [options] * len(specs)))
+    if instrumentation is not None:
+        for _, _, records in results:
+            instrumentation.merge(records)
+    # Each worker reports cumulative stats, so keep the latest snapshot per worker
+    worker_stats = {stats['worker']: stats for _, stats, _ in results}
+    return {'paths': [path for path, _, _ in results],
+            'charts_rendered': len(results),
+            'peak_figures': max(stats['peak_figures'] for stats in worker_stats.values()),
+            'peak_rss': max(stats['peak_rss'] for stats in worker_stats.values())}
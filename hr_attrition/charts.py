@@ -0,0 +1,192 @@
+"""The Section 8 charts of the report as ChartSpecs.
+
+Kept apart from report.py so that matplotlib and seaborn are only imported when the
+visualizations section is requested; rendering itself is done by chart_engine.render_charts.
+"""
+import pandas as pd
+import numpy as np
+import seaborn as sns
+
+from .aggregates import AggregateCache
+from .chart_engine import ChartSpec
+from .cleaning import TARGET, years_at_company_group
+from .report import attrition_rates
+from .survival import kaplan_meier, survival_table
+
+# Tenure bands of the Section 8 bar charts, derived by tenure_groups()
+TENURE_GROUP_COLUMNS = ['YearsAtCompanyGroup', 'YearsSincePromotionGroup', 'YearsWithManagerGroup']
+
+
+def tenure_groups(df):
+    """The tenure band columns of the charts and Attrition, as a new frame (``df`` is left as it is)."""
+    return pd.DataFrame({
+        'YearsAtCompanyGroup': years_at_company_group(df['YearsAtCompany']),
+        'YearsSincePromotionGroup': pd.cut(df['YearsSinceLastPromotion'], bins=[0, 1, 2, 5, np.inf],
+                                           labels=['0', '1', '2-4', '5+'], right=False),
+        'YearsWithManagerGroup': pd.cut(df['YearsWithCurrManager'], bins=[0, 1, 2, 5, np.inf],
+                                        labels=['<1', '1', '2-4', '5+'], right=False),
+        TARGET: df[TARGET],
+    }, index=df.index)
+
+
+def build_chart_specs(df, agg, tenure_agg=None):
+    """The Section 8 charts of the cleaned frame ``df`` as ChartSpecs, ready for ``render_charts``.
+
+    ``agg`` answers the count tables of the report dimensions (an AggregateCache over ``df``, or
+    the incremental aggregates) and ``tenure_agg`` those of ``TENURE_GROUP_COLUMNS`` (default: an
+    AggregateCache over ``tenure_groups(df)``).
+    """
+    if tenure_agg is None:
+        tenure_agg = AggregateCache(tenure_groups(df), dimensions=TENURE_GROUP_COLUMNS)
+    chart_specs = []
+    custom_palette = sns.color_palette("rocket") # Define a custom color palette for consistent styling
+
+    # Overall Attrition Pie Chart
+    attrition_counts = agg.value_counts('Attrition')
+    chart_specs.append(ChartSpec('overall_attrition_pie_chart.png', 'pie', attrition_counts,
+                                 'Overall Employee Attrition Rate (16.12% Turnover)', figsize=(8, 8), palette=custom_palette))
+
+    # Bar charts: Attrition by Department
+    dept_attrition_plot = attrition_rates(agg, 'Department')
+    dept_attrition_plot.sort_values(by='Yes', ascending=False, inplace=True)
+    chart_specs.append(ChartSpec('attrition_by_department_bar_chart.png', 'bar', dept_attrition_plot,
+                                 'Attrition Rate by Department: Sales & HR Departments Lead Turnover',
+                                 'Department', 'Attrition Rate (%)', figsize=(12, 7), xtick_rotation=45))
+
+    # Bar charts: Attrition by JobRole
+    job_role_attrition_plot = attrition_rates(agg, 'JobRole')
+    job_role_attrition_plot.sort_values(by='Yes', ascending=False, inplace=True)
+    chart_specs.append(ChartSpec('attrition_by_jobrole_bar_chart.png', 'bar', job_role_attrition_plot,
+                                 'Attrition Rate by Job Role: Sales Representatives Most Vulnerable',
+                                 'Job Role', 'Attrition Rate (%)', figsize=(15, 8), palette='viridis',
+                                 xtick_rotation=45, xtick_ha='right', tight_layout=True))
+
+    # Bar charts: Attrition by Gender
+    gender_attrition_plot = attrition_rates(agg, 'Gender')
+    chart_specs.append(ChartSpec('attrition_by_gender_bar_chart.png', 'bar', gender_attrition_plot,
+                                 'Attrition Rate by Gender: Slightly Higher for Males',
+                                 'Gender', 'Attrition Rate (%)', figsize=(8, 6)))
+
+    # Bar chart: Attrition by Overtime
+    overtime_attrition_plot = attrition_rates(agg, 'OverTime')
+    chart_specs.append(ChartSpec('attrition_by_overtime_bar_chart.png', 'bar', overtime_attrition_plot,
+                                 'Overtime Impact on Attrition: Significant Turnover Among Overtime Workers',
+                                 'Overtime', 'Attrition Rate (%)', figsize=(8, 6),
+                                 palette=custom_palette[:len(overtime_attrition_plot)]))  # One color per bar
+
+    # Bar charts: Attrition by BusinessTravel
+    travel_attrition_plot = attrition_rates(agg, 'BusinessTravel')
+    travel_attrition_plot.sort_values(by='Yes', ascending=False, inplace=True)
+    chart_specs.append(ChartSpec('attrition_by_businesstravel_bar_chart.png', 'bar', travel_attrition_plot,
+                                 'Attrition Rate by Business Travel Frequency: Frequent Travelers at Risk',
+                                 'Business Travel', 'Attrition Rate (%)'))
+
+    # Bar chart: Attrition by StockOptionLevel
+    stock_option_attrition_plot = attrition_rates(agg, 'StockOptionLevel')
+    chart_specs.append(ChartSpec('attrition_by_stock_option_level_bar_chart.png', 'bar', stock_option_attrition_plot,
+                                 'Attrition Rate by Stock Option Level: Higher Turnover with No Stock Options',
+                                 'Stock Option Level', 'Attrition Rate (%)', palette='coolwarm', xtick_rotation=0))
+
+    # Bar chart: Attrition by YearsAtCompany
+    yac_attrition_plot = attrition_rates(tenure_agg, 'YearsAtCompanyGroup')
+    chart_specs.append(ChartSpec('attrition_by_years_at_company_bar_chart.png', 'bar', yac_attrition_plot,
+                                 'Attrition Rate by Years at Company: Higher Turnover in Early Tenure',
+                                 'Years at Company Group', 'Attrition Rate (%)', figsize=(12, 7), palette='magma'))
+
+    # Retention curves: Kaplan-Meier share of employees still with the company after each year of tenure
+    retention_plot = survival_table(kaplan_meier(df, strata=['OverTime'])['curves'])
+    chart_specs.append(ChartSpec('retention_curve_by_overtime.png', 'step', retention_plot,
+                                 'Retention by Years at Company: Overtime Workers Leave Sooner',
+                                 'Years at Company', 'Share of Employees Retained', figsize=(12, 7),
+                                 palette=[custom_palette[1], custom_palette[4]], options={'legend_title': 'OverTime'}))
+
+    # Bar chart: Attrition by YearsSinceLastPromotion
+    ysl_attrition_plot = attrition_rates(tenure_agg, 'YearsSincePromotionGroup')
+    chart_specs.append(ChartSpec('attrition_by_years_since_promotion_bar_chart.png', 'bar', ysl_attrition_plot,
+                                 'Attrition Rate by Years Since Last Promotion: Stagnation Drives Turnover',
+                                 'Years Since Last Promotion Group', 'Attrition Rate (%)', figsize=(12, 7), palette='cividis'))
+
+    # Bar chart: Attrition by YearsWithCurrManager
+    ywcm_attrition_plot = attrition_rates(tenure_agg, 'YearsWithManagerGroup')
+    chart_specs.append(ChartSpec('attrition_by_years_with_manager_bar_chart.png', 'bar', ywcm_attrition_plot,
+                                 'Attrition Rate by Years With Current Manager: Manager Relationships Impact Retention',
+                                 'Years With Current Manager Group', 'Attrition Rate (%)', figsize=(12, 7), palette='plasma'))
+
+    # Bar chart: Attrition by EnvironmentSatisfaction
+    env_sat_attrition_plot = attrition_rates(agg, 'EnvironmentSatisfaction')
+    chart_specs.append(ChartSpec('attrition_by_environment_satisfaction_bar_chart.png', 'bar', env_sat_attrition_plot,
+                                 'Attrition Rate by Environment Satisfaction: Lower Satisfaction, Higher Turnover',
+                                 'Environment Satisfaction', 'Attrition Rate (%)', palette='viridis', xtick_rotation=0))
+
+    # Bar chart: Attrition by RelationshipSatisfaction
+    rel_sat_attrition_plot = attrition_rates(agg, 'RelationshipSatisfaction')
+    chart_specs.append(ChartSpec('attrition_by_relationship_satisfaction_bar_chart.png', 'bar', rel_sat_attrition_plot,
+                                 'Attrition Rate by Relationship Satisfaction: Relationships Drive Retention',
+                                 'Relationship Satisfaction', 'Attrition Rate (%)', palette='magma', xtick_rotation=0))
+
+    # Bar chart: Attrition by WorkLifeBalance
+    wlb_attrition_plot = attrition_rates(agg, 'WorkLifeBalance')
+    chart_specs.append(ChartSpec('attrition_by_work_life_balance_bar_chart.png', 'bar', wlb_attrition_plot,
+                                 'Attrition Rate by Work-Life Balance: Poor Balance, Higher Turnover',
+                                 'Work-Life Balance', 'Attrition Rate (%)', palette='rocket', xtick_rotation=0))
+
+    # Bar chart: Attrition by JobInvolvement
+    job_involvement_attrition_plot = attrition_rates(agg, 'JobInvolvement')
+    chart_specs.append(ChartSpec('attrition_by_job_involvement_bar_chart.png', 'bar', job_involvement_attrition_plot,
+                                 'Attrition Rate by Job Involvement: Disengagement Leads to Turnover',
+                                 'Job Involvement', 'Attrition Rate (%)', palette='cividis', xtick_rotation=0))
+
+
+    # Boxplots: MonthlyIncome vs JobLevel
+    chart_specs.append(ChartSpec('monthly_income_by_job_level_boxplot.png', 'box', df[['JobLevel', 'MonthlyIncome']],
+                                 'Monthly Income Distribution by Job Level: Clear Compensation Progression',
+                                 'Job Level', 'Monthly Income', figsize=(12, 7), palette='GnBu',
+                                 options={'x': 'JobLevel', 'y': 'MonthlyIncome'}))
+
+    # Histograms: Age Distribution
+    chart_specs.append(ChartSpec('age_distribution_histogram.png', 'hist', df['Age'],
+                                 'Age Distribution of Employees: Workforce Concentrated in Mid-Career',
+                                 'Age', 'Count', color=custom_palette[0], options={'bins': 15, 'kde': True}))
+
+    # Bar chart: Attrition by Age Group
+    age_group_attrition_plot = attrition_rates(agg, 'AgeGroup')
+    chart_specs.append(ChartSpec('attrition_by_age_group_bar_chart.png', 'bar', age_group_attrition_plot,
+                                 'Attrition Rate by Age Group: Youngest Employees Show Highest Turnover',
+                                 'Age Group', 'Attrition Rate (%)', palette='viridis', xtick_rotation=0))
+
+    # Histograms: MonthlyIncome Distribution
+    chart_specs.append(ChartSpec('monthly_income_distribution_histogram.png', 'hist', df['MonthlyIncome'],
+                                 'Monthly Income Distribution: Diverse Range Across Employees',
+                                 'Monthly Income', 'Count', color=custom_palette[1], options={'bins': 20, 'kde': True}))
+
+    # Histograms: DistanceFromHome Distribution
+    chart_specs.append(ChartSpec('distance_from_home_distribution_histogram.png', 'hist', df['DistanceFromHome'],
+                                 'Distance From Home Distribution: Employees Spread Across Commute Distances',
+                                 'Distance From Home', 'Count', color=custom_palette[2], options={'bins': 10, 'kde': True}))
+
+    # Histograms: TotalWorkingYears Distribution
+    chart_specs.append(ChartSpec('total_working_years_distribution_histogram.png', 'hist', df['TotalWorkingYears'],
+                                 'Total Working Years Distribution: Majority with Moderate Experience',
+                                 'Total Working Years', 'Count', color=custom_palette[3], options={'bins': 10, 'kde': True}))
+
+    # Boxplots: Distance From Home vs Attrition
+    chart_specs.append(ChartSpec('distance_from_home_vs_attrition_boxplot.png', 'box', df[['Attrition', 'DistanceFromHome']],
+                                 'Distance From Home vs Attrition: Longer Commutes Correlate with Turnover',
+                                 'Attrition', 'Distance From Home', options={'x': 'Attrition', 'y': 'DistanceFromHome'}))
+
+    # Stacked bar: Satisfaction scores vs Attrition (Job Satisfaction is already included here)
+    satisfaction_crosstab_plot = agg.crosstab('JobSatisfaction')
+    chart_specs.append(ChartSpec('job_satisfaction_vs_attrition_stacked_bar.png', 'stacked_bar', satisfaction_crosstab_plot,
+                                 'Job Satisfaction Level vs Attrition: Lower Satisfaction, Higher Turnover',
+                                 'Job Satisfaction Level', 'Proportion', xtick_rotation=0,
+                                 color=[custom_palette[0], custom_palette[5]], # Use two distinct colors from palette
+                                 options={'legend_title': 'Attrition'}))
+
+    # Heatmap: Correlation of numeric features (MonthlyIncome, Age, YearsAtCompany, etc.).
+    numeric_columns = list(df.select_dtypes(include=np.number).columns)
+    chart_specs.append(ChartSpec('correlation_matrix_heatmap.png', 'heatmap', agg.corr_matrix(numeric_columns),
+                                 'Correlation Matrix of Numeric Features: Relationships Within Our Data',
+                                 figsize=(14, 12), tight_layout=True,
+                                 options={'annot': True, 'cmap': 'coolwarm', 'fmt': '.2f'}))
+
+    return chart_specs
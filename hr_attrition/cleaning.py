@@ -0,0 +1,156 @@
+"""Section 1 cleaning of the IBM HR employee extract, shared by the full and streaming runs."""
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, is_integer_dtype
+
+DATA_FILE = 'WA_Fn-UseC_-HR-Employee-Attrition.csv'
+
+# Bump whenever clean() changes behaviour, so cached cleaned frames (see frame_cache.py) are rebuilt
+CLEANING_VERSION = 2
+
+# Outcome column; files of current employees to be scored (see scoring.py) do not carry it
+TARGET = 'Attrition'
+# Attrition value of the employees who left
+POSITIVE = 'Yes'
+OPTIONAL_COLUMNS = [TARGET]
+
+# Employee identifier: dropped from the analysis, but kept as the index when scoring or applying deltas
+ID_COLUMN = 'EmployeeNumber'
+
+# Redundant / non-informative columns
+# EmployeeCount (always 1), StandardHours (always 80), Over18 (always Y), EmployeeNumber (unique ID)
+DROP_COLUMNS = ['EmployeeCount', 'StandardHours', 'Over18', 'EmployeeNumber']
+
+# Map ordinal variables for interpretability
+education_map = {1: 'Below College', 2: 'College', 3: 'Bachelor', 4: 'Master', 5: 'Doctor'}
+satisfaction_map = {1: 'Low', 2: 'Medium', 3: 'High', 4: 'Very High'}
+worklife_balance_map = {1: 'Bad', 2: 'Good', 3: 'Better', 4: 'Best'}
+performance_map = {3: 'Good', 4: 'Outstanding'}
+
+ORDINAL_MAPS = {
+    'Education': education_map,
+    'EnvironmentSatisfaction': satisfaction_map,
+    'JobSatisfaction': satisfaction_map,
+    'RelationshipSatisfaction': satisfaction_map,
+    'WorkLifeBalance': worklife_balance_map,
+    'PerformanceRating': performance_map,
+    'JobInvolvement': satisfaction_map,
+}
+
+# Explicit read-time schema for every column we keep (the DROP_COLUMNS are never parsed).
+# Integer widths follow each field's domain: int8 for ages, levels, ratings, counts and years,
+# int16/int32 for distances, rates and incomes. pandas wraps out-of-range integers silently on
+# both read_csv and astype, so integers are parsed as int64 (see read_options) and clean()
+# raises instead of narrowing a value that does not fit; widen a type here to accept it.
+# Ordinal fields are read as ordered categoricals of their raw codes and relabelled in clean().
+SCHEMA = {
+    'Age': 'int8',
+    'Attrition': 'category',
+    'BusinessTravel': 'category',
+    'DailyRate': 'int16',
+    'Department': 'category',
+    'DistanceFromHome': 'int16',
+    'EducationField': 'category',
+    'Gender': 'category',
+    'HourlyRate': 'int16',
+    'JobLevel': 'int8',
+    'JobRole': 'category',
+    'MaritalStatus': 'category',
+    'MonthlyIncome': 'int32',
+    'MonthlyRate': 'int32',
+    'NumCompaniesWorked': 'int8',
+    'OverTime': 'category',
+    'PercentSalaryHike': 'int8',
+    'StockOptionLevel': 'int8',
+    'TotalWorkingYears': 'int8',
+    'TrainingTimesLastYear': 'int8',
+    'YearsAtCompany': 'int8',
+    'YearsInCurrentRole': 'int8',
+    'YearsSinceLastPromotion': 'int8',
+    'YearsWithCurrManager': 'int8',
+    **{column: CategoricalDtype(list(mapping), ordered=True) for column, mapping in ORDINAL_MAPS.items()},
+}
+
+# Age groups (20–30, 31–40, 41–50, 51+).
+AGE_BINS = [17, 30, 40, 50, 60]  # Adjusted bins to capture 18-30 and ensure 51+
+AGE_LABELS = ['18-30', '31-40', '41-50', '51+']
+
+# Tenure groups of the Section 8 chart and the attrition cube (not part of the cleaned frame)
+YEARS_AT_COMPANY_BINS = [0, 1, 3, 5, 10, 15, 20, float('inf')]
+YEARS_AT_COMPANY_LABELS = ['<1', '1-3', '3-5', '5-10', '10-15', '15-20', '20+']
+
+
+def years_at_company_group(years):
+    """YearsAtCompany binned into the YEARS_AT_COMPANY_LABELS tenure groups (left-closed)."""
+    return pd.cut(years, bins=YEARS_AT_COMPANY_BINS, labels=YEARS_AT_COMPANY_LABELS, right=False).rename('YearsAtCompanyGroup')
+
+
+def check_ranges(df, schema=SCHEMA):
+    """Raise ValueError if an integer column of ``df`` holds values its ``schema`` type cannot store."""
+    for column, dtype in schema.items():
+        if not (column in df.columns and isinstance(dtype, str) and is_integer_dtype(dtype)
+                and is_integer_dtype(df[column].dtype) and len(df)):
+            continue
+        bounds = np.iinfo(dtype)
+        low, high = df[column].min(), df[column].max()
+        if low < bounds.min or high > bounds.max:
+            value = low if low < bounds.min else high
+            raise ValueError(f"{column} value {value} is outside the {dtype} range "
+                             f"[{bounds.min}, {bounds.max}] of the schema; widen its type in SCHEMA")
+
+
+def clean(df):
+    """Apply the schema and the Section 1 cleaning to a raw frame (or chunk) and return the result.
+
+    Integers are narrowed to their schema widths here, after ``check_ranges`` (raising
+    ValueError rather than wrapping); categoricals from ``read_clean`` are already typed.
+    """
+    schema = {column: dtype for column, dtype in SCHEMA.items()
+              if column in df.columns or column not in OPTIONAL_COLUMNS}
+    df = df.drop(columns=DROP_COLUMNS, errors='ignore')
+    check_ranges(df, schema)
+    df = df.astype(schema)
+    for column, mapping in ORDINAL_MAPS.items():
+        df[column] = df[column].cat.rename_categories(mapping)
+    df['AgeGroup'] = pd.cut(df['Age'], bins=AGE_BINS, labels=AGE_LABELS, right=False)
+    return df
+
+
+# read_csv dtypes: the SCHEMA, with integers parsed at full width for clean() to range-check
+PARSE_DTYPES = {column: 'int64' if isinstance(dtype, str) and is_integer_dtype(dtype) else dtype
+                for column, dtype in SCHEMA.items()}
+
+
+def read_options(path=DATA_FILE, index_col=None):
+    """``read_csv`` keyword arguments that parse only the kept columns into the PARSE_DTYPES."""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [column for column in SCHEMA if column in header or column not in OPTIONAL_COLUMNS]
+    return {'usecols': usecols + ([index_col] if index_col else []), 'dtype': PARSE_DTYPES, 'index_col': index_col}
+
+
+def read_clean(path=DATA_FILE, chunksize=None, index_col=None):
+    """Read and clean the CSV; with ``chunksize``, yield cleaned chunks instead of one frame.
+
+    ``index_col`` (e.g. ``'EmployeeNumber'``) is kept as the index of the cleaned frame even
+    if it is one of the dropped columns. The OPTIONAL_COLUMNS may be absent from the file.
+    """
+    options = read_options(path, index_col)
+    if chunksize is None:
+        return clean(pd.read_csv(path, **options))
+    return (clean(chunk) for chunk in pd.read_csv(path, chunksize=chunksize, **options))
+
+
+def memory_report(path=DATA_FILE):
+    """Bytes per column with default ``read_csv`` dtypes versus the cleaned, schema-typed frame."""
+    before = pd.read_csv(path).memory_usage(index=False, deep=True)
+    after = read_clean(path).memory_usage(index=False, deep=True)
+    columns = before.index.append(after.index.difference(before.index))  # File order, then derived columns
+    report = pd.DataFrame({'default_bytes': before, 'schema_bytes': after}).reindex(columns).fillna(0).astype(int)
+    report.loc['Total'] = report.sum()
+    reduction = 1 - report['schema_bytes'] / report['default_bytes']
+    report['reduction'] = reduction.map('{:.0%}'.format).where(report['default_bytes'] > 0, 'derived')
+    return report
+
+
+if __name__ == '__main__':
+    print(memory_report().to_markdown(numalign="left", stralign="left"))
@@ -0,0 +1,162 @@
+"""Command line entry point of the attrition report.
+
+Writes HR_Attrition_Report_Text.txt (or a Markdown, JSON or HTML report) and renders the
+Section 8 charts for the whole workforce. ``--sections`` restricts the run to the sections that
+are needed; only those are computed, and the heavy libraries behind them are only imported when
+they are selected (scikit-learn for prediction, matplotlib/seaborn for visualizations):
+
+    python -m hr_attrition
+    python -m hr_attrition --sections attrition,compensation
+    python -m hr_attrition --format html
+    python -m hr_attrition --sections attrition --output attrition.json
+    python -m hr_attrition --instrument --cprofile-dir profiles
+    python -m hr_attrition --list-sections
+
+The environment variables below set the defaults of the matching options.
+"""
+import argparse
+import os
+import time
+from contextlib import nullcontext
+
+# Number of chart rendering processes (default: all cores). Set HR_CHART_WORKERS=1 for the serial fallback.
+CHART_WORKERS = int(os.environ.get('HR_CHART_WORKERS', '0')) or None
+
+# Number of model training processes for Section 7 (default: all cores). Set HR_MODEL_WORKERS=1 to train serially.
+MODEL_WORKERS = int(os.environ.get('HR_MODEL_WORKERS', '0')) or None
+
+# Set HR_STREAM_CHUNKSIZE=<rows> to build the text report from chunked, incrementally merged aggregates
+# in bounded memory instead of loading the whole CSV (charts and models need row-level data and are skipped).
+STREAM_CHUNKSIZE = int(os.environ.get('HR_STREAM_CHUNKSIZE', '0')) or None
+
+
+def run(data_file, output=None, sections=None, stream_chunksize=None, model_workers=None, chart_workers=None,
+        fmt=None, instrumentation=None, chart_cache_dir=None, quantiles='exact', resamples=None):
+    """Load the data, write the selected sections to ``output`` and render their charts; a summary dict.
+
+    With an ``Instrumentation``, the load, every section, every chart and the report write are
+    recorded as stages, and the timing table is added to the report after Section 9. With a
+    ``chart_cache_dir``, charts whose data and styling are unchanged are copied from that cache.
+    ``quantiles='approximate'`` reads the describe-table quartiles from histograms (see group_stats.py).
+    ``resamples`` sets the bootstrap/permutation resamples of Sections 2 and 5 (None: the default,
+    0: leave those tables out).
+    """
+    from .aggregates import AggregateCache
+    from .report import REPORT_FILE, attrition_dimensions, build_report, run_report
+    from .uncertainty import N_RESAMPLES
+
+    output = output or REPORT_FILE
+    started = time.perf_counter()
+    stage = instrumentation.stage if instrumentation else lambda *args, **kwargs: nullcontext({})
+    # Load and clean the dataset (see cleaning.py for the dropped columns, ordinal maps and age groups);
+    # the cleaned frame is reused from the columnar cache in .hr_cache/ while the CSV and rules are unchanged.
+    # Shared, memoized crosstabs and group means are used by both the text sections and the charts.
+    with stage('load', 'load') as info:
+        if stream_chunksize:
+            from .streaming import stream_aggregates
+            df = None
+            agg = stream_aggregates(data_file, stream_chunksize, dimensions=attrition_dimensions)
+        else:
+            from .frame_cache import load_clean
+            df = load_clean(data_file)
+            agg = AggregateCache(df, dimensions=attrition_dimensions, quantiles=quantiles)
+        info['rows'] = agg.shape[0]
+
+    results = run_report(df, agg, sections, model_workers=model_workers, instrumentation=instrumentation,
+                         resamples=N_RESAMPLES if resamples is None else resamples)
+    chart_specs = results.get('visualizations', {}).get('charts', [])
+    chart_summary = None
+    if chart_specs:
+        from .chart_engine import render_charts
+        # Render every chart spec, in parallel across cores unless chart_workers=1 (serial fallback)
+        chart_summary = render_charts(chart_specs, max_workers=chart_workers, instrumentation=instrumentation,
+                                      cache_dir=chart_cache_dir)
+    document = build_report(results)
+    if instrumentation is not None:
+        document.sections.append(instrumentation.section())
+    with stage('report_write', 'write', rows=agg.shape[0]):
+        document.write(output, fmt)
+    model_results = results.get('prediction')
+    return {'df': df, 'agg': agg, 'output': output,
+            'models': None if not model_results or 'skipped' in model_results else model_results,
+            'charts': chart_summary, 'wall_seconds': time.perf_counter() - started}
+
+
+def main(argv=None):
+    from .cleaning import DATA_FILE
+    from .chart_engine import CHART_CACHE_DIR
+    from .document import FORMATS
+    from .group_stats import QUANTILE_METHODS
+    from .instrumentation import TRACE_FILE
+    from .report import REPORT_FILE, SECTIONS, report_file
+    from .uncertainty import N_RESAMPLES
+
+    parser = argparse.ArgumentParser(prog='python -m hr_attrition', description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=DATA_FILE, help="Employee CSV to analyse")
+    parser.add_argument('--output', help=f"Report file to write (default: {REPORT_FILE}, or the same name with the --format extension)")
+    parser.add_argument('--format', choices=FORMATS, help="Report format (default: from the --output extension, else text)")
+    parser.add_argument('--sections', help=f"Comma-separated sections to compute (default: all of {','.join(SECTIONS)})")
+    parser.add_argument('--list-sections', action='store_true', help="List the report sections and exit")
+    parser.add_argument('--stream-chunksize', type=int, default=STREAM_CHUNKSIZE,
+                        help="Build the text report from streamed aggregates, this many rows at a time")
+    parser.add_argument('--model-workers', type=int, default=MODEL_WORKERS, help="Model training processes (default: all cores)")
+    parser.add_argument('--chart-workers', type=int, default=CHART_WORKERS, help="Chart rendering processes (default: all cores)")
+    parser.add_argument('--quantiles', choices=QUANTILE_METHODS, default='exact',
+                        help="Quartiles of the describe tables: exact (one sort per column) or approximate "
+                             "(grid histograms, no sort; for very large frames) (default: %(default)s)")
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES,
+                        help="Bootstrap/permutation resamples of the Section 2 and 5 uncertainty tables; "
+                             "0 leaves the tables out (default: %(default)s)")
+    parser.add_argument('--chart-cache-dir', default=CHART_CACHE_DIR,
+                        help="Copy unchanged charts from, and store rendered ones in, this directory (default: %(default)s)")
+    parser.add_argument('--no-chart-cache', action='store_true', help="Render every chart, ignoring the chart cache")
+    parser.add_argument('--instrument', action='store_true',
+                        help="Time every stage, add the timing table to the report and write a trace file")
+    parser.add_argument('--trace-file', default=TRACE_FILE, help="Chrome trace-event file of --instrument runs (default: %(default)s)")
+    parser.add_argument('--cprofile-dir', help="Also dump cProfile stats per stage into this directory (implies --instrument)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also trace allocations per stage: peak and top sites (implies --instrument; slower)")
+    args = parser.parse_args(argv)
+
+    if args.list_sections:
+        for key, (title, compute, _) in SECTIONS.items():
+            print(f"{key:16} {title}: {compute.__doc__.splitlines()[0]}")
+        return
+    sections = None
+    if args.sections:
+        sections = [key.strip() for key in args.sections.split(',') if key.strip()]
+        unknown = [key for key in sections if key not in SECTIONS]
+        if unknown:
+            parser.error(f"unknown sections {', '.join(unknown)}; choose from {', '.join(SECTIONS)}")
+
+    output = args.output or report_file(args.format or 'text')
+    instrumentation = None
+    if args.instrument or args.cprofile_dir or args.tracemalloc:
+        from .instrumentation import Instrumentation
+        instrumentation = Instrumentation(cprofile_dir=args.cprofile_dir, tracemalloc=args.tracemalloc)
+    summary = run(args.data, output, sections, args.stream_chunksize, args.model_workers, args.chart_workers, args.format,
+                  instrumentation, None if args.no_chart_cache else args.chart_cache_dir, args.quantiles, args.resamples)
+
+    print(f"\nAnalysis complete! The text report has been saved to '{summary['output']}' and plots are saved in the current directory.")
+    df, agg, model_results, chart_summary = summary['df'], summary['agg'], summary['models'], summary['charts']
+    if df is None:
+        print(f"Streamed {agg.n_rows} rows in {agg.n_chunks} chunks of up to {args.stream_chunksize} rows; models and charts were skipped.")
+    else:
+        cache_stats = agg.stats()
+        print(f"Aggregate cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['entries']} aggregates computed once and shared).")
+        if model_results is not None:
+            print(f"Trained {len(model_results['folds'])} model folds in {model_results['wall_seconds']:.1f} s.")
+        if chart_summary is not None:
+            print(f"Rendered {chart_summary['charts_rendered']} charts (peak open figures: {chart_summary['peak_figures']}, peak RSS: {chart_summary['peak_rss'] / 2**20:.1f} MB).")
+            if 'cache_hits' in chart_summary:
+                print(f"Chart cache: {chart_summary['cache_hits']} hits, {chart_summary['cache_misses']} misses "
+                      f"({chart_summary['cache_hits']} unchanged charts copied instead of rendered).")
+    if instrumentation is not None:
+        instrumentation.write_trace(args.trace_file)
+        slowest = instrumentation.table()['wall_seconds'].nlargest(3)
+        print(f"Recorded {len(instrumentation.records)} stages in {args.trace_file} "
+              f"(slowest: {', '.join(f'{stage} {seconds:.2f} s' for stage, seconds in slowest.items())}).")
+
+
+if __name__ == '__main__':
+    main()
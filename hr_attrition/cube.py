@@ -0,0 +1,407 @@
+"""Precomputed attrition cube: drill-down queries over any combination of categorical dimensions.
+
+Every new cut ("attrition by OverTime x JobRole x AgeGroup among Sales staff") used to mean
+editing the script and rerunning it over the rows. The cube keeps, for every cell of the
+dimensions below, the employees per Attrition outcome and the sum of their MonthlyIncome, and
+answers any roll-up, slice or filter from those cells alone:
+
+* the base cuboid holds one row per distinct combination of all the dimensions (at most one
+  per employee, usually far fewer). A missing value, such as AgeGroup outside the age bins, gets
+  its own slot, so it drops out of a grouping or a filter on that dimension but still counts in
+  every total rolled up over it;
+* dense views (one array per subset of the dimensions) are materialized within a memory
+  ``budget``. The views are picked greedily by the query work they save per byte, among all
+  subsets of up to ``max_view_dimensions`` dimensions. Each pick is the view that most reduces
+  the cells scanned to answer those subsets from their smallest materialized superset or,
+  failing that, from the base;
+* ``query`` reads the smallest materialized view that covers the grouped and filtered
+  dimensions and sums out the rest. Cuts that no view covers are answered with one
+  ``np.bincount`` over the base.
+
+The cube can be built chunk by chunk from extracts too large to load, and it is saved with the
+source hash and cleaning fingerprint so that a query never reads a stale cube. A stale cube is
+rebuilt with the options it was built with (budget, view dimensions, chunk size):
+
+    python -m hr_attrition.cube build --budget-mb 16
+    python -m hr_attrition.cube query --by OverTime,JobRole,AgeGroup --where Department=Sales
+"""
+import argparse
+import heapq
+import os
+import pickle
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import DATA_FILE, POSITIVE, TARGET, read_clean, years_at_company_group
+
+# The original script's categorical_cols (without Attrition), the mapped satisfaction fields and tenure groups
+CUBE_DIMENSIONS = ['Gender', 'MaritalStatus', 'BusinessTravel', 'Department', 'EducationField', 'JobRole',
+                   'OverTime', 'JobInvolvement', 'PerformanceRating', 'AgeGroup', 'JobSatisfaction',
+                   'EnvironmentSatisfaction', 'RelationshipSatisfaction', 'WorkLifeBalance', 'YearsAtCompanyGroup']
+# Dimensions derived from the cleaned frame when it does not carry them
+DERIVED_DIMENSIONS = {'YearsAtCompanyGroup': lambda df: years_at_company_group(df['YearsAtCompany'])}
+VALUE = 'MonthlyIncome'
+DEFAULT_BUDGET = 16 << 20
+MAX_VIEW_DIMENSIONS = 3
+DEFAULT_CUBE_FILE = os.path.join('.hr_cache', 'attrition_cube.pkl')
+# Bytes per view cell: an int64 employee count and a float64 income sum
+CELL_BYTES = 16
+
+
+def dimension_series(df, dimension):
+    """The categorical column of a dimension, derived from ``df`` if it is not a column of its own."""
+    series = df[dimension] if dimension in df.columns else DERIVED_DIMENSIONS[dimension](df)
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        raise ValueError(f"Cube dimension {dimension!r} is not categorical ({series.dtype})")
+    return series
+
+
+def _collapse(codes, employees, income, radices):
+    """Sum the measures of identical code rows (codes -1 for missing, ``radices`` include that slot)."""
+    keys = np.zeros(len(codes), dtype=np.int64)
+    for position, radix in enumerate(radices):
+        keys = keys * radix + (codes[:, position].astype(np.int64) + 1)
+    keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return (codes[first], np.bincount(inverse, weights=employees, minlength=len(keys)).astype(np.int64),
+            np.bincount(inverse, weights=income, minlength=len(keys)))
+
+
+class CubeBuilder:
+    """Base cuboid accumulated over frames (or chunks) that carry their own category sets.
+
+    Rows are (dimension codes..., outcome code) with the employees and income summed over them.
+    """
+
+    def __init__(self, dimensions=CUBE_DIMENSIONS, target=TARGET, value=VALUE):
+        self.dimensions = list(dimensions)
+        self.target = target
+        self.value = value
+        self.labels = {}  # dimension (and target) -> labels in first-seen order
+        self.ordered = {}
+        self.codes = None
+        self.employees = None
+        self.income = None
+
+    def _global_codes(self, name, series):
+        """Codes of a chunk column in this builder's label numbering (extended with new labels)."""
+        if name not in self.labels:
+            self.ordered[name] = bool(series.cat.ordered)
+            # Ordered categoricals (the schema's ordinal fields, the age and tenure groups) keep all their categories
+            self.labels[name] = list(series.cat.categories) if series.cat.ordered else []
+        labels = self.labels[name]
+        positions = {label: position for position, label in enumerate(labels)}
+        mapping = []
+        for label in series.cat.categories:
+            if label not in positions:
+                positions[label] = len(labels)
+                labels.append(label)
+            mapping.append(positions[label])
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, np.asarray(mapping, dtype=np.int64)[codes], -1)
+
+    def update(self, df):
+        target = self._global_codes(self.target, df[self.target].astype('category'))
+        valid = target >= 0
+        codes = np.column_stack([self._global_codes(dimension, dimension_series(df, dimension))[valid]
+                                 for dimension in self.dimensions] + [target[valid]])
+        employees = np.ones(len(codes), dtype=np.int64)
+        income = df[self.value].to_numpy(dtype=np.float64)[valid]
+        if self.codes is not None:
+            codes = np.concatenate([self.codes, codes])
+            employees = np.concatenate([self.employees, employees])
+            income = np.concatenate([self.income, income])
+        radices = [len(self.labels[name]) + 1 for name in self.dimensions + [self.target]]
+        if np.prod(np.array(radices, dtype=float)) >= 2.0 ** 63:
+            raise ValueError("Too many dimension cells to key in 64 bits; build the cube over fewer dimensions")
+        self.codes, self.employees, self.income = _collapse(codes, employees, income, radices)
+
+    def cube(self, budget=DEFAULT_BUDGET, max_view_dimensions=MAX_VIEW_DIMENSIONS):
+        """The ``AttritionCube`` of everything added so far, with unordered labels sorted as pandas sorts them."""
+        labels, codes = [], []
+        for position, name in enumerate(self.dimensions + [self.target]):
+            names = self.labels[name]
+            order = list(range(len(names))) if self.ordered[name] else sorted(range(len(names)), key=lambda i: names[i])
+            renumber = np.empty(len(names) + 1, dtype=np.int64)
+            renumber[order] = np.arange(len(names))
+            renumber[-1] = len(names)  # Missing (-1) goes to the extra last slot
+            ordered_names = [names[i] for i in order]
+            labels.append(pd.CategoricalIndex(ordered_names, categories=ordered_names, ordered=self.ordered[name], name=name))
+            codes.append(renumber[self.codes[:, position]])
+        dtype = np.min_scalar_type(max(len(index) for index in labels))
+        # Column-major, so that every dimension's codes are one contiguous array
+        codes = np.asfortranarray(np.column_stack(codes).astype(dtype))
+        return AttritionCube(self.dimensions, labels[:-1], labels[-1], codes[:, :-1], codes[:, -1],
+                             self.employees, self.income, self.value, budget, max_view_dimensions)
+
+
+class AttritionCube:
+    """Base cuboid plus the dense views the memory budget allows; see the module docstring."""
+
+    def __init__(self, dimensions, labels, outcomes, codes, outcome_codes, employees, income, value=VALUE,
+                 budget=DEFAULT_BUDGET, max_view_dimensions=MAX_VIEW_DIMENSIONS):
+        self.dimensions = list(dimensions)
+        self.labels = dict(zip(self.dimensions, labels))
+        self.outcomes = outcomes
+        self.value = value
+        # Base cuboid: one row per distinct (dimension codes, outcome) with its employees and income
+        self.codes = codes
+        self.outcome_codes = outcome_codes
+        self.employees = employees
+        self.income = income
+        self.budget = budget
+        self.max_view_dimensions = max_view_dimensions
+        # Every dimension's axis has one extra slot for missing values
+        self.shape = np.array([len(labels) + 1 for labels in labels], dtype=np.int64)
+        self.views = {}
+        self.hits = 0
+        self.misses = 0
+        # Set by whoever saves the cube: the source it was built from and how it was read
+        self.fingerprint = None
+        self.chunksize = None
+        self._materialize()
+
+    def _mask(self, dimensions):
+        mask = 0
+        for dimension in dimensions:
+            if dimension not in self.labels:
+                raise KeyError(f"{dimension!r} is not a cube dimension; choose from {', '.join(self.dimensions)}")
+            mask |= 1 << self.dimensions.index(dimension)
+        return mask
+
+    def _axes(self, mask):
+        return [position for position in range(len(self.dimensions)) if mask >> position & 1]
+
+    def _cells(self, mask):
+        return int(np.prod(self.shape[self._axes(mask)])) * len(self.outcomes)
+
+    def _dense(self, mask):
+        """Employee and income arrays of a view (axes in dimension order, outcomes last)."""
+        covering = [view for view in self.views if view & mask == mask]
+        if covering:
+            view = min(covering, key=self._cells)
+            self.hits += 1
+            employees, income = self.views[view]
+            axes = self._axes(view)
+            summed = tuple(index for index, axis in enumerate(axes) if not mask >> axis & 1)
+            return employees.sum(axis=summed), income.sum(axis=summed)
+        self.misses += 1
+        axes = self._axes(mask)
+        shape = tuple(int(size) for size in self.shape[axes]) + (len(self.outcomes),)
+        cells = np.zeros(len(self.codes), dtype=np.intp)
+        for axis in axes:
+            cells = cells * self.shape[axis] + self.codes[:, axis]
+        cells = cells * len(self.outcomes) + self.outcome_codes
+        employees = np.bincount(cells, weights=self.employees, minlength=int(np.prod(shape))).astype(np.int64)
+        income = np.bincount(cells, weights=self.income, minlength=int(np.prod(shape)))
+        return employees.reshape(shape), income.reshape(shape)
+
+    def _materialize(self):
+        """Greedy view selection: the best query-cost reduction per byte until the budget is spent."""
+        workload = [sum(1 << axis for axis in axes) for size in range(self.max_view_dimensions + 1)
+                    for axes in combinations(range(len(self.dimensions)), size)]
+        # Cells scanned to answer each workload subset; the base to begin with
+        cost = dict.fromkeys(workload, len(self.codes))
+
+        def subsets(mask):
+            sub = mask
+            while True:
+                yield sub
+                if sub == 0:
+                    return
+                sub = (sub - 1) & mask
+
+        def benefit(mask):
+            cells = self._cells(mask)
+            return sum(max(cost[sub] - cells, 0) for sub in subsets(mask)) / (cells * CELL_BYTES)
+
+        left, selected = self.budget, []
+        # Benefits only shrink as views are added, so stale heap entries are re-scored lazily
+        heap = [(-benefit(mask), mask) for mask in workload]
+        heapq.heapify(heap)
+        while heap:
+            _, mask = heapq.heappop(heap)
+            if self._cells(mask) * CELL_BYTES > left:
+                continue
+            score = benefit(mask)
+            if score <= 0:
+                continue
+            if heap and score < -heap[0][0]:
+                heapq.heappush(heap, (-score, mask))
+                continue
+            selected.append(mask)
+            left -= self._cells(mask) * CELL_BYTES
+            for sub in subsets(mask):
+                cost[sub] = min(cost[sub], self._cells(mask))
+        # Largest first, so that smaller views are summed out of a materialized superset, not the base
+        for mask in sorted(selected, key=self._cells, reverse=True):
+            self.views[mask] = self._dense(mask)
+        self.hits = self.misses = 0
+
+    def query(self, by=(), where=None):
+        """Employees, leavers, attrition rate and income per ``by`` group, among rows matching ``where``.
+
+        ``where`` maps dimensions to a label or a list of labels; groups without employees are
+        left out, as in ``pd.crosstab``. With no ``by``, one 'All' row holds the filtered totals.
+        """
+        by, where = list(by), dict(where or {})
+        if len(set(by)) != len(by):
+            raise ValueError(f"Group by each dimension once, not {by}")
+        mask = self._mask(by + list(where))
+        # Label positions kept per dimension: the filtered ones, or every label (but not missing) of a grouping
+        keep = {dimension: np.arange(len(self.labels[dimension])) for dimension in by}
+        for dimension, values in where.items():
+            values = list(values) if isinstance(values, (list, tuple, set)) else [values]
+            positions = self.labels[dimension].get_indexer(values)
+            if (positions < 0).any():
+                raise KeyError(f"{dimension} has no category {values[int(np.argmin(positions))]!r}")
+            keep[dimension] = np.unique(positions)  # In label order, as groups are listed
+        employees, income = self._dense(mask)
+
+        # Slice and filter the view, then roll up over the filtered-only dimensions
+        axes = [self.dimensions[axis] for axis in self._axes(mask)]
+        for index, dimension in enumerate(axes):
+            employees, income = employees.take(keep[dimension], axis=index), income.take(keep[dimension], axis=index)
+        rolled = tuple(index for index, dimension in enumerate(axes) if dimension not in by)
+        employees, income = employees.sum(axis=rolled), income.sum(axis=rolled)
+        grouped = [dimension for dimension in axes if dimension in by]
+        order = [grouped.index(dimension) for dimension in by] + [len(by)]
+        employees = employees.transpose(order).reshape(-1, len(self.outcomes))
+        income = income.transpose(order).reshape(-1, len(self.outcomes))
+
+        levels = [self.labels[dimension][keep[dimension]] for dimension in by]
+        if not by:
+            index = pd.Index(['All'])
+        elif len(by) == 1:
+            index = levels[0]
+        else:
+            index = pd.MultiIndex.from_product(levels, names=by)
+        positive = self.outcomes.get_indexer([POSITIVE])[0]
+        total = employees.sum(axis=1)
+        leavers = employees[:, positive] if positive >= 0 else np.zeros(len(total), dtype=np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = pd.DataFrame({'employees': total, 'leavers': leavers, 'attrition_rate': leavers / total * 100,
+                                   f'{self.value}_sum': income.sum(axis=1), f'{self.value}_mean': income.sum(axis=1) / total},
+                                  index=index)
+        return result[total > 0]
+
+    def nbytes(self):
+        base = self.codes.nbytes + self.outcome_codes.nbytes + self.employees.nbytes + self.income.nbytes
+        return base, sum(employees.nbytes + income.nbytes for employees, income in self.views.values())
+
+    def stats(self):
+        base, views = self.nbytes()
+        return {'base_cells': len(self.codes), 'base_bytes': base, 'views': len(self.views), 'view_bytes': views,
+                'budget': self.budget, 'hits': self.hits, 'misses': self.misses}
+
+    def save(self, path=DEFAULT_CUBE_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, 'wb') as cube_file:
+            pickle.dump(self, cube_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+
+    @staticmethod
+    def load(path=DEFAULT_CUBE_FILE):
+        with open(path, 'rb') as cube_file:
+            return pickle.load(cube_file)
+
+
+def build_cube(df, dimensions=CUBE_DIMENSIONS, target=TARGET, value=VALUE, **options):
+    """The ``AttritionCube`` of an in-memory cleaned frame (``options``: budget, max_view_dimensions)."""
+    builder = CubeBuilder(dimensions, target, value)
+    builder.update(df)
+    return builder.cube(**options)
+
+
+def stream_cube(path=DATA_FILE, chunksize=100_000, dimensions=CUBE_DIMENSIONS, target=TARGET, value=VALUE, **options):
+    """The ``AttritionCube`` of a CSV too large to load, merged chunk by chunk."""
+    builder = CubeBuilder(dimensions, target, value)
+    for chunk in read_clean(path, chunksize=chunksize):
+        builder.update(chunk)
+    return builder.cube(**options)
+
+
+def source_fingerprint(path, cache_dir=os.path.dirname(DEFAULT_CUBE_FILE)):
+    """Source file hash plus cleaning fingerprint: a saved cube is current while this is unchanged."""
+    from .frame_cache import cleaning_fingerprint, file_sha256
+
+    os.makedirs(cache_dir, exist_ok=True)
+    return f"{file_sha256(path, cache_dir)}:{cleaning_fingerprint()}"
+
+
+def _parse_where(conditions, cube):
+    """``['Department=Sales', 'AgeGroup=18-30,31-40']`` as ``{dimension: [labels]}`` (labels matched as text)."""
+    where = {}
+    for condition in conditions:
+        dimension, _, values = condition.partition('=')
+        if dimension not in cube.labels:
+            raise KeyError(f"{dimension!r} is not a cube dimension; choose from {', '.join(cube.dimensions)}")
+        by_text = {str(label): label for label in cube.labels[dimension]}
+        unknown = [value for value in values.split(',') if value not in by_text]
+        if unknown:
+            raise KeyError(f"{dimension} has no category {unknown[0]!r}; choose from {', '.join(by_text)}")
+        where[dimension] = [by_text[value] for value in values.split(',')]
+    return where
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--data', default=DATA_FILE, help='employee CSV (default: %(default)s)')
+    parser.add_argument('--cube', default=DEFAULT_CUBE_FILE, help='saved cube (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='build the cube from the CSV and save it')
+    build.add_argument('--chunksize', type=int, help='read the CSV in chunks of this many rows instead of loading it')
+    build.add_argument('--budget-mb', type=float, default=DEFAULT_BUDGET / (1 << 20),
+                       help='memory for materialized views, in MiB (default: %(default)s)')
+    build.add_argument('--max-view-dimensions', type=int, default=MAX_VIEW_DIMENSIONS,
+                       help='largest dimension combination considered for materialization (default: %(default)s)')
+    query = commands.add_parser('query', help='answer a cut from the saved cube (built first if missing or stale)')
+    query.add_argument('--by', default='', help='comma-separated dimensions to group by')
+    query.add_argument('--where', action='append', default=[], metavar='DIMENSION=LABEL[,LABEL...]',
+                       help='keep only these labels of a dimension (repeatable)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    fingerprint = source_fingerprint(args.data)
+    cube = None
+    if args.command == 'build':
+        options = {'dimensions': CUBE_DIMENSIONS, 'budget': int(args.budget_mb * (1 << 20)),
+                   'max_view_dimensions': args.max_view_dimensions}
+        chunksize = args.chunksize
+    else:
+        options, chunksize = {}, None
+        if os.path.exists(args.cube):
+            cube = AttritionCube.load(args.cube)
+            # A stale cube is rebuilt the way it was built, not with the defaults
+            options = {'dimensions': cube.dimensions, 'budget': cube.budget, 'max_view_dimensions': cube.max_view_dimensions}
+            chunksize = getattr(cube, 'chunksize', None)
+            cube = cube if cube.fingerprint == fingerprint else None
+    if cube is None:
+        if chunksize:
+            cube = stream_cube(args.data, chunksize, **options)
+        else:
+            from .frame_cache import load_clean
+            cube = build_cube(load_clean(args.data), **options)
+        cube.fingerprint = fingerprint
+        cube.chunksize = chunksize
+        cube.save(args.cube)
+        stats = cube.stats()
+        print(f"Built the cube of {args.data} in {time.perf_counter() - start:.2f} s: {stats['base_cells']} base cells "
+              f"({stats['base_bytes'] / (1 << 20):.1f} MiB), {stats['views']} views "
+              f"({stats['view_bytes'] / (1 << 20):.1f} of {stats['budget'] / (1 << 20):.1f} MiB).")
+    if args.command == 'query':
+        start = time.perf_counter()
+        try:
+            result = cube.query([dimension for dimension in args.by.split(',') if dimension], _parse_where(args.where, cube))
+        except (KeyError, ValueError) as error:
+            parser.error(error.args[0])
+        elapsed = time.perf_counter() - start
+        print(result.round(2).to_markdown(numalign="left", stralign="left"))
+        print(f"\n{len(result)} groups in {elapsed * 1000:.1f} ms ({'view' if cube.hits else 'base cuboid'}).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Report documents: sections of text, tables and values, serialized in one buffered write.
+
+A ``ReportDocument`` holds its ``Section`` objects in memory; each section keeps its blocks in
+order (paragraph strings and named ``Table`` objects) plus the scalar values behind its prose.
+Nothing is printed while the report is built, so sections can be built in any thread or process.
+``render`` serializes the whole document to a string and ``write`` stores it with a single write:
+
+* ``text``: the layout of HR_Attrition_Report_Text.txt (``--- N. Title ---`` headings),
+* ``markdown``: ``##`` headings, paragraphs and pipe tables,
+* ``json``: every section's values and tables (``orient='split'``) for dashboards,
+* ``html``: a standalone page with one ``<table>`` per table.
+"""
+import html
+import json
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+FORMATS = ('text', 'markdown', 'json', 'html')
+EXTENSIONS = {'.txt': 'text', '.md': 'markdown', '.json': 'json', '.html': 'html', '.htm': 'html'}
+
+
+@dataclass
+class Table:
+    """A named DataFrame or Series shown as one table."""
+    name: str
+    frame: object
+
+    def markdown(self):
+        return self.frame.to_markdown(numalign="left", stralign="left")
+
+    def to_dict(self):
+        return {**json.loads(self.frame.to_json(orient='split', default_handler=str)), 'name': self.name}
+
+
+@dataclass
+class Section:
+    """One report section.
+
+    ``blocks`` (paragraph strings and Tables) are what the text, Markdown and HTML formats show;
+    ``values`` and ``tables`` are all of the section's scalar and tabular results, which the JSON
+    format carries whether or not the prose quotes them.
+    """
+    key: str
+    title: str
+    blocks: list = field(default_factory=list)
+    values: dict = field(default_factory=dict)
+    tables: list = field(default_factory=list)
+
+
+@dataclass
+class ReportDocument:
+    sections: list = field(default_factory=list)
+    title: str = None
+
+    def render(self, fmt='text'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format {fmt!r}; choose from {', '.join(FORMATS)}")
+        return {'text': _render_text, 'markdown': _render_markdown, 'json': _render_json, 'html': _render_html}[fmt](self)
+
+    def write(self, output, fmt=None):
+        """Write the rendered document to a path or open file in one write; the format defaults to the extension."""
+        if isinstance(output, (str, os.PathLike)):
+            fmt = fmt or format_for(output)
+            with open(output, 'w') as f:
+                f.write(self.render(fmt))
+        else:
+            output.write(self.render(fmt or 'text'))
+
+
+def format_for(path):
+    """Output format implied by a file name (text unless it ends in .md, .json or .html)."""
+    return EXTENSIONS.get(os.path.splitext(str(path))[1].lower(), 'text')
+
+
+def _render_text(document):
+    parts = [f"=== {document.title} ===\n\n"] if document.title else []
+    for position, section in enumerate(document.sections):
+        # Sections after the first are separated by a blank line
+        if position:
+            parts.append('\n')
+        parts.append(f"--- {section.title} ---\n")
+        parts.extend(f"{block.markdown() if isinstance(block, Table) else block}\n" for block in section.blocks)
+    return ''.join(parts)
+
+
+def _render_markdown(document):
+    parts = [f"# {document.title}\n"] if document.title else []
+    for section in document.sections:
+        parts.append(f"## {section.title}\n")
+        parts.extend(block.markdown() + '\n' if isinstance(block, Table) else block.strip() + '\n'
+                     for block in section.blocks)
+    return '\n'.join(parts)
+
+
+def _json_value(value):
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _render_json(document):
+    payload = {
+        'title': document.title,
+        'sections': [{'key': section.key, 'title': section.title,
+                      'values': {name: _json_value(value) for name, value in section.values.items()},
+                      'tables': [table.to_dict() for table in section.tables]}
+                     for section in document.sections],
+    }
+    # NaN is not valid JSON; missing values go out as null
+    return json.dumps(payload, indent=2, default=_json_value, allow_nan=False) + '\n'
+
+
+def _render_html(document):
+    title = html.escape(document.title or 'HR Attrition Report')
+    parts = ['<!DOCTYPE html>', '<html>', '<head>', '<meta charset="utf-8">', f'<title>{title}</title>', '</head>',
+             '<body>', f'<h1>{title}</h1>']
+    for section in document.sections:
+        parts.append(f'<section id="{section.key}">')
+        parts.append(f'<h2>{html.escape(section.title)}</h2>')
+        for block in section.blocks:
+            if isinstance(block, Table):
+                frame = block.frame.to_frame() if block.frame.ndim == 1 else block.frame
+                parts.append(frame.to_html(classes=block.name, border=0, na_rep=''))
+            elif '\n' in block.strip():
+                parts.append(f'<pre>{html.escape(block.strip())}</pre>')
+            else:
+                parts.append(f'<p>{html.escape(block.strip())}</p>')
+        parts.append('</section>')
+    parts += ['</body>', '</html>']
+    return '\n'.join(parts) + '\n'
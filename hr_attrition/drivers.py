@@ -0,0 +1,199 @@
+"""Attrition driver ranking: chi-square, Cramér's V and mutual information for every column at once.
+
+Section 9 used to name the key risk groups from the individual crosstabs. ``rank_drivers``
+measures the association between Attrition and every other column of the cleaned frame and
+ranks them. Categorical columns are used as they are; numeric columns with at most ``bins``
+distinct values (levels, ratings, counts) keep their values, and the others are cut at their
+quantiles into at most ``bins`` groups.
+
+No crosstab is built per column. The columns are encoded in blocks of ``BLOCK_COLUMNS``; each
+block becomes a code matrix whose ``code x Attrition`` tables all come out of one ``np.bincount``
+(``aggregates.count_codes``). The tables of all blocks are stacked into one ``categories x
+outcomes`` matrix, and every statistic is computed over it at once with segment sums per
+column. Only the encoding (binning and factorizing) is per-column work, and blocks are
+independent, so ``max_workers`` spreads them over processes for wide extracts:
+
+* ``chi_square``, ``dof`` and ``p_value``: Pearson's test of independence,
+* ``cramers_v``: ``sqrt(chi_square / (n * (min(categories, outcomes) - 1)))``, from 0 to 1,
+* ``mutual_information``: in nats; ``uncertainty`` divides it by the entropy of Attrition,
+* ``riskiest_group`` / ``riskiest_rate``: the group with the highest attrition rate among
+  those holding at least ``MIN_GROUP_SHARE`` of the employees.
+
+    python -m hr_attrition.drivers --rank-by cramers_v --top 20 --workers 4
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import _codes, count_codes
+from .cleaning import DATA_FILE, POSITIVE, TARGET
+
+BINS = 10
+# Columns encoded (and counted) per task; bounds each task's code matrix to rows x BLOCK_COLUMNS
+BLOCK_COLUMNS = 32
+# Smallest share of the employees a group needs to be named the riskiest of its column
+MIN_GROUP_SHARE = 0.02
+RANK_BY = ('mutual_information', 'uncertainty', 'cramers_v', 'chi_square')
+
+
+def binned_codes(series, bins=BINS):
+    """Integer codes (-1 for missing) and labels of a column, numeric columns cut into quantile bins."""
+    if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(series):
+        return _codes(series)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    # One sort gives both the number of distinct values and the quantiles (linear interpolation, as np.quantile)
+    present = np.sort(values[~np.isnan(values)])
+    if np.count_nonzero(np.diff(present)) + 1 <= bins:
+        return _codes(series)
+    positions = (len(present) - 1) * np.linspace(0, 1, bins + 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.ceil(positions).astype(np.intp)
+    edges = np.unique(present[lower] + (present[upper] - present[lower]) * (positions - lower))
+    # Left-closed bins, the last one closed on both sides so that the maximum falls in it
+    codes = np.searchsorted(edges[1:-1], values, side='right')
+    codes[np.isnan(values)] = -1
+    labels = [f"{low:g}-{high:g}" for low, high in zip(edges[:-1], edges[1:])]
+    return codes, pd.Index(labels, name=series.name)
+
+
+def driver_columns(df, target=TARGET):
+    """Every column but the target: categorical and numeric ones (others, such as free text, are skipped)."""
+    return [column for column in df.columns if column != target
+            and (isinstance(df[column].dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(df[column]))]
+
+
+def _count_block(frame, target_codes, n_target, bins):
+    """Labels of every column of ``frame`` and their stacked ``categories x outcomes`` counts."""
+    encoded = [binned_codes(frame[column], bins) for column in frame.columns]
+    counts, _, _ = count_codes(encoded, target_codes, n_target)
+    return [labels for _, labels in encoded], counts.reshape(-1, n_target)
+
+
+def driver_statistics(observed, sizes, outcomes, columns, labels):
+    """Association statistics of stacked count tables.
+
+    ``observed`` stacks the ``categories x outcomes`` tables of ``columns`` (``sizes`` rows each,
+    ``labels`` naming them); returns one row per column, unranked.
+    """
+    observed = observed.astype(np.float64)
+    sizes = np.asarray(sizes, dtype=np.intp)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+    column_ids = np.repeat(np.arange(len(sizes)), sizes)
+
+    def per_column(values):
+        return np.bincount(column_ids, weights=values, minlength=len(sizes))
+
+    row_totals = observed.sum(axis=1)
+    outcome_totals = np.column_stack([per_column(outcome) for outcome in observed.T]) if len(outcomes) else np.zeros((len(sizes), 0))
+    n = outcome_totals.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected = row_totals[:, None] * outcome_totals[column_ids] / n[column_ids, None]
+        cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0)
+        information = np.where(observed > 0, observed * np.log(observed / expected), 0)
+
+    chi_square = per_column(cells.sum(axis=1))
+    categories = per_column(row_totals > 0)
+    present_outcomes = (outcome_totals > 0).sum(axis=1)
+    dof = (categories - 1) * (present_outcomes - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mutual_information = per_column(information.sum(axis=1)) / n
+        shares = outcome_totals / n[:, None]
+        target_entropy = -np.where(shares > 0, shares * np.log(shares), 0).sum(axis=1)
+        cramers_v = np.sqrt(chi_square / (n * (np.minimum(categories, present_outcomes) - 1)))
+        # NaN (instead of a divide warning) when the slice has a single outcome, e.g. no leavers
+        uncertainty = mutual_information / target_entropy
+    testable = dof > 0
+    p_value = np.full(len(sizes), np.nan)
+    if testable.any():
+        from scipy.special import chdtrc  # Chi-square survival function; scipy.stats is far slower to import
+        p_value[testable] = chdtrc(dof[testable], chi_square[testable])
+
+    # Riskiest sizeable group: the first row of every column once sorted by rate within the column
+    positive = list(outcomes).index(POSITIVE) if POSITIVE in list(outcomes) else None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = observed[:, positive] / row_totals * 100 if positive is not None else np.zeros(len(observed))
+    eligible = (row_totals > 0) & (row_totals >= MIN_GROUP_SHARE * n[column_ids])
+    order = np.lexsort((-np.where(eligible, rates, -1), column_ids))
+    riskiest_group, riskiest_rate = [None] * len(sizes), np.full(len(sizes), np.nan)
+    for column_id in np.flatnonzero(sizes > 0):
+        row = order[starts[column_id]]
+        if eligible[row]:
+            riskiest_group[column_id] = labels[column_id][row - starts[column_id]]
+            riskiest_rate[column_id] = rates[row]
+
+    return pd.DataFrame({
+        'categories': categories.astype(np.int64),
+        'employees': n.astype(np.int64),
+        'chi_square': chi_square,
+        'dof': dof.astype(np.int64),
+        'p_value': p_value,
+        'cramers_v': np.where(testable, cramers_v, np.nan),
+        'mutual_information': mutual_information,
+        'uncertainty': uncertainty,
+        'riskiest_group': riskiest_group,
+        'riskiest_rate': riskiest_rate,
+    }, index=pd.Index(columns, name='column'))
+
+
+def _ranked(statistics, rank_by):
+    if rank_by not in RANK_BY:
+        raise ValueError(f"Unknown ranking {rank_by!r}; choose from {', '.join(RANK_BY)}")
+    return statistics.sort_values(rank_by, ascending=False, kind='stable', na_position='last')
+
+
+def rank_drivers(df, columns=None, target=TARGET, bins=BINS, rank_by='mutual_information', max_workers=1):
+    """Driver statistics of ``columns`` (default: ``driver_columns(df)``), strongest first.
+
+    Column blocks are encoded and counted independently; ``max_workers=1`` (the default) does so
+    in this process and ``max_workers=None`` on every core.
+    """
+    columns = list(columns) if columns is not None else driver_columns(df, target)
+    target_codes, outcomes = _codes(df[target])
+    blocks = [columns[start:start + BLOCK_COLUMNS] for start in range(0, len(columns), BLOCK_COLUMNS)]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(blocks) <= 1:
+        results = [_count_block(df[block], target_codes, len(outcomes), bins) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(blocks))) as pool:
+            results = list(pool.map(_count_block, (df[block] for block in blocks), [target_codes] * len(blocks),
+                                    [len(outcomes)] * len(blocks), [bins] * len(blocks)))
+    labels = [column_labels for block_labels, _ in results for column_labels in block_labels]
+    observed = np.concatenate([counts for _, counts in results]) if results else np.zeros((0, len(outcomes)))
+    statistics = driver_statistics(observed, [len(column_labels) for column_labels in labels], outcomes, columns, labels)
+    return _ranked(statistics, rank_by)
+
+
+def rank_tables(tables, rank_by='mutual_information'):
+    """Driver statistics of ready-made ``{column: column x Attrition count table}`` (e.g. ``agg.counts``)."""
+    outcomes = pd.Index(sorted({outcome for table in tables.values() for outcome in table.columns}))
+    aligned = [table.reindex(columns=outcomes, fill_value=0) for table in tables.values()]
+    observed = np.concatenate([table.to_numpy() for table in aligned]) if aligned else np.zeros((0, len(outcomes)))
+    statistics = driver_statistics(observed, [len(table) for table in aligned], outcomes, list(tables),
+                                   [list(table.index) for table in aligned])
+    return _ranked(statistics, rank_by)
+
+
+def main(argv=None):
+    from .frame_cache import load_clean
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--data', default=DATA_FILE, help='employee CSV (default: %(default)s)')
+    parser.add_argument('--columns', help='comma-separated columns (default: every categorical and numeric column)')
+    parser.add_argument('--bins', type=int, default=BINS, help='quantile bins per numeric column (default: %(default)s)')
+    parser.add_argument('--rank-by', choices=RANK_BY, default='mutual_information', help='(default: %(default)s)')
+    parser.add_argument('--top', type=int, help='only print the strongest drivers')
+    parser.add_argument('--workers', type=int, default=1, help='processes, 0 for all cores (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    df = load_clean(args.data)
+    columns = [column for column in args.columns.split(',') if column] if args.columns else None
+    ranking = rank_drivers(df, columns, bins=args.bins, rank_by=args.rank_by, max_workers=args.workers or None)
+    print(ranking.head(args.top).round(4).to_markdown(numalign="left", stralign="left"))
+
+
+if __name__ == '__main__':
+    main()
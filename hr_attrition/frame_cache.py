@@ -0,0 +1,97 @@
+"""On-disk columnar cache of the cleaned employee frame.
+
+Parsing the CSV, applying the schema, relabelling the ordinal fields and binning AgeGroup are
+repeated on every run although the result only changes when the source file or the cleaning
+rules do. ``load_clean`` stores the cleaned frame as an uncompressed Feather (Arrow IPC) file and
+memory-maps it on later runs. The cache key combines:
+
+* the SHA-256 of the source file,
+* ``cleaning.CLEANING_VERSION`` (bumped whenever ``clean()`` changes behaviour),
+* a fingerprint of the schema, ordinal maps, age bins and dropped columns,
+
+so editing the CSV or any mapping table invalidates the entry automatically. Entry names also
+carry a hash of the resolved source path, so that a new entry only replaces the stale entries of
+the same file (not those of a same-named file elsewhere). pyarrow is optional: without it,
+``load_clean`` simply cleans the CSV every time.
+"""
+import hashlib
+import json
+import os
+
+from . import cleaning
+
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+DEFAULT_CACHE_DIR = '.hr_cache'
+HASH_INDEX = 'source_hashes.json'
+
+
+def cleaning_fingerprint():
+    """Hash of everything (besides the code itself) that determines the cleaned frame."""
+    rules = {
+        'version': cleaning.CLEANING_VERSION,
+        'schema': {column: str(dtype) for column, dtype in cleaning.SCHEMA.items()},
+        'ordinal_maps': {column: list(mapping.items()) for column, mapping in cleaning.ORDINAL_MAPS.items()},
+        'age_bins': [cleaning.AGE_BINS, cleaning.AGE_LABELS],
+        'drop_columns': cleaning.DROP_COLUMNS,
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def file_sha256(path, cache_dir=None):
+    """SHA-256 of ``path``; remembered per (size, mtime) in ``cache_dir`` to skip rehashing."""
+    stat = os.stat(path)
+    signature = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    index_path = os.path.join(cache_dir, HASH_INDEX) if cache_dir else None
+    index = {}
+    if index_path and os.path.exists(index_path):
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+        if signature in index:
+            return index[signature]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    if index_path:
+        index = {key: value for key, value in index.items() if not key.startswith(f"{os.path.abspath(path)}:")}
+        index[signature] = digest.hexdigest()
+        with open(index_path, 'w') as index_file:
+            json.dump(index, index_file)
+    return digest.hexdigest()
+
+
+def source_prefix(path):
+    """Start of the name of every cache entry of ``path``: its stem and a hash of its resolved path."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{hashlib.sha256(os.path.realpath(path).encode()).hexdigest()[:12]}-"
+
+
+def cache_path(path, cache_dir=DEFAULT_CACHE_DIR):
+    key = hashlib.sha256((file_sha256(path, cache_dir) + cleaning_fingerprint()).encode()).hexdigest()
+    return os.path.join(cache_dir, f"{source_prefix(path)}{key[:20]}.feather")
+
+
+def load_clean(path=cleaning.DATA_FILE, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the cleaned frame for ``path``, served from the columnar cache when it is current."""
+    if feather is None or not cache_dir:
+        return cleaning.read_clean(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    target = cache_path(path, cache_dir)
+    if os.path.exists(target):
+        return feather.read_table(target, memory_map=True).to_pandas()
+
+    df = cleaning.read_clean(path)
+    # Replace any stale entries for the same source file, then publish the new one atomically
+    prefix = source_prefix(path)
+    for name in os.listdir(cache_dir):
+        if name.endswith('.feather') and name.startswith(prefix):
+            os.remove(os.path.join(cache_dir, name))
+    partial = f"{target}.{os.getpid()}.tmp"
+    df.to_feather(partial, compression='uncompressed')
+    os.replace(partial, target)
+    return df
@@ -0,0 +1,190 @@
+"""Describe tables (count, mean, std, min, quartiles, max) from one sort per value column.
+
+``df.groupby(by)[value].describe()`` sorts ``value`` again for every grouping, and
+``df[value].describe()`` sorts it once more. Sections 4 and 5 describe MonthlyIncome by JobLevel,
+Department, JobRole and JobSatisfaction, so the same column was sorted four times. Here the work
+is split so that the expensive part is shared:
+
+* ``SortedColumn`` argsorts the column once (NaN last, dropped; ties may come in any order, as
+  equal values are interchangeable for every statistic, so numpy's fastest unstable sort is
+  used). Its own ``describe()`` reads the quartiles straight from the sorted values.
+  ``describe_by(codes, labels)`` takes the group codes in value order and stable-sorts them,
+  which is a linear radix sort for the small integer codes of a grouping, never a comparison
+  sort. Every group's values then sit in one ascending,
+  contiguous segment, and all of its statistics come from the segment bounds and two
+  ``np.bincount`` passes.
+* ``HistogramColumn`` is the approximate variant for very large frames. It never sorts. Values are
+  snapped to a grid of at most ``capacity`` bins (exact for integer columns whose range fits, such
+  as every column of the HR extract). One ``np.bincount`` over (group, bin) gives each group's
+  histogram, and the quartiles are read from it as in ``streaming.QuantileSketch``. Counts, means
+  and standard deviations stay exact. Quartiles, minima and maxima are off by at most half a grid
+  step.
+
+Both produce the tables pandas does: the same linear quantile interpolation, float counts,
+all categories of a categorical grouping (empty ones as count 0, NaN otherwise), and the
+``describe_frame`` table for ``df.describe()``.
+"""
+import numpy as np
+import pandas as pd
+
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+QUANTILES = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+QUANTILE_METHODS = ('exact', 'approximate')
+# Grid bins of a HistogramColumn; integer columns spanning fewer values are described exactly
+HISTOGRAM_CAPACITY = 1 << 16
+
+
+def _float_values(series):
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _moments(values, group_ids, counts):
+    """Mean and sample standard deviation per group (two passes, so the variance does not cancel)."""
+    mean = np.bincount(group_ids, weights=values, minlength=len(counts)) / counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(np.bincount(group_ids, weights=(values - mean[group_ids]) ** 2, minlength=len(counts))
+                      / (counts - 1))
+    return mean, std
+
+
+def _table(counts, mean, std, quantiles, present):
+    """``(groups x DESCRIBE_INDEX)`` array: statistics of the ``present`` groups, count 0 and NaN elsewhere."""
+    table = np.full((len(present), len(DESCRIBE_INDEX)), np.nan)
+    table[:, 0] = 0
+    table[present, 0] = counts
+    table[present, 1] = mean
+    table[present, 2] = std
+    table[present, 3:] = quantiles
+    return table
+
+
+def _segment_stats(values, counts):
+    """Describe rows of consecutive ascending segments of ``values`` with the given (non-zero) lengths."""
+    if not len(counts):
+        return np.empty(0), np.empty(0), np.empty((0, len(QUANTILES)))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    # Segments are contiguous, so the sums are plain reductions over slices
+    mean = np.add.reduceat(values, starts) / counts
+    deviations = values - np.repeat(mean, counts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(np.add.reduceat(deviations * deviations, starts) / (counts - 1))
+    # Linear interpolation between the order statistics around (n - 1) * q, as pandas does
+    positions = starts[:, None] + (counts[:, None] - 1) * QUANTILES
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.ceil(positions).astype(np.intp)
+    quantiles = values[lower] + (values[upper] - values[lower]) * (positions - lower)
+    return mean, std, quantiles
+
+
+def _small_codes(codes, n_labels):
+    """Codes in the narrowest integer type, so numpy's stable argsort runs as a radix sort."""
+    for dtype in (np.int8, np.int16):
+        if n_labels <= np.iinfo(dtype).max:
+            return codes.astype(dtype, copy=False)
+    return codes
+
+
+def _describe_sorted(values, name):
+    """``describe()`` of ascending, NaN-free ``values`` as a Series named ``name``."""
+    counts = np.array([len(values)])
+    mean, std, quantiles = _segment_stats(values, counts[counts > 0])
+    return pd.Series(_table(counts[counts > 0], mean, std, quantiles, counts > 0)[0], index=DESCRIBE_INDEX, name=name)
+
+
+class SortedColumn:
+    """A numeric column sorted once; describe rows of the whole column or of any grouping read from it."""
+
+    def __init__(self, series):
+        values = _float_values(series)
+        order = np.argsort(values)
+        present = int((~np.isnan(values)).sum())  # NaN sorts last
+        self.name = series.name
+        self.order = order[:present]
+        self.values = values[self.order]
+
+    def describe(self):
+        """``series.describe()``."""
+        return _describe_sorted(self.values, self.name)
+
+    def describe_by(self, codes, labels):
+        """``groupby(codes).describe()`` for integer group ``codes`` (-1: missing) into ``labels``."""
+        codes = codes[self.order]
+        values = self.values
+        if (codes < 0).any():
+            valid = codes >= 0
+            codes, values = codes[valid], values[valid]
+        # A stable sort by group keeps every group's values in ascending order
+        values = values[np.argsort(_small_codes(codes, len(labels)), kind='stable')]
+        all_counts = np.bincount(codes, minlength=len(labels))
+        present = all_counts > 0
+        mean, std, quantiles = _segment_stats(values, all_counts[present])
+        return pd.DataFrame(_table(all_counts[present], mean, std, quantiles, present),
+                            index=labels, columns=DESCRIBE_INDEX)
+
+
+class HistogramColumn:
+    """A numeric column snapped to at most ``capacity`` grid bins; approximate quartiles without sorting."""
+
+    def __init__(self, series, capacity=HISTOGRAM_CAPACITY):
+        values = _float_values(series)
+        self.name = series.name
+        self.present = ~np.isnan(values)
+        self.values = values[self.present]
+        low, high = (self.values.min(), self.values.max()) if len(self.values) else (0.0, 0.0)
+        integral = bool(np.all(self.values == np.round(self.values)))
+        # Unit bins keep integer columns exact; anything else gets the finest grid that fits
+        self.resolution = 1.0 if integral and high - low < capacity else max((high - low) / (capacity - 1), np.finfo(float).tiny)
+        self.origin = np.round(low / self.resolution)
+        self.bins = np.round(self.values / self.resolution).astype(np.int64) - int(self.origin)
+        self.n_bins = int(self.bins.max()) + 1 if len(self.bins) else 1
+
+    def _quantiles(self, histograms, counts):
+        """Quartile rows of per-group histograms, interpolated like ``QuantileSketch.quantile``."""
+        cumulative = np.cumsum(histograms, axis=1)
+        positions = (counts[:, None] - 1) * QUANTILES
+        rows = []
+        for group_cumulative, group_positions in zip(cumulative, positions):
+            lower = np.searchsorted(group_cumulative, np.floor(group_positions), side='right')
+            upper = np.searchsorted(group_cumulative, np.ceil(group_positions), side='right')
+            rows.append(lower + (upper - lower) * (group_positions - np.floor(group_positions)))
+        return (np.array(rows).reshape(len(counts), len(QUANTILES)) + self.origin) * self.resolution
+
+    def describe(self):
+        return self.describe_by(np.zeros(len(self.present), dtype=np.int8), pd.Index([self.name])).iloc[0]
+
+    def describe_by(self, codes, labels):
+        codes = codes[self.present]
+        values, bins = self.values, self.bins
+        if (codes < 0).any():
+            valid = codes >= 0
+            codes, values, bins = codes[valid], values[valid], bins[valid]
+        codes = codes.astype(np.intp)
+        all_counts = np.bincount(codes, minlength=len(labels))
+        present = all_counts > 0
+        # Renumber the present groups 0..k-1 so the (group, bin) histogram only has rows for them
+        group_ids = (np.cumsum(present) - 1)[codes]
+        counts = all_counts[present]
+        mean, std = _moments(values, group_ids, counts)
+        histograms = np.bincount(group_ids * self.n_bins + bins, minlength=len(counts) * self.n_bins)
+        quantiles = self._quantiles(histograms.reshape(len(counts), self.n_bins), counts)
+        return pd.DataFrame(_table(counts, mean, std, quantiles, present), index=labels, columns=DESCRIBE_INDEX)
+
+
+def column_stats(series, method='exact'):
+    """The ``SortedColumn`` (``method='exact'``) or ``HistogramColumn`` (``'approximate'``) of a column."""
+    if method not in QUANTILE_METHODS:
+        raise ValueError(f"Unknown quantile method {method!r}; choose from {', '.join(QUANTILE_METHODS)}")
+    return SortedColumn(series) if method == 'exact' else HistogramColumn(series)
+
+
+def describe_frame(df, method='exact'):
+    """``df.describe()`` of the numeric columns; each column is sorted (values only, no order kept) once."""
+    columns = list(df.select_dtypes(include=np.number).columns)
+    if method == 'exact':
+        described = {}
+        for column in columns:
+            values = np.sort(_float_values(df[column]))
+            described[column] = _describe_sorted(values[:int((~np.isnan(values)).sum())], column)
+    else:
+        described = {column: column_stats(df[column], method).describe() for column in columns}
+    return pd.DataFrame(described, index=DESCRIBE_INDEX, columns=pd.Index(columns))
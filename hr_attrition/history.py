@@ -0,0 +1,247 @@
+"""Historical store of monthly snapshots and the month-over-month trends of Sections 2 and 4.
+
+Each cleaned snapshot is appended as one partition of a directory of uncompressed Feather
+(Arrow IPC) files, the format ``frame_cache`` already uses for the cleaned frame:
+
+    .hr_history/manifest.json
+    .hr_history/month=2024-05/snapshot.feather
+    .hr_history/month=2024-06/snapshot.feather
+
+Queries only touch what they need. ``start`` / ``end`` prune the partitions by month before any
+file is opened. Each remaining file is memory-mapped and only the columns behind the requested
+metrics are read (Arrow stores every column contiguously, so the other columns are never paged in).
+The metrics of one snapshot are computed through the usual ``AggregateCache``; partitions are
+independent, so ``max_workers`` spreads them over processes:
+
+* Section 2: the attrition rate overall and by every ``report.ATTRITION_GROUP_COLUMNS`` group,
+* Section 4: mean and median MonthlyIncome overall and by JobLevel, Department and JobRole, the
+  mean PercentSalaryHike of stayers and leavers, and the TotalWorkingYears-MonthlyIncome correlation.
+
+``trends`` returns one row per (metric, dimension, group) and one column per month, plus the
+month-over-month changes. ``attrition_rate`` can be broken down by any stored column, not only
+the Section 2 groupings. pyarrow is required for the store.
+
+    python -m hr_attrition.history append snapshots/2024-06.csv --month 2024-06
+    python -m hr_attrition.history trend --start 2023-07 --metrics attrition_rate --dimensions OverTime,JobRole
+"""
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .aggregates import AggregateCache
+from .cleaning import TARGET, read_clean
+from .report import ATTRITION_GROUP_COLUMNS, attrition_rates
+
+try:
+    from pyarrow import feather, ipc
+except ImportError:
+    feather = ipc = None
+
+DEFAULT_HISTORY_DIR = '.hr_history'
+MANIFEST = 'manifest.json'
+SNAPSHOT_FILE = 'snapshot.feather'
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+INCOME_GROUPINGS = ['JobLevel', 'Department', 'JobRole']
+# Metric -> columns a snapshot must provide to compute it
+METRIC_COLUMNS = {
+    'attrition_rate': [TARGET, *ATTRITION_GROUP_COLUMNS],
+    'employees': [TARGET],
+    'income_mean': ['MonthlyIncome', *INCOME_GROUPINGS],
+    'income_median': ['MonthlyIncome', *INCOME_GROUPINGS],
+    'salary_hike_mean': [TARGET, 'PercentSalaryHike'],
+    'working_years_income_corr': ['TotalWorkingYears', 'MonthlyIncome'],
+}
+METRICS = list(METRIC_COLUMNS)
+
+
+def _require_pyarrow():
+    if feather is None:
+        raise ImportError("The historical store needs pyarrow (pip install pyarrow)")
+
+
+def partition_path(history_dir, month):
+    return os.path.join(history_dir, f"month={month}", SNAPSHOT_FILE)
+
+
+def read_manifest(history_dir=DEFAULT_HISTORY_DIR):
+    """``{month: {'rows', 'source'}}`` of the stored snapshots, oldest month first."""
+    path = os.path.join(history_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as manifest_file:
+        return dict(sorted(json.load(manifest_file).items()))
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    write(partial)
+    os.replace(partial, path)
+
+
+def append_snapshot(df, month, history_dir=DEFAULT_HISTORY_DIR, source=None, replace=False):
+    """Store a cleaned snapshot as the partition of ``month`` ('YYYY-MM')."""
+    _require_pyarrow()
+    if not MONTH_PATTERN.match(month):
+        raise ValueError(f"Month {month!r} is not of the form YYYY-MM")
+    manifest = read_manifest(history_dir)
+    if month in manifest and not replace:
+        raise ValueError(f"{history_dir} already holds a snapshot for {month}; pass replace=True to overwrite it")
+    # Uncompressed, so that later reads can map the column buffers instead of decoding them
+    _write_atomic(partition_path(history_dir, month),
+                  lambda partial: df.reset_index(drop=True).to_feather(partial, compression='uncompressed'))
+    manifest[month] = {'rows': len(df), 'source': source}
+
+    def write_manifest(partial):
+        with open(partial, 'w') as manifest_file:
+            json.dump(dict(sorted(manifest.items())), manifest_file, indent=2)
+    _write_atomic(os.path.join(history_dir, MANIFEST), write_manifest)
+    return manifest[month]
+
+
+def select_months(manifest, start=None, end=None):
+    """Stored months within ``[start, end]`` (inclusive; either may be None)."""
+    return [month for month in manifest if (start is None or month >= start) and (end is None or month <= end)]
+
+
+def read_partition(history_dir, month, columns):
+    """The ``columns`` of one month's snapshot, read through a memory map."""
+    _require_pyarrow()
+    return feather.read_table(partition_path(history_dir, month), columns=list(columns), memory_map=True).to_pandas()
+
+
+def partition_columns(history_dir, month):
+    """Names of the columns stored for ``month``, read from the file's schema alone."""
+    _require_pyarrow()
+    return ipc.open_file(partition_path(history_dir, month)).schema.names
+
+
+def snapshot_metrics(df, metrics=METRICS, dimensions=ATTRITION_GROUP_COLUMNS):
+    """The trend metrics of one snapshot as a Series indexed by (metric, dimension, group)."""
+    agg = AggregateCache(df, dimensions=dimensions if 'attrition_rate' in metrics else ())
+    values = {}
+    if 'employees' in metrics:
+        values[('employees', 'All', 'All')] = len(df)
+    if 'attrition_rate' in metrics:
+        values[('attrition_rate', 'All', 'All')] = agg.value_counts(TARGET, normalize=True).get('Yes', 0) * 100
+        for dimension in dimensions:
+            for group, rate in attrition_rates(agg, dimension)['Yes'].items():
+                values[('attrition_rate', dimension, group)] = rate
+    for metric, statistic in (('income_mean', 'mean'), ('income_median', '50%')):
+        if metric in metrics:
+            values[(metric, 'All', 'All')] = agg.describe('MonthlyIncome')[statistic]
+            for grouping in INCOME_GROUPINGS:
+                # Every grouping reads the same once-sorted MonthlyIncome (see group_stats.py)
+                for group, value in agg.group_describe('MonthlyIncome', grouping)[statistic].items():
+                    values[(metric, grouping, group)] = value
+    if 'salary_hike_mean' in metrics:
+        for group, value in agg.group_mean('PercentSalaryHike', TARGET).items():
+            values[('salary_hike_mean', TARGET, group)] = value
+    if 'working_years_income_corr' in metrics:
+        values[('working_years_income_corr', 'All', 'All')] = agg.corr('TotalWorkingYears', 'MonthlyIncome')
+    return pd.Series(values, dtype=float)
+
+
+def _required_columns(metrics, dimensions):
+    columns = {column for metric in metrics if metric != 'attrition_rate' for column in METRIC_COLUMNS[metric]}
+    if 'attrition_rate' in metrics:
+        columns.update([TARGET, *dimensions])
+    return sorted(columns)
+
+
+def _partition_metrics(history_dir, month, metrics, dimensions):
+    return snapshot_metrics(read_partition(history_dir, month, _required_columns(metrics, dimensions)),
+                            metrics, dimensions)
+
+
+def trends(history_dir=DEFAULT_HISTORY_DIR, start=None, end=None, metrics=METRICS,
+           dimensions=ATTRITION_GROUP_COLUMNS, max_workers=1):
+    """Month-over-month trend tables of the stored snapshots between ``start`` and ``end``.
+
+    Returns ``{'months', 'values', 'changes'}``: ``values`` has a row per (metric, dimension,
+    group) and a column per month (NaN where a group is absent that month), ``changes`` the
+    difference to the previous month (percentage points for rates) for every month but the
+    first. ``dimensions`` may be any stored column; one missing from any selected month is a
+    ValueError. Partitions are read and summarized independently; ``max_workers=1`` does so in
+    this process, ``None`` on every core.
+    """
+    unknown = [metric for metric in metrics if metric not in METRIC_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown metrics {unknown}; choose from {', '.join(METRICS)}")
+    months = select_months(read_manifest(history_dir), start, end)
+    # Older partitions may predate a column, so every selected month's schema is checked
+    required = _required_columns(metrics, dimensions)
+    for month in months:
+        stored = partition_columns(history_dir, month)
+        missing = [column for column in required if column not in stored]
+        if missing:
+            raise ValueError(f"The {month} snapshot has no column {', '.join(missing)}; it holds {', '.join(stored)}")
+    tasks = [(history_dir, month, list(metrics), list(dimensions)) for month in months]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        summaries = [_partition_metrics(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            summaries = list(pool.map(_partition_metrics, *zip(*tasks)))
+    if not summaries:
+        empty = pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=['metric', 'dimension', 'group']))
+        return {'months': [], 'values': empty, 'changes': empty}
+
+    values = pd.concat(summaries, axis=1, keys=months, sort=False)
+    values.index.names = ['metric', 'dimension', 'group']
+    values.columns.name = 'month'
+    # The first month has no previous month to differ from
+    return {'months': months, 'values': values, 'changes': values.diff(axis=1).iloc[:, 1:]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--history-dir', default=DEFAULT_HISTORY_DIR, help='where the snapshots are kept (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    append = commands.add_parser('append', help='clean a snapshot CSV and store it as the partition of a month')
+    append.add_argument('snapshot', help='employee CSV of the month')
+    append.add_argument('--month', required=True, help='month of the snapshot, YYYY-MM')
+    append.add_argument('--replace', action='store_true', help='overwrite an already stored month')
+    commands.add_parser('list', help='list the stored months')
+    trend = commands.add_parser('trend', help='print month-over-month trends of the stored snapshots')
+    trend.add_argument('--start', help='first month, YYYY-MM (default: the oldest)')
+    trend.add_argument('--end', help='last month, YYYY-MM (default: the latest)')
+    trend.add_argument('--metrics', default=','.join(METRICS), help='comma-separated metrics (default: all)')
+    trend.add_argument('--dimensions', default=','.join(ATTRITION_GROUP_COLUMNS),
+                       help='comma-separated attrition_rate dimensions, any stored column (default: the Section 2 groupings)')
+    trend.add_argument('--changes', action='store_true',
+                       help='print the change from the previous month (from the second month on) instead of the values')
+    trend.add_argument('--workers', type=int, default=1, help='processes, 0 for all cores (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'append':
+        try:
+            stored = append_snapshot(read_clean(args.snapshot), args.month, args.history_dir,
+                                     source=os.path.abspath(args.snapshot), replace=args.replace)
+        except ValueError as error:
+            parser.error(str(error))
+        print(f"Stored {stored['rows']} employees of {args.snapshot} as {args.month} in {args.history_dir}.")
+    elif args.command == 'list':
+        for month, entry in read_manifest(args.history_dir).items():
+            print(f"{month}: {entry['rows']} employees ({entry['source']})")
+    else:
+        try:
+            result = trends(args.history_dir, args.start, args.end, [metric for metric in args.metrics.split(',') if metric],
+                            [column for column in args.dimensions.split(',') if column], max_workers=args.workers or None)
+        except ValueError as error:
+            parser.error(str(error))
+        if args.changes and len(result['months']) < 2:
+            print(f"Changes need at least two stored months; found {len(result['months'])}.")
+            return
+        if args.changes:
+            print("Change from the previous month (percentage points for rates):")
+        table = result['changes' if args.changes else 'values']
+        print(table.round(2).to_markdown(numalign="left", stralign="left"))
+
+
+if __name__ == '__main__':
+    main()
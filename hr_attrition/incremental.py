@@ -0,0 +1,255 @@
+"""Incremental report refresh from HRIS delta files (hires, terminations, attribute changes).
+
+The state kept in ``.hr_state/`` consists of:
+
+* ``state.pkl``: the Section 1-6 aggregates as a ``streaming.StreamingAggregates`` (category x
+  Attrition counts, per-group sums and M2 for the means, correlation co-moment sums, value
+  histograms), the Attrition counts of the chart tenure bands, and a digest of every chart's
+  spec as it was last rendered,
+* the current cleaned rows keyed by EmployeeNumber, which supply the old values of updated
+  and deleted employees and the row-level data of the histogram, box plot and retention charts.
+  They are written as a base snapshot plus one change file per applied delta (the removed
+  EmployeeNumbers and the new rows), replayed on load. Once the change files hold
+  ``COMPACT_FRACTION`` of the snapshot's rows, they are folded into a new base snapshot.
+
+A delta is a CSV with an ``Operation`` column (insert / update / delete), the EmployeeNumber
+and, for inserts and updates, the full employee record in the usual CSV layout. Applying it
+removes the old rows from the aggregates and adds the new ones, so the cost is proportional
+to the size of the delta rather than the workforce. The refresh then rewrites the text report
+from the aggregates (only if it changed; the changed sections are listed) and re-renders only
+the charts whose spec digest changed; the count-based charts are read from the same
+aggregates. As in streaming mode, the Section 7 model sweep is not part of the incremental
+report; run ``python -m hr_attrition`` for it.
+
+    python -m hr_attrition.incremental init
+    python -m hr_attrition.incremental apply delta_2024-06-01.csv [more deltas ...]
+"""
+import argparse
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from . import report
+from .chart_engine import chart_digest, render_charts
+from .charts import TENURE_GROUP_COLUMNS, build_chart_specs, tenure_groups
+from .cleaning import DATA_FILE, ID_COLUMN, clean, read_clean
+from .streaming import StreamingAggregates
+from .uncertainty import N_RESAMPLES
+
+DEFAULT_STATE_DIR = '.hr_state'
+STATE_FILE = 'state.pkl'
+SNAPSHOT_FILE = 'snapshot-{:05d}.pkl'
+CHANGES_FILE = 'changes-{:05d}-{:05d}.pkl'  # Snapshot generation, then position in its change log
+# The change files are folded into a new base snapshot once they hold this share of its rows
+COMPACT_FRACTION = 0.25
+OPERATION_COLUMN = 'Operation'
+OPERATIONS = ('insert', 'update', 'delete')
+
+
+def _dump(value, path):
+    """Pickle ``value`` to ``path`` through a temporary file, so an interrupted write leaves no partial file."""
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, 'wb') as target:
+        pickle.dump(value, target, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+
+
+def _replace_rows(snapshot, removed, new):
+    """``snapshot`` without the rows ``removed`` and with the rows ``new``.
+
+    Updated employees (in both) keep their row position, so unchanged charts keep identical
+    inputs; new employees are appended in delta order.
+    """
+    deleted = removed.difference(new.index, sort=False)
+    inserted = new.index.difference(removed, sort=False)
+    order = snapshot.index.drop(deleted).append(inserted)
+    replaced = pd.concat([snapshot.drop(index=removed), new]).loc[order]
+    # Rows cleaned from the delta carry their own category sets; restore the snapshot's dtypes
+    for column, dtype in snapshot.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(replaced[column].dtype, pd.CategoricalDtype):
+            replaced[column] = replaced[column].astype('category')
+    return replaced
+
+
+class IncrementalState:
+    """Persisted aggregates, current rows and rendered-chart digests."""
+
+    def __init__(self, snapshot, aggregates, tenure_aggregates, chart_digests=None):
+        self.snapshot = snapshot
+        self.aggregates = aggregates
+        self.tenure_aggregates = tenure_aggregates
+        self.chart_digests = chart_digests or {}
+        # Base snapshot generation (None until first saved), the change files saved on top of
+        # it and the rows they hold, and the changes applied since the last save
+        self.generation = None
+        self.change_files = []
+        self.logged_rows = 0
+        self.pending = []
+
+    @classmethod
+    def build(cls, path=DATA_FILE):
+        snapshot = read_clean(path, index_col=ID_COLUMN)
+        aggregates = StreamingAggregates(report.attrition_dimensions)
+        aggregates.update(snapshot)
+        tenure_aggregates = StreamingAggregates(TENURE_GROUP_COLUMNS, pairs=(), group_stats=(), track_duplicates=False)
+        tenure_aggregates.update(tenure_groups(snapshot))
+        return cls(snapshot, aggregates, tenure_aggregates)
+
+    def __getstate__(self):
+        # The rows are kept in the snapshot and change files, not in state.pkl
+        return {key: value for key, value in self.__dict__.items() if key not in ('snapshot', 'pending')}
+
+    @classmethod
+    def load(cls, state_dir=DEFAULT_STATE_DIR):
+        with open(os.path.join(state_dir, STATE_FILE), 'rb') as state_file:
+            state = pickle.load(state_file)
+        state.snapshot = pd.read_pickle(os.path.join(state_dir, SNAPSHOT_FILE.format(state.generation)))
+        for name in state.change_files:
+            removed, new = pd.read_pickle(os.path.join(state_dir, name))
+            state.snapshot = _replace_rows(state.snapshot, removed, new)
+        state.pending = []
+        return state
+
+    def save(self, state_dir=DEFAULT_STATE_DIR):
+        """Write the changes applied since the last save, or a new base snapshot when it is due.
+
+        ``state.pkl`` is replaced last and names the files it needs, so an interrupted save
+        leaves the previous state intact; files it no longer names are removed afterwards.
+        """
+        os.makedirs(state_dir, exist_ok=True)
+        logged_rows = self.logged_rows + sum(len(removed) + len(new) for removed, new in self.pending)
+        if self.generation is None or logged_rows > COMPACT_FRACTION * len(self.snapshot):
+            self.generation = 0 if self.generation is None else self.generation + 1
+            _dump(self.snapshot, os.path.join(state_dir, SNAPSHOT_FILE.format(self.generation)))
+            self.change_files, self.logged_rows = [], 0
+        else:
+            for change in self.pending:
+                name = CHANGES_FILE.format(self.generation, len(self.change_files))
+                _dump(change, os.path.join(state_dir, name))
+                self.change_files.append(name)
+            self.logged_rows = logged_rows
+        self.pending = []
+        _dump(self, os.path.join(state_dir, STATE_FILE))
+
+        current = {STATE_FILE, SNAPSHOT_FILE.format(self.generation), *self.change_files}
+        for name in os.listdir(state_dir):
+            if name.endswith('.pkl') and name not in current:
+                os.remove(os.path.join(state_dir, name))
+
+    def apply_delta(self, delta):
+        """Apply a raw delta frame (see the module docstring); returns the count per operation."""
+        operations = delta[OPERATION_COLUMN].str.strip().str.lower()
+        unknown = set(operations) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unknown delta operations {sorted(unknown)}; expected one of {OPERATIONS}")
+        ids = delta[ID_COLUMN]
+        if ids.duplicated().any():
+            raise ValueError(f"Delta changes these employees more than once: {sorted(ids[ids.duplicated()].unique())}")
+        known = ids.isin(self.snapshot.index)
+        if (known & (operations == 'insert')).any():
+            raise ValueError(f"Cannot insert existing employees {sorted(ids[known & (operations == 'insert')])}")
+        if (~known & (operations != 'insert')).any():
+            raise ValueError(f"Cannot update or delete unknown employees {sorted(ids[~known & (operations != 'insert')])}")
+
+        old = self.snapshot.loc[ids[operations != 'insert']]
+        records = delta[operations != 'delete'].drop(columns=OPERATION_COLUMN).set_index(ID_COLUMN)
+        # A delete-only delta has no records to clean (cleaning needs the employee columns)
+        new = clean(records)[self.snapshot.columns] if len(records) else self.snapshot.iloc[:0]
+        if len(old):
+            self.aggregates.remove(old)
+            self.tenure_aggregates.remove(tenure_groups(old))
+        if len(new):
+            self.aggregates.update(new)
+            self.tenure_aggregates.update(tenure_groups(new))
+
+        self.snapshot = _replace_rows(self.snapshot, old.index, new)
+        self.pending.append((old.index, new))
+        return operations.value_counts().reindex(OPERATIONS, fill_value=0).to_dict()
+
+    def refresh(self, output_dir='.', max_workers=None, resamples=N_RESAMPLES):
+        """Rewrite the report if it changed and re-render the charts whose inputs changed.
+
+        ``resamples`` is passed to the report; 0 skips the uncertainty tables of Sections 2 and 5.
+        """
+        text = report.format_report(report.run_report(None, self.aggregates, resamples=resamples))
+        report_path = os.path.join(output_dir, report.REPORT_FILE)
+        previous = ''
+        if os.path.exists(report_path):
+            with open(report_path) as report_file:
+                previous = report_file.read()
+        changed_sections = _changed_sections(previous, text)
+        if changed_sections:
+            with open(report_path, 'w') as report_file:
+                report_file.write(text)
+
+        # Count charts come from the maintained aggregates; the distribution charts need the rows.
+        # Every spec is built, because a chart is stale exactly when the digest of its data
+        # changed, and that data is what the spec holds. Building is a table lookup per count
+        # chart and one pass over the rows for the others (the retention curve's Kaplan-Meier
+        # fit being the largest, a sort of the snapshot); rendering, the dominant cost, is
+        # limited to the stale specs.
+        df = self.snapshot.reset_index(drop=True)
+        specs = build_chart_specs(df, self.aggregates, self.tenure_aggregates)
+        digests = {spec.filename: chart_digest(spec) for spec in specs}
+        stale = [spec for spec in specs if self.chart_digests.get(spec.filename) != digests[spec.filename]
+                 or not os.path.exists(os.path.join(output_dir, spec.filename))]
+        render_charts(stale, output_dir, max_workers=max_workers)
+        self.chart_digests = digests
+        return {'changed_sections': changed_sections, 'charts_rendered': len(stale), 'charts': len(specs)}
+
+
+def _sections(text):
+    """``{section heading: text}`` for a report split at its ``--- N. ... ---`` headings."""
+    sections, heading = {}, ''
+    for line in text.splitlines(keepends=True):
+        if line.startswith('--- '):
+            heading = line.strip('-\n ')
+        sections[heading] = sections.get(heading, '') + line
+    return sections
+
+
+def _changed_sections(old, new):
+    old_sections, new_sections = _sections(old), _sections(new)
+    return [heading for heading in new_sections if old_sections.get(heading) != new_sections[heading]]
+
+
+def read_delta(path):
+    # Blank fields of deleted rows must not break the dtype inference of the other rows
+    return pd.read_csv(path, dtype={OPERATION_COLUMN: str})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR, help='where the state is kept (default: %(default)s)')
+    parser.add_argument('--output-dir', default='.', help='where the report and charts are written (default: %(default)s)')
+    parser.add_argument('--chart-workers', type=int, default=None, help='chart rendering processes (default: all cores; 1 = serial)')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES,
+                        help='resamples of the Section 2 and 5 uncertainty tables, 0 to leave them out (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    init = commands.add_parser('init', help='build the state from a full snapshot and write everything')
+    init.add_argument('--data', default=DATA_FILE, help='full employee CSV (default: %(default)s)')
+    apply = commands.add_parser('apply', help='apply delta files in order and refresh what changed')
+    apply.add_argument('deltas', nargs='+', help='delta CSVs with Operation and EmployeeNumber columns')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == 'init':
+        state = IncrementalState.build(args.data)
+        print(f"Built the state from {len(state.snapshot)} employees in {args.data}.")
+    else:
+        state = IncrementalState.load(args.state_dir)
+        for path in args.deltas:
+            counts = state.apply_delta(read_delta(path))
+            print(f"Applied {path}: {counts['insert']} inserts, {counts['update']} updates, {counts['delete']} deletes "
+                  f"({len(state.snapshot)} employees now).")
+    summary = state.refresh(args.output_dir, max_workers=args.chart_workers, resamples=args.resamples)
+    state.save(args.state_dir)
+    changed = ', '.join(summary['changed_sections']) or 'none'
+    print(f"Report sections rewritten: {changed}. Re-rendered {summary['charts_rendered']} of {summary['charts']} charts "
+          f"in {time.perf_counter() - start:.1f} s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Opt-in per-stage instrumentation of a report run.
+
+An ``Instrumentation`` wraps each stage of a run (the data load, every report section, every
+chart, the report write) in ``stage()``. Each stage records its wall time, CPU time, row count
+and memory high-water marks:
+
+* ``peak_rss``: the process's peak resident set size once the stage is done,
+* ``peak_allocated``: with ``tracemalloc=True``, the peak bytes allocated during the stage on
+  top of what was already allocated when it started.
+  The ten allocation sites that grew most are captured alongside it.
+
+With ``cprofile_dir``, each stage also runs under cProfile, and its stats are dumped to
+``<cprofile_dir>/<stage>.prof`` (open them with ``python -m pstats`` or snakeviz). Charts rendered
+in pool workers are measured in the worker, which sends its records back to be merged. The
+records export as a table for the report (``section()``) and as a Chrome trace-event file
+(``write_trace()``) that chrome://tracing and Perfetto can open.
+"""
+import cProfile
+import json
+import os
+import re
+import resource
+import time
+import tracemalloc as _tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+TRACE_FILE = 'hr_trace.json'
+TOP_ALLOCATIONS = 10
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (ru_maxrss is in KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return peak_rss()
+
+
+class Instrumentation:
+    """Stage records of one run (``records`` is a list of dicts in the order the stages finished)."""
+
+    def __init__(self, cprofile_dir=None, tracemalloc=False):
+        self.cprofile_dir = cprofile_dir
+        self.tracemalloc = tracemalloc
+        self.records = []
+        if cprofile_dir:
+            os.makedirs(cprofile_dir, exist_ok=True)
+        if tracemalloc and not _tracemalloc.is_tracing():
+            _tracemalloc.start()
+
+    def options(self):
+        """Constructor arguments, to build the matching Instrumentation in a pool worker."""
+        return {'cprofile_dir': self.cprofile_dir, 'tracemalloc': self.tracemalloc}
+
+    @contextmanager
+    def stage(self, name, category='stage', rows=None):
+        """Record the ``with`` block as a stage; it may set ``rows`` on the yielded dict once known."""
+        info = {'rows': rows}
+        profiler = cProfile.Profile() if self.cprofile_dir else None
+        if self.tracemalloc:
+            before = _tracemalloc.take_snapshot()
+            _tracemalloc.reset_peak()
+            allocated_before = _tracemalloc.get_traced_memory()[0]
+        start_ns, cpu_start = time.perf_counter_ns(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield info
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record = {'name': name, 'category': category, 'rows': info['rows'], 'pid': os.getpid(), 'start_ns': start_ns,
+                      'wall_seconds': (time.perf_counter_ns() - start_ns) / 1e9,
+                      'cpu_seconds': time.process_time() - cpu_start, 'peak_rss': peak_rss()}
+            if self.tracemalloc:
+                record['peak_allocated'] = _tracemalloc.get_traced_memory()[1] - allocated_before
+                growth = _tracemalloc.take_snapshot().compare_to(before, 'lineno')[:TOP_ALLOCATIONS]
+                record['top_allocations'] = [str(stat) for stat in growth]
+            if profiler is not None:
+                record['profile'] = os.path.join(self.cprofile_dir, f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.prof")
+                profiler.dump_stats(record['profile'])
+            self.records.append(record)
+
+    def merge(self, records):
+        """Add records measured in another process (e.g. a chart rendering worker)."""
+        self.records.extend(records)
+
+    def table(self):
+        """The stage records as a DataFrame, memory in MB, in the order the stages started."""
+        table = pd.DataFrame(sorted(self.records, key=lambda record: record['start_ns']),
+                             columns=['name', 'category', 'rows', 'wall_seconds', 'cpu_seconds', 'peak_allocated', 'peak_rss'])
+        table['peak_rss'] = table['peak_rss'] / 2**20
+        table['peak_allocated'] = table['peak_allocated'] / 2**20
+        table = table.rename(columns={'name': 'stage', 'peak_rss': 'peak_rss_mb', 'peak_allocated': 'peak_allocated_mb'})
+        if not self.tracemalloc:
+            table = table.drop(columns='peak_allocated_mb')
+        return table.set_index('stage')
+
+    def section(self):
+        """The timing table as a report section, appended after Section 9."""
+        from .document import Section, Table
+
+        table = self.table()
+        summary = (f"\n{len(table)} stages took {table['wall_seconds'].sum():.2f} s of wall time and "
+                   f"{table['cpu_seconds'].sum():.2f} s of CPU time (charts rendered in parallel overlap in wall time).")
+        values = {'stages': len(table), 'wall_seconds': table['wall_seconds'].sum(), 'cpu_seconds': table['cpu_seconds'].sum()}
+        return Section('timings', 'Run Timings', [summary, Table('timings', table.round(4))], values, [Table('timings', table)])
+
+    def write_trace(self, path=TRACE_FILE):
+        """Write the records as Chrome trace events (complete events, microseconds) to ``path``."""
+        origin = min((record['start_ns'] for record in self.records), default=0)
+        events = [{'name': record['name'], 'cat': record['category'], 'ph': 'X', 'pid': record['pid'], 'tid': record['pid'],
+                   'ts': (record['start_ns'] - origin) / 1e3, 'dur': record['wall_seconds'] * 1e6,
+                   'args': {key: value for key, value in record.items()
+                            if key not in ('name', 'category', 'pid', 'start_ns')}}
+                  for record in self.records]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
+        return path
@@ -0,0 +1,143 @@
+"""Section 7 attrition models: sparse one-hot features and a parallel stratified k-fold sweep.
+
+Every candidate model is wrapped in the same preprocessing pipeline (one-hot encoding of the
+categorical columns into a sparse matrix, standardized numeric columns) and evaluated with
+stratified k-fold. Each (model, fold) pair is an independent task, so the whole sweep fans
+out over a process pool: candidates train in parallel and so do their folds. The feature
+matrix is sent to each worker once, through the pool initializer, not once per task.
+The encoder is fit inside each training fold only, so no held-out rows leak into it.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from .cleaning import POSITIVE, TARGET
+
+# AgeGroup is a binned copy of Age, so it adds nothing for the models
+EXCLUDED_FEATURES = [TARGET, 'AgeGroup']
+N_FOLDS = 5
+RANDOM_STATE = 42
+
+METRICS = ['accuracy', 'roc_auc', 'precision', 'recall']
+TIMINGS = ['fit_seconds', 'predict_seconds']
+
+
+def candidate_models():
+    """The models compared in Section 7, by report name (each single-threaded; the sweep parallelizes)."""
+    return {
+        'Logistic Regression': LogisticRegression(solver='liblinear', max_iter=1000),
+        'Random Forest': RandomForestClassifier(n_estimators=100, n_jobs=1, random_state=RANDOM_STATE),
+        'Gradient Boosting': GradientBoostingClassifier(random_state=RANDOM_STATE),
+    }
+
+
+def features(df):
+    """Model inputs of a cleaned frame (the target, if present, is dropped)."""
+    return df.drop(columns=EXCLUDED_FEATURES, errors='ignore')
+
+
+def feature_frame(df):
+    """Split a cleaned frame into the model inputs and a 0/1 attrition target."""
+    return features(df), (df[TARGET] == POSITIVE).to_numpy(dtype=np.int8)
+
+
+def make_encoder(X):
+    """Sparse one-hot encoding of the categorical columns next to the scaled numeric ones."""
+    categorical = [column for column in X.columns if isinstance(X[column].dtype, pd.CategoricalDtype)]
+    numeric = [column for column in X.columns if column not in categorical]
+    return ColumnTransformer([
+        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=True), categorical),
+        ('scale', StandardScaler(), numeric),
+    ], sparse_threshold=1.0, verbose_feature_names_out=False)  # Always keep the stacked output sparse
+
+
+def make_pipeline(X, model):
+    return Pipeline([('encode', make_encoder(X)), ('model', model)])
+
+
+def _importances(pipeline):
+    """Per-feature importance: |coefficient| for linear models, impurity importance for trees."""
+    model = pipeline.named_steps['model']
+    values = model.feature_importances_ if hasattr(model, 'feature_importances_') else np.abs(model.coef_[0])
+    return pd.Series(values, index=pipeline.named_steps['encode'].get_feature_names_out())
+
+
+# Worker-side copy of the feature matrix, installed once per process by _init_worker
+_DATA = {}
+
+
+def _init_worker(X, y):
+    _DATA['X'], _DATA['y'] = X, y
+
+
+def _evaluate_fold(name, model, train, test):
+    """Fit ``model`` on one training fold and score it on the held-out fold."""
+    X, y = _DATA['X'], _DATA['y']
+    pipeline = make_pipeline(X, clone(model))
+    start = time.perf_counter()
+    pipeline.fit(X.iloc[train], y[train])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    probabilities = pipeline.predict_proba(X.iloc[test])[:, 1]
+    predict_seconds = time.perf_counter() - start
+    predicted = (probabilities >= 0.5).astype(np.int8)
+    return {
+        'model': name,
+        'accuracy': accuracy_score(y[test], predicted),
+        'roc_auc': roc_auc_score(y[test], probabilities),
+        'precision': precision_score(y[test], predicted, zero_division=0),
+        'recall': recall_score(y[test], predicted),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'importances': _importances(pipeline),
+    }
+
+
+def evaluate_models(df, models=None, n_folds=N_FOLDS, max_workers=None):
+    """Cross-validate every candidate model on the cleaned frame ``df``.
+
+    Runs all ``len(models) * n_folds`` fits in a process pool (``max_workers=None`` uses every
+    core; ``max_workers=1`` runs them serially in this process through the same code).
+    Returns a dict with:
+
+    * ``scores``: mean metrics and timings per model (sorted by ROC-AUC),
+    * ``folds``: the per-fold rows behind them,
+    * ``importances``: the fold-averaged feature importances of each model,
+    * ``wall_seconds``: elapsed time of the whole sweep.
+    """
+    models = models or candidate_models()
+    X, y = feature_frame(df)
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=RANDOM_STATE).split(X, y))
+    tasks = [(name, model, train, test) for name, model in models.items() for train, test in folds]
+
+    start = time.perf_counter()
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(X, y)
+        results = [_evaluate_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_init_worker, initargs=(X, y)) as pool:
+            results = list(pool.map(_evaluate_fold, *zip(*tasks)))
+    wall_seconds = time.perf_counter() - start
+
+    fold_rows = pd.DataFrame([{key: value for key, value in result.items() if key != 'importances'}
+                              for result in results])
+    scores = fold_rows.groupby('model', sort=False)[METRICS + TIMINGS].mean()
+    importances = {name: pd.concat([result['importances'] for result in results if result['model'] == name],
+                                   axis=1).mean(axis=1).sort_values(ascending=False)
+                   for name in models}
+    return {'scores': scores.sort_values('roc_auc', ascending=False), 'folds': fold_rows,
+            'importances': importances, 'wall_seconds': wall_seconds}
@@ -0,0 +1,565 @@
+"""The attrition report as on-demand sections returning structured results.
+
+Every section is a function of the aggregate source ``agg`` (an ``AggregateCache`` over the
+cleaned frame, or a ``StreamingAggregates``) that returns a dict of named scalars and tables.
+``build_section`` turns a section's results into a ``document.Section`` of paragraphs and
+tables, and ``build_report`` collects them into a ``ReportDocument`` that renders as the text
+of HR_Attrition_Report_Text.txt, Markdown, JSON or HTML. Only the sections that are asked for
+are computed. Sections that need heavy libraries import them when they run: prediction imports
+scikit-learn and visualizations imports matplotlib/seaborn. A text-only report therefore never
+loads them. The bootstrap and permutation tables of Sections 2 and 5 draw ``resamples`` resamples
+(``uncertainty.N_RESAMPLES`` by default); ``resamples=0`` leaves them out, e.g. for quick re-renders.
+
+    results = run_report(df, agg, sections=['attrition', 'compensation'])
+    build_report(results).write('attrition.json')
+"""
+import os
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from .document import EXTENSIONS, ReportDocument, Section, Table
+from .uncertainty import N_RESAMPLES, attrition_uncertainty
+
+# Categorical dimensions whose attrition count tables are built up front in a single pass
+attrition_dimensions = ['Gender', 'MaritalStatus', 'Department', 'JobRole', 'OverTime', 'BusinessTravel',
+                        'AgeGroup', 'StockOptionLevel', 'JobSatisfaction', 'EnvironmentSatisfaction',
+                        'RelationshipSatisfaction', 'WorkLifeBalance', 'JobInvolvement']
+
+REPORT_FILE = 'HR_Attrition_Report_Text.txt'
+
+SATISFACTION_COLUMNS = ['JobSatisfaction', 'EnvironmentSatisfaction', 'RelationshipSatisfaction',
+                        'WorkLifeBalance', 'JobInvolvement']
+
+# The attrition-by-group tables of Section 2 (Section 5 uses SATISFACTION_COLUMNS)
+ATTRITION_GROUP_COLUMNS = ['Gender', 'MaritalStatus', 'AgeGroup', 'Department', 'JobRole', 'OverTime', 'BusinessTravel']
+
+# Strongest attrition drivers listed in Section 9
+DRIVER_TABLE_ROWS = 15
+
+
+def report_file(fmt='text'):
+    """Default report file name for a format: REPORT_FILE with the format's extension."""
+    extension = next(extension for extension, name in EXTENSIONS.items() if name == fmt)
+    return os.path.splitext(REPORT_FILE)[0] + extension
+
+
+def lookup(data, *key, default=float('nan')):
+    """``data.loc[key]``, or ``default`` when this (slice of the) workforce has no such row or column."""
+    try:
+        return data.loc[key if len(key) > 1 else key[0]]
+    except KeyError:
+        return default
+
+
+def finding(template, *values, heading=None):
+    """``[heading, template.format(*values)]``, or ``[]`` when one of the quoted values is missing (NaN).
+
+    A slice of the workforce may lack the group a finding is about (no Sales department, or
+    no leavers), in which case the finding is left out rather than printed with ``nan``.
+    """
+    if any(pd.isna(value) for value in values):
+        return []
+    return ([heading] if heading is not None else []) + [template.format(*values)]
+
+
+def interval(uncertainty, column, group):
+    """``"a-b%"``: the bootstrap interval of one group's attrition rate."""
+    intervals = uncertainty['intervals']
+    return f"{lookup(intervals, (column, group), 'ci_low'):.2f}-{lookup(intervals, (column, group), 'ci_high'):.2f}%"
+
+
+def _blocks_uncertainty(uncertainty, name):
+    if uncertainty is None:
+        return []
+    return [
+        f"\nStatistical Confidence of the Attrition Rates:",
+        f"{uncertainty['confidence']:.0%} bootstrap confidence intervals of every group's attrition rate ({uncertainty['resamples']:,} resamples of the employees):",
+        Table(f'{name}_intervals', uncertainty['intervals'].round(2)),
+        f"\nPermutation tests of whether attrition differs between the groups at all (chi-square statistic against {uncertainty['resamples']:,} shuffles of the Attrition labels; p-values below 0.05 mark differences unlikely to be chance):",
+        Table(f'{name}_tests', uncertainty['tests'].round(4)),
+    ]
+
+
+def attrition_rates(agg, column):
+    """``agg.rate_table(column)``, with a 0% column for an outcome nobody in the data had (e.g. no leavers)."""
+    table = agg.rate_table(column)
+    missing = [outcome for outcome in ('No', 'Yes') if outcome not in table.columns]
+    return table.assign(**{outcome: 0.0 for outcome in missing}) if missing else table
+
+
+# --- 1. Data Cleaning & Preparation ---
+
+def data_cleaning(agg):
+    """Duplicates, shape, missing values and descriptive statistics of the cleaned data."""
+    missing_counts = agg.missing_counts()
+    return {
+        'duplicates': agg.duplicate_count(),
+        'rows': agg.shape[0],
+        'columns': agg.shape[1],
+        'missing_total': missing_counts.sum(),
+        'missing_counts': missing_counts,
+        'describe': agg.describe(),
+    }
+
+
+def _blocks_data_cleaning(r):
+    lines = [f"\nData Cleaning: Checked for duplicate rows. Found {r['duplicates']} duplicates.",
+             f"\nDataset Overview:",
+             f"The dataset contains {r['rows']} rows (employees) and {r['columns']} columns (attributes) after cleaning.",
+             "\nMissing Values Check:"]
+    if r['missing_total'] == 0:
+        lines.append(f"No missing values detected across all columns.")
+    else:
+        lines.append(f"Found {r['missing_total']} missing values in total. Details per column:\n{r['missing_counts'].to_string()}")
+    lines += ["\nDescriptive Statistics for Numeric Columns:",
+              "Summary of numerical data (e.g., age, income, rates):",
+              Table('describe', r['describe'].T)]
+    return lines
+
+
+# --- 2. Attrition Analysis (Target Focus) ---
+
+def attrition(agg, resamples=N_RESAMPLES):
+    """Overall attrition and attrition by demographics, work features and tenure."""
+    attrition_rate = agg.value_counts('Attrition', normalize=True) * 100
+    return {
+        'attrition_rate_yes': attrition_rate.get('Yes', 0),
+        'attrition_rate_no': attrition_rate.get('No', 0),
+        'by_gender': attrition_rates(agg, 'Gender'),
+        'by_marital_status': attrition_rates(agg, 'MaritalStatus'),
+        'by_age_group': attrition_rates(agg, 'AgeGroup'),
+        'by_department': attrition_rates(agg, 'Department'),
+        'by_job_role': attrition_rates(agg, 'JobRole'),
+        'by_overtime': attrition_rates(agg, 'OverTime'),
+        'by_business_travel': attrition_rates(agg, 'BusinessTravel'),
+        # Mean of each value for leavers ('Yes') and stayers ('No')
+        'distance_from_home': agg.group_mean('DistanceFromHome'),
+        'years_at_company': agg.group_mean('YearsAtCompany'),
+        'years_since_promotion': agg.group_mean('YearsSinceLastPromotion'),
+        'years_with_manager': agg.group_mean('YearsWithCurrManager'),
+        # Bootstrap intervals and permutation tests of the by_* tables above (None without resamples)
+        'uncertainty': attrition_uncertainty(agg, ATTRITION_GROUP_COLUMNS, n_resamples=resamples) if resamples else None,
+    }
+
+
+def _blocks_attrition(r):
+    gender, marital = r['by_gender'], r['by_marital_status']
+    overtime, travel = r['by_overtime'], r['by_business_travel']
+    distance = r['distance_from_home']
+    years_at_company, years_since_promotion, years_with_manager = (
+        r['years_at_company'], r['years_since_promotion'], r['years_with_manager'])
+    uncertainty = r['uncertainty']
+    role_interval = overtime_test = ''
+    if uncertainty is not None:
+        role_interval = f" ({interval(uncertainty, 'JobRole', 'Sales Representative')} at {uncertainty['confidence']:.0%} confidence)"
+        overtime_p = lookup(uncertainty['tests'], 'OverTime', 'p_value')
+        overtime_test = '' if pd.isna(overtime_p) else f"; permutation p = {overtime_p:.4f}"
+    return [
+        f"\nOverall Attrition Rate:",
+        f"A {r['attrition_rate_yes']:.2f}% of employees left the company last year, while {r['attrition_rate_no']:.2f}% remained. This matches the overall industry rate of 16.12%.",
+        "\nAttrition by Demographics:",
+        *finding("\n- Gender Impact: Males show a slightly higher attrition rate of {:.2f}% compared to females at {:.2f}%.",
+                 lookup(gender, 'Male', 'Yes'), lookup(gender, 'Female', 'Yes')),
+        *finding("\n- Marital Status Impact: Single employees have an attrition rate of {:.2f}%. This is more than double the rate for married employees ({:.2f}%) and higher than divorced employees ({:.2f}%).",
+                 lookup(marital, 'Single', 'Yes'), lookup(marital, 'Married', 'Yes'), lookup(marital, 'Divorced', 'Yes')),
+        f"\n- Age Group Attrition:",
+        *finding("The youngest group (18-30 years) exhibits the highest attrition at {:.2f}%, indicating challenges in retaining early-career talent.",
+                 lookup(r['by_age_group'], '18-30', 'Yes')),
+        Table('by_age_group', r['by_age_group']),
+        "\nAttrition by Work-Related Features:",
+        *finding("\n- Department Turnover: The Sales department has the highest attrition rate at {:.2f}%, closely followed by Human Resources. Research & Development has the lowest.",
+                 lookup(r['by_department'], 'Sales', 'Yes')),
+        Table('by_department', r['by_department']),
+        *finding("\n- Job Role Turnover: Sales Representatives face an attrition rate of {:.2f}%, making it the role with the highest turnover{}.",
+                 lookup(r['by_job_role'], 'Sales Representative', 'Yes'), role_interval),
+        Table('by_job_role', r['by_job_role'].sort_values(by='Yes', ascending=False)),
+        *finding("\n- Overtime Impact: Employees working overtime are significantly more likely to leave ({:.2f}% attrition) compared to those who don't ({:.2f}% attrition{}). This points to potential burnout or work-life balance issues.",
+                 lookup(overtime, 'Yes', 'Yes'), lookup(overtime, 'No', 'Yes'), overtime_test),
+        *finding("\n- Business Travel Frequency: Employees who travel frequently have a notably higher attrition rate ({:.2f}%).",
+                 lookup(travel, 'Travel_Frequently', 'Yes')),
+        Table('by_business_travel', travel),
+        *finding("\n- Commute Distance vs Attrition: Employees who left had an average commute of {:.2f} miles, while those who stayed averaged {:.2f} miles. Longer commutes appear to correlate with higher attrition.",
+                 lookup(distance, 'Yes'), lookup(distance, 'No')),
+        "\nAttrition by Seniority & Tenure:",
+        *finding("\n- Years At Company: Leavers had significantly less tenure ({:.2f} years) compared to stayers ({:.2f} years).",
+                 lookup(years_at_company, 'Yes'), lookup(years_at_company, 'No')),
+        *finding("- Years Since Last Promotion: Those who left had, on average, fewer years since their last promotion ({:.2f} years) than those who stayed ({:.2f} years).",
+                 lookup(years_since_promotion, 'Yes'), lookup(years_since_promotion, 'No')),
+        *finding("- Years With Current Manager: Leavers spent less time with their current manager ({:.2f} years) than stayers ({:.2f} years). This suggests a link between career progression, managerial relationships, and retention.",
+                 lookup(years_with_manager, 'Yes'), lookup(years_with_manager, 'No')),
+        *_blocks_uncertainty(uncertainty, 'attrition'),
+    ]
+
+
+# --- 3. Workforce Demographics ---
+
+def demographics(agg):
+    """Age, gender, education, marital status, department, role and travel distributions."""
+    return {
+        'age': agg.describe('Age'),
+        'gender_counts': agg.value_counts('Gender'),
+        'gender_ratios': agg.value_counts('Gender', normalize=True) * 100,
+        'education': agg.value_counts('Education', normalize=True) * 100,
+        'marital_status': agg.value_counts('MaritalStatus'),
+        'department': agg.value_counts('Department'),
+        'job_role': agg.value_counts('JobRole'),
+        'business_travel': agg.value_counts('BusinessTravel'),
+    }
+
+
+def _blocks_demographics(r):
+    age, gender_counts, gender_ratios = r['age'], r['gender_counts'], r['gender_ratios']
+    marital, department, job_role, travel = r['marital_status'], r['department'], r['job_role'], r['business_travel']
+    return [
+        "\nWorkforce Age Distribution:",
+        f"The average employee age is {age['mean']:.2f} years, with a median of {age['50%']:.0f} years. The workforce ranges from {age['min']:.0f} to {age['max']:.0f} years old.",
+        Table('age', age),
+        "\nGender Breakdown:",
+        *finding("Our workforce is composed of {:.2f}% Male employees ({} individuals) and {:.2f}% Female employees ({} individuals).",
+                 lookup(gender_ratios, 'Male'), lookup(gender_counts, 'Male', default=0),
+                 lookup(gender_ratios, 'Female'), lookup(gender_counts, 'Female', default=0)),
+        "\nEducation Level Distribution:",
+        "The majority of employees hold a Bachelor's degree.",
+        Table('education', r['education']),
+        "\nMarital Status Distribution:",
+        f"Our workforce is primarily Married ({lookup(marital, 'Married', default=0)} employees), followed by Single ({lookup(marital, 'Single', default=0)}) and Divorced ({lookup(marital, 'Divorced', default=0)}).",
+        Table('marital_status', marital),
+        "\nDepartment Composition:",
+        f"The largest department is Research & Development ({lookup(department, 'Research & Development', default=0)} employees).",
+        Table('department', department),
+        "\nJob Role Composition:",
+        f"The most common roles are Sales Executive ({lookup(job_role, 'Sales Executive', default=0)} employees) and Research Scientist ({lookup(job_role, 'Research Scientist', default=0)} employees).",
+        Table('job_role', job_role),
+        "\nBusiness Travel Frequency Distribution:",
+        f"Most employees travel Rarely ({lookup(travel, 'Travel_Rarely', default=0)} employees), while a smaller portion travel Frequently or Not at all.",
+        Table('business_travel', travel),
+    ]
+
+
+# --- 4. Compensation & Career Progression ---
+
+def compensation(agg):
+    """Income by level, department and role; rates, salary hikes, stock options and experience."""
+    return {
+        'income_by_job_level': agg.group_describe('MonthlyIncome', 'JobLevel'),
+        'income_by_department': agg.group_describe('MonthlyIncome', 'Department'),
+        'income_by_job_role': agg.group_describe('MonthlyIncome', 'JobRole'),
+        'hourly_rate': agg.describe('HourlyRate'),
+        'monthly_rate': agg.describe('MonthlyRate'),
+        'percent_salary_hike': agg.group_mean('PercentSalaryHike'),
+        'stock_option_distribution': agg.value_counts('StockOptionLevel', normalize=True) * 100,
+        'stock_option_attrition': attrition_rates(agg, 'StockOptionLevel'),
+        'working_years_income_corr': agg.corr('TotalWorkingYears', 'MonthlyIncome'),
+    }
+
+
+def _blocks_compensation(r):
+    hike, stock_options, stock_attrition = r['percent_salary_hike'], r['stock_option_distribution'], r['stock_option_attrition']
+    return [
+        "\nMonthly Income by Job Level:",
+        "As expected, monthly income shows a clear upward trend with increasing job level.",
+        Table('income_by_job_level', r['income_by_job_level']),
+        "\nMonthly Income by Department:",
+        *finding("The highest average monthly income is observed in the Sales department (${:.2f}), despite its higher attrition.",
+                 lookup(r['income_by_department'], 'Sales', 'mean')),
+        Table('income_by_department', r['income_by_department']),
+        "\nMonthly Income by Job Role:",
+        f"Managers and Research Directors command the highest average monthly incomes, while Sales Representatives and Laboratory Technicians are among the lowest paid roles.",
+        Table('income_by_job_role', r['income_by_job_role']),
+        "\nHourly Rate Distribution:",
+        Table('hourly_rate', r['hourly_rate']),
+        "\nMonthly Rate Distribution:",
+        Table('monthly_rate', r['monthly_rate']),
+        *finding("There's very little difference in average salary hike between employees who stayed ({:.2f}%) and those who left ({:.2f}%). This suggests that a recent percentage salary hike alone may not be a primary driver for retention.",
+                 lookup(hike, 'No'), lookup(hike, 'Yes'), heading="\nPercent Salary Hike vs. Attrition:"),
+        *finding("{:.2f}% of employees have no stock options (Level 0), and this group has a significantly higher attrition rate ({:.2f}%). Employees with Level 1 or 2 stock options show much lower attrition.",
+                 lookup(stock_options, 0), lookup(stock_attrition, 0, 'Yes'), heading="\nStock Option Level Distribution & Impact:"),
+        "\nStock Option Level Distribution:",
+        Table('stock_option_distribution', stock_options),
+        "\nAttrition by Stock Option Level:",
+        Table('stock_option_attrition', stock_attrition),
+        *finding("There's a strong positive correlation of {:.2f} between Total Working Years and Monthly Income. This confirms a healthy career progression pathway where experience generally leads to higher earnings.",
+                 r['working_years_income_corr'], heading="\nCareer Progression: Total Working Years vs. Monthly Income Correlation:"),
+    ]
+
+
+# --- 5. Satisfaction & Engagement Analysis ---
+
+def satisfaction(agg, resamples=N_RESAMPLES):
+    """Satisfaction and engagement distributions, their attrition rates, and links to role and pay."""
+    return {
+        'distributions': {column: agg.value_counts(column) for column in SATISFACTION_COLUMNS},
+        'attrition': {column: attrition_rates(agg, column) for column in SATISFACTION_COLUMNS},
+        'job_role_vs_job_satisfaction': agg.crosstab('JobRole', 'JobSatisfaction', normalize=False),
+        'income_by_job_satisfaction': agg.group_describe('MonthlyIncome', 'JobSatisfaction'),
+        'uncertainty': attrition_uncertainty(agg, SATISFACTION_COLUMNS, n_resamples=resamples) if resamples else None,
+    }
+
+
+def _blocks_satisfaction(r):
+    distributions, rates = r['distributions'], r['attrition']
+    job_sat, env_sat, rel_sat = rates['JobSatisfaction'], rates['EnvironmentSatisfaction'], rates['RelationshipSatisfaction']
+    wl_balance, involvement = rates['WorkLifeBalance'], rates['JobInvolvement']
+    job_sat_test = ''
+    if r['uncertainty'] is not None:
+        job_sat_p = lookup(r['uncertainty']['tests'], 'JobSatisfaction', 'p_value')
+        job_sat_test = '' if pd.isna(job_sat_p) else f"; permutation p = {job_sat_p:.4f}"
+    return [
+        "\nDistribution of Key Satisfaction & Engagement Variables:",
+        "\nJob Satisfaction Distribution:",
+        Table('JobSatisfaction_distribution', distributions['JobSatisfaction']),
+        "\nEnvironment Satisfaction Distribution:",
+        Table('EnvironmentSatisfaction_distribution', distributions['EnvironmentSatisfaction']),
+        "\nRelationship Satisfaction Distribution:",
+        Table('RelationshipSatisfaction_distribution', distributions['RelationshipSatisfaction']),
+        "\nWork-Life Balance Distribution:",
+        Table('WorkLifeBalance_distribution', distributions['WorkLifeBalance']),
+        "\nJob Involvement Distribution:",
+        Table('JobInvolvement_distribution', distributions['JobInvolvement']),
+        "\nAttrition vs. Satisfaction Levels:",
+        f"Generally, lower satisfaction levels correlate with higher attrition.",
+        *finding("\n- Job Satisfaction vs. Attrition: Employees with 'Low' Job Satisfaction have an attrition rate of {:.2f}%, significantly higher than those with 'Very High' satisfaction ({:.2f}%{}).",
+                 lookup(job_sat, 'Low', 'Yes'), lookup(job_sat, 'Very High', 'Yes'), job_sat_test),
+        Table('JobSatisfaction_attrition', job_sat),
+        *finding("\n- Environment Satisfaction vs. Attrition: Similar to job satisfaction, 'Low' Environment Satisfaction sees {:.2f}% attrition.",
+                 lookup(env_sat, 'Low', 'Yes')),
+        Table('EnvironmentSatisfaction_attrition', env_sat),
+        *finding("\n- Relationship Satisfaction vs. Attrition: 'Low' Relationship Satisfaction leads to {:.2f}% attrition.",
+                 lookup(rel_sat, 'Low', 'Yes')),
+        Table('RelationshipSatisfaction_attrition', rel_sat),
+        *finding("\n- Work-Life Balance vs. Attrition: A 'Bad' Work-Life Balance is associated with the highest attrition at {:.2f}%.",
+                 lookup(wl_balance, 'Bad', 'Yes')),
+        Table('WorkLifeBalance_attrition', wl_balance),
+        *finding("\n- Job Involvement vs. Attrition: 'Low' Job Involvement has a high attrition rate of {:.2f}%, indicating disengagement is a significant factor.",
+                 lookup(involvement, 'Low', 'Yes')),
+        Table('JobInvolvement_attrition', involvement),
+        "\nJob Role vs. Job Satisfaction (Counts):",
+        "Examining satisfaction levels across different job roles can highlight specific areas of concern:",
+        Table('job_role_vs_job_satisfaction', r['job_role_vs_job_satisfaction']),
+        "\nMonthly Income by Job Satisfaction Level (Summary Stats):",
+        "There isn't a strong direct correlation between income level and job satisfaction. Employees across all satisfaction levels show similar income ranges.",
+        Table('income_by_job_satisfaction', r['income_by_job_satisfaction']),
+        *_blocks_uncertainty(r['uncertainty'], 'satisfaction'),
+    ]
+
+
+# --- 6. Performance & Development ---
+
+def performance(agg):
+    """Performance ratings, training, promotions, manager tenure and involvement vs rating."""
+    return {
+        'performance_rating': agg.value_counts('PerformanceRating'),
+        'training': agg.describe('TrainingTimesLastYear'),
+        'training_by_attrition': agg.group_mean('TrainingTimesLastYear'),
+        'years_since_promotion': agg.group_mean('YearsSinceLastPromotion'),
+        'years_with_manager': agg.group_mean('YearsWithCurrManager'),
+        # Categorical columns are correlated through their numerical category codes
+        'involvement_performance_corr': agg.corr('JobInvolvement', 'PerformanceRating'),
+    }
+
+
+def _blocks_performance(r):
+    ratings, training, training_by_attrition = r['performance_rating'], r['training'], r['training_by_attrition']
+    promotion, manager = r['years_since_promotion'], r['years_with_manager']
+    return [
+        "\nPerformance Rating Distribution:",
+        f"The majority of employees ({lookup(ratings, 'Good', default=0)} individuals) are rated as 'Good', with {lookup(ratings, 'Outstanding', default=0)} rated 'Outstanding'. The distribution is skewed towards higher ratings.",
+        Table('performance_rating', ratings),
+        "\nTraining Times Last Year & Attrition Impact:",
+        *finding("Employees received training an average of {:.2f} times last year. Interestingly, those who stayed received slightly more training ({:.2f} times) than those who left ({:.2f} times).",
+                 training['mean'], lookup(training_by_attrition, 'No'), lookup(training_by_attrition, 'Yes')),
+        Table('training', training),
+        *finding("Employees who left had, on average, fewer years since their last promotion ({:.2f} years) compared to those who stayed ({:.2f} years). This suggests that slower career progression is a factor in attrition.",
+                 lookup(promotion, 'Yes'), lookup(promotion, 'No'), heading="\nYears Since Last Promotion vs. Attrition:"),
+        *finding("Leavers spent significantly less time with their current manager ({:.2f} years) than stayers ({:.2f} years). Frequent manager changes or shorter tenures with managers could contribute to attrition.",
+                 lookup(manager, 'Yes'), lookup(manager, 'No'), heading="\nYears With Current Manager vs. Attrition:"),
+        *finding("The correlation between Job Involvement and Performance Rating is {:.2f}. This very weak correlation suggests that an employee's perceived involvement in their job doesn't strongly predict their formal performance rating in this dataset.",
+                 r['involvement_performance_corr'], heading="\nCorrelation: Job Involvement vs. Performance Rating:"),
+    ]
+
+
+# --- 7. Advanced Attrition Prediction ---
+
+def prediction(agg, df=None, model_workers=None, train_models=True):
+    """Cross-validated attrition models (see modeling.py), or the reason they were skipped."""
+    from .modeling import N_FOLDS, evaluate_models  # scikit-learn is only loaded for this section
+
+    # Models need the row-level frame, so like the charts they are skipped in streaming and incremental runs
+    if df is None:
+        return {'skipped': "Model training was skipped: it needs the row-level data, which this run only kept as aggregates."}
+    if not train_models:
+        return {'skipped': "Model training was skipped for this run."}
+    if agg.value_counts('Attrition').min() < N_FOLDS:
+        return {'skipped': f"Model training was skipped: stratified {N_FOLDS}-fold cross-validation needs at least {N_FOLDS} leavers and {N_FOLDS} stayers."}
+    # Every (model, fold) fit runs in parallel across cores unless model_workers=1 (serial fallback)
+    results = evaluate_models(df, max_workers=model_workers)
+    return {'n_folds': N_FOLDS, 'best_model': results['scores'].index[0], **results}
+
+
+def _blocks_prediction(r):
+    if 'skipped' in r:
+        return [r['skipped']]
+    scores, best_model = r['scores'], r['best_model']
+    return [
+        f"Categorical features were one-hot encoded into a sparse matrix and numeric features standardized. "
+        f"{len(scores)} models were compared with stratified {r['n_folds']}-fold cross-validation "
+        f"(mean of the held-out folds; timings are seconds per fold).",
+        Table('scores', scores.round(4)),
+        f"\n{best_model} achieves the highest ROC-AUC ({scores.loc[best_model, 'roc_auc']:.2f}), "
+        f"with a recall of {scores.loc[best_model, 'recall']:.2%} on employees who left.",
+        f"\nStrongest predictors of attrition ({best_model}, averaged across folds):",
+        Table('importances', r['importances'][best_model].head(10).round(4).rename('importance')),
+    ]
+
+
+# --- 8. Visualizations ---
+
+def visualizations(agg, df=None):
+    """Specs of the Section 8 charts (rendered by the caller); none without the row-level frame."""
+    if df is None:
+        return {'charts': [], 'chart_files': []}
+    from .charts import build_chart_specs  # matplotlib/seaborn are only loaded when charts are requested
+    specs = build_chart_specs(df, agg)
+    return {'charts': specs, 'chart_files': [spec.filename for spec in specs]}
+
+
+def _blocks_visualizations(r):
+    return []
+
+
+# --- 9. Insights & HR Recommendations ---
+
+def recommendations(agg, df=None):
+    """Attrition drivers ranked over every column, and the HR recommendations drawn from the sections above."""
+    from .drivers import rank_drivers, rank_tables
+
+    # Every categorical and binned numeric column of the row-level frame; streaming and incremental
+    # runs only keep count tables, so they rank the categorical report dimensions
+    if df is None:
+        return {'drivers': rank_tables({column: agg.counts(column) for column in attrition_dimensions}), 'scope': 'dimensions'}
+    return {'drivers': rank_drivers(df), 'scope': 'columns'}
+
+
+def _blocks_recommendations(r):
+    drivers = r['drivers']
+    top = drivers.head(DRIVER_TABLE_ROWS)
+    scope = ("every categorical and numeric column (numeric columns in up to 10 quantile bins)" if r['scope'] == 'columns'
+             else "the categorical report dimensions (the row-level columns are not kept in this run)")
+    return [
+        "This final section synthesizes all the analysis into actionable insights and recommendations. Here are examples of how you would articulate these points based on the data generated above:",
+        "\nAttrition Drivers Ranked:",
+        f"Ranking {scope} by mutual information with Attrition, the strongest drivers are {', '.join(top.index[:3])}. "
+        f"For each column, the riskiest group (holding at least 2% of the employees) is listed with its attrition rate:",
+        Table('drivers', top.round(4)),
+        "\nKey Attrition Risk Groups:",
+        "- Young, Single Employees: This demographic (especially 18-30 year olds) consistently shows higher attrition rates. Targeted mentorship, career development plans, and community-building initiatives could be beneficial.",
+        "- Sales Representatives & Laboratory Technicians: These roles experience unusually high turnover. Investigate workload, compensation equity, and career path clarity within these departments.",
+        "- Employees Working Overtime/Long Commutes: High overtime and longer commute distances correlate with higher attrition. Review staffing levels, flexible work options, and commute support programs.",
+        "- Employees with Low Satisfaction or Stock Options: Low job/environment satisfaction and lack of stock options are strong indicators of potential attrition. Implement regular satisfaction surveys, address feedback promptly and review stock option eligibility.",
+        "\nCompensation & Career Progression Considerations:",
+        "- While income generally increases with job level, ensure compensation is competitive specifically for high-risk roles like Sales Representatives and Laboratory Technicians, where attrition is high despite potentially lower pay relative to other roles.",
+        "- Promotions & Managerial Relationships: Employees with shorter tenures in their current role/company and less time with their current manager are more prone to attrition. Focus on clear promotion pathways and training for managers to build strong, supportive relationships with their teams.",
+        "- Work-Life Balance Initiatives: Implement policies that promote better work-life balance, such as flexible hours, remote work options, or caps on overtime, especially for roles prone to burnout.",
+        "- Managerial Training: Equip managers with skills to foster employee engagement, provide regular feedback and support career growth to improve retention within their teams.",
+        "- Review Compensation Structure: Conduct a deeper dive into compensation fairness, particularly for roles and demographics identified as high-risk, and consider adjustments where inequities exist.",
+        "- Enhance Satisfaction Drivers: Actively address factors contributing to low job and environment satisfaction through direct feedback mechanisms and actionable improvements.",
+    ]
+
+
+# Section key -> (heading, compute function, block builder), in report order
+SECTIONS = {
+    'cleaning': ('1. Data Cleaning & Preparation', data_cleaning, _blocks_data_cleaning),
+    'attrition': ('2. Attrition Analysis (Target Focus)', attrition, _blocks_attrition),
+    'demographics': ('3. Workforce Demographics', demographics, _blocks_demographics),
+    'compensation': ('4. Compensation & Career Progression', compensation, _blocks_compensation),
+    'satisfaction': ('5. Satisfaction & Engagement Analysis', satisfaction, _blocks_satisfaction),
+    'performance': ('6. Performance & Development', performance, _blocks_performance),
+    'prediction': ('7. Advanced Attrition Prediction', prediction, _blocks_prediction),
+    'visualizations': ('8. Visualizations', visualizations, _blocks_visualizations),
+    'recommendations': ('9. Insights & HR Recommendations', recommendations, _blocks_recommendations),
+}
+# Sections that also need the row-level frame (and their extra options)
+ROW_LEVEL_SECTIONS = {'prediction', 'visualizations', 'recommendations'}
+# Sections with bootstrap/permutation tables, which take the number of resamples
+RESAMPLED_SECTIONS = {'attrition', 'satisfaction'}
+
+
+def run_report(df, agg, sections=None, model_workers=None, train_models=True, instrumentation=None,
+               resamples=N_RESAMPLES):
+    """Compute the requested sections (default: all) in report order; ``{key: results}``.
+
+    With an ``Instrumentation`` (see instrumentation.py), every section is recorded as a stage.
+    ``resamples=0`` leaves the uncertainty tables out of Sections 2 and 5.
+    """
+    unknown = set(sections or ()) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown report sections {sorted(unknown)}; choose from {list(SECTIONS)}")
+    results = {}
+    for key, (_, compute, _) in SECTIONS.items():
+        if sections is not None and key not in sections:
+            continue
+        with instrumentation.stage(f'section:{key}', 'section', rows=agg.shape[0]) if instrumentation else nullcontext():
+            results[key] = _compute_section(key, compute, df, agg, model_workers, train_models, resamples)
+    return results
+
+
+def _compute_section(key, compute, df, agg, model_workers, train_models, resamples):
+    if key == 'prediction':
+        return compute(agg, df, model_workers=model_workers, train_models=train_models)
+    if key in ROW_LEVEL_SECTIONS:
+        return compute(agg, df)
+    if key in RESAMPLED_SECTIONS:
+        return compute(agg, resamples=resamples)
+    return compute(agg)
+
+
+def _is_value(value):
+    return np.isscalar(value) or (isinstance(value, list) and all(np.isscalar(item) for item in value))
+
+
+def _tables(section_results):
+    """Every DataFrame/Series of a section's results as a Table; nested dicts are named ``<name>_<key>``."""
+    tables = []
+    for name, value in section_results.items():
+        items = value.items() if isinstance(value, dict) else [(None, value)]
+        tables += [Table(name if sub is None else f"{name}_{sub}", frame) for sub, frame in items
+                   if isinstance(frame, (pd.DataFrame, pd.Series))]
+    return tables
+
+
+def build_section(key, section_results):
+    """The ``Section`` of one computed section: its paragraphs and tables, plus all its results as data."""
+    title, _, blocks = SECTIONS[key]
+    values = {name: value for name, value in section_results.items() if _is_value(value)}
+    return Section(key, title, blocks(section_results), values, _tables(section_results))
+
+
+def build_report(results, title=None):
+    """A ``ReportDocument`` of ``run_report`` results, ready to render as text, Markdown, JSON or HTML."""
+    return ReportDocument([build_section(key, section_results) for key, section_results in results.items()], title)
+
+
+def format_report(results, fmt='text', title=None):
+    return build_report(results, title).render(fmt)
+
+
+def write_report(df, agg, output, model_workers=None, train_models=True, sections=None, fmt=None, title=None,
+                 resamples=N_RESAMPLES):
+    """Compute the report, write it to ``output`` in one write and return what the caller still has to run.
+
+    ``df`` is the cleaned row-level frame (None in streaming mode, where models and charts are
+    skipped) and ``agg`` the matching aggregate source. ``output`` is a path (the format follows
+    its extension unless ``fmt`` is given) or an open file. Returns ``{'charts': [ChartSpec, ...],
+    'models': evaluate_models() result or None, 'results': run_report() results, 'document':
+    ReportDocument}``; the caller renders the charts. Used by the CLI, by segments.py for every
+    workforce slice and by incremental.py. ``resamples`` is passed on to ``run_report``.
+    """
+    results = run_report(df, agg, sections, model_workers=model_workers, train_models=train_models, resamples=resamples)
+    document = build_report(results, title)
+    document.write(output, fmt)
+    model_results = results.get('prediction', {})
+    return {'charts': results.get('visualizations', {}).get('charts', []),
+            'models': None if 'skipped' in model_results or not model_results else model_results,
+            'results': results, 'document': document}
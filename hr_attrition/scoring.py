@@ -0,0 +1,92 @@
+"""Batch attrition-risk scoring of employee files, with a small command-line interface.
+
+``train`` fits one of the Section 7 candidate pipelines on the full cleaned dataset and saves
+it. ``score`` streams an employee CSV (the same layout as DATA_FILE, with or without the
+Attrition column) through ``cleaning.read_clean`` in chunks. Each chunk is encoded and scored
+with one vectorized ``predict_proba`` call and appended to the output CSV, so memory stays
+constant however large the file is.
+
+Training and scoring share the same code path: both run ``cleaning.clean`` and the saved
+pipeline's encoder. The saved model records the cleaning fingerprint it was trained under
+(see frame_cache.py), and scoring refuses to run once the cleaning rules have changed.
+
+    python -m hr_attrition.scoring train --model "Logistic Regression"
+    python -m hr_attrition.scoring score employees.csv risk_scores.csv --chunksize 100000
+"""
+import argparse
+import pickle
+import time
+
+from .cleaning import DATA_FILE, ID_COLUMN, read_clean
+from .frame_cache import cleaning_fingerprint, load_clean
+from .modeling import candidate_models, feature_frame, features, make_pipeline
+
+MODEL_FILE = 'attrition_model.pkl'
+SCORE_COLUMN = 'AttritionRisk'
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def train_model(path=DATA_FILE, model_name='Logistic Regression', model_path=MODEL_FILE):
+    """Fit the named candidate pipeline on every row of ``path`` and save it to ``model_path``."""
+    X, y = feature_frame(load_clean(path))
+    pipeline = make_pipeline(X, candidate_models()[model_name]).fit(X, y)
+    with open(model_path, 'wb') as model_file:
+        pickle.dump({'name': model_name, 'pipeline': pipeline, 'cleaning': cleaning_fingerprint()}, model_file)
+    return pipeline
+
+
+def load_model(model_path=MODEL_FILE):
+    """Load a saved pipeline, checking it was trained under the current cleaning rules."""
+    with open(model_path, 'rb') as model_file:
+        saved = pickle.load(model_file)
+    if saved['cleaning'] != cleaning_fingerprint():
+        raise ValueError(f"{model_path} was trained under different cleaning rules; retrain it with "
+                         f"'python -m hr_attrition.scoring train' before scoring")
+    return saved['pipeline']
+
+
+def score_file(input_path, output_path, model_path=MODEL_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    """Write ``EmployeeNumber,AttritionRisk`` for every row of ``input_path`` to ``output_path``.
+
+    Returns ``{'rows', 'seconds', 'rows_per_second'}`` for the whole run.
+    """
+    pipeline = load_model(model_path)
+    rows = 0
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='') as output:
+        for chunk in read_clean(input_path, chunksize=chunksize, index_col=ID_COLUMN):
+            risk = pipeline.predict_proba(features(chunk))[:, 1]
+            scores = chunk.index.to_frame(index=False).assign(**{SCORE_COLUMN: risk.round(6)})
+            scores.to_csv(output, header=rows == 0, index=False)
+            rows += len(chunk)
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else float('inf')}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train = commands.add_parser('train', help='fit a model on the historical dataset and save it')
+    train.add_argument('--data', default=DATA_FILE, help='training CSV (default: %(default)s)')
+    train.add_argument('--model', default='Logistic Regression', choices=list(candidate_models()))
+    train.add_argument('--output', default=MODEL_FILE, help='where to save the model (default: %(default)s)')
+
+    score = commands.add_parser('score', help='write per-employee attrition risk for a CSV')
+    score.add_argument('input', help='employee CSV with the same columns as the training data')
+    score.add_argument('output', help='CSV to write EmployeeNumber,AttritionRisk rows to')
+    score.add_argument('--model', default=MODEL_FILE, help='saved model (default: %(default)s)')
+    score.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='rows per batch (default: %(default)s)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'train':
+        train_model(args.data, args.model, args.output)
+        print(f"Saved {args.model} trained on {args.data} to {args.output}.")
+    else:
+        summary = score_file(args.input, args.output, args.model, args.chunksize)
+        print(f"Scored {summary['rows']} employees in {summary['seconds']:.2f} s "
+              f"({summary['rows_per_second']:,.0f} rows/s) into {args.output}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Segmented reports: the full analysis for every Department, JobRole and Department x JobLevel slice.
+
+The cleaned frame is loaded once and partitioned once: one groupby per segmentation yields
+the row positions of every slice. The frame is sent to each pool worker a single time through
+the pool initializer, and tasks carry only a slice's key and row positions. Each worker builds
+that slice's aggregates, writes its text report and renders its charts serially (the pool
+already keeps every core busy) into its own directory. ``--resamples 0`` leaves the bootstrap and
+permutation tables of Sections 2 and 5 out of every slice report:
+
+    segments/Department/Sales/HR_Attrition_Report_Text.txt
+    segments/JobRole/Sales_Representative/...
+    segments/Department_x_JobLevel/Research_Development/2/...
+
+    python -m hr_attrition.segments --output-dir segments --workers 4
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import seaborn as sns
+
+from . import report
+from .aggregates import AggregateCache
+from .chart_engine import FIGURES, render_chart
+from .cleaning import DATA_FILE
+from .document import FORMATS
+from .frame_cache import load_clean
+from .instrumentation import current_rss
+from .uncertainty import N_RESAMPLES
+
+DEFAULT_OUTPUT_DIR = 'segments'
+SEGMENTATIONS = [('Department',), ('JobRole',), ('Department', 'JobLevel')]
+
+
+def slice_dir(output_dir, columns, values):
+    """``output_dir/<columns joined by _x_>/<one path component per value>``."""
+    parts = [re.sub(r'[^0-9A-Za-z]+', '_', str(value)).strip('_') for value in values]
+    return os.path.join(output_dir, '_x_'.join(columns), *parts)
+
+
+def partition(df, segmentations=SEGMENTATIONS):
+    """``[(columns, values, row_positions), ...]`` for every non-empty slice of every segmentation."""
+    slices = []
+    for columns in segmentations:
+        for values, positions in df.groupby(list(columns), observed=True, sort=True).indices.items():
+            values = values if isinstance(values, tuple) else (values,)
+            slices.append((columns, values, positions))
+    return slices
+
+
+# Worker-side copy of the cleaned frame, installed once per process by _init_worker
+_FRAME = {}
+
+
+def _init_worker(df):
+    _FRAME['df'] = df
+    sns.set_style("whitegrid")
+
+
+def write_slice(columns, values, positions, output_dir, train_models=True, fmt='text', resamples=N_RESAMPLES):
+    """Write the report and charts of one slice; returns its row/chart counts and timing."""
+    start = time.perf_counter()
+    df = _FRAME['df'].iloc[positions]
+    directory = slice_dir(output_dir, columns, values)
+    os.makedirs(directory, exist_ok=True)
+
+    agg = AggregateCache(df, dimensions=report.attrition_dimensions)
+    title = f"Segment: {', '.join(f'{column} = {value}' for column, value in zip(columns, values))}"
+    results = report.write_report(df, agg, os.path.join(directory, report.report_file(fmt)), model_workers=1,
+                                  train_models=train_models, fmt=fmt, title=title, resamples=resamples)
+    for spec in results['charts']:
+        render_chart(spec, directory)
+    return {'directory': directory, 'rows': len(df), 'charts': len(results['charts']),
+            'seconds': time.perf_counter() - start, 'worker': os.getpid(),
+            'peak_rss': max(FIGURES.peak_rss, current_rss())}
+
+
+def run_segments(df, output_dir=DEFAULT_OUTPUT_DIR, segmentations=SEGMENTATIONS, max_workers=None,
+                 train_models=True, fmt='text', resamples=N_RESAMPLES):
+    """Write every slice's report and charts, fanning the slices out to a process pool.
+
+    ``max_workers=None`` uses every core and ``max_workers=1`` runs the slices serially in
+    this process. ``resamples`` is passed to every slice report (0 leaves out the uncertainty
+    tables). Returns a throughput summary dict.
+    """
+    start = time.perf_counter()
+    slices = partition(df, segmentations)
+    tasks = [(columns, values, positions, output_dir, train_models, fmt, resamples)
+             for columns, values, positions in slices]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(df)
+        results = [write_slice(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_init_worker, initargs=(df,)) as pool:
+            results = list(pool.map(write_slice, *zip(*tasks)))
+    seconds = time.perf_counter() - start
+
+    rows = sum(result['rows'] for result in results)
+    charts = sum(result['charts'] for result in results)
+    return {'slices': len(results), 'rows': rows, 'charts': charts, 'seconds': seconds,
+            'slices_per_second': len(results) / seconds, 'charts_per_second': charts / seconds,
+            'workers': len({result['worker'] for result in results}),
+            'peak_rss': max((result['peak_rss'] for result in results), default=0),
+            'slowest': max(results, key=lambda result: result['seconds'], default=None)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--data', default=DATA_FILE, help='employee CSV (default: %(default)s)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='root of the per-slice tree (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores; 1 = serial)')
+    parser.add_argument('--skip-models', action='store_true', help='leave out the Section 7 model sweep per slice')
+    parser.add_argument('--format', choices=FORMATS, default='text', help='report format of every slice (default: %(default)s)')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES,
+                        help='resamples of the Section 2 and 5 uncertainty tables per slice, 0 to leave them out (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    summary = run_segments(load_clean(args.data), args.output_dir, max_workers=args.workers,
+                           train_models=not args.skip_models, fmt=args.format, resamples=args.resamples)
+    print(f"Wrote {summary['slices']} slice reports and {summary['charts']} charts ({summary['rows']} slice rows) "
+          f"to {args.output_dir}/ in {summary['seconds']:.1f} s on {summary['workers']} worker(s): "
+          f"{summary['slices_per_second']:.2f} slices/s, {summary['charts_per_second']:.1f} charts/s, "
+          f"peak worker RSS {summary['peak_rss'] / 2**20:.1f} MB.")
+    if summary['slowest']:
+        print(f"Slowest slice: {summary['slowest']['directory']} ({summary['slowest']['seconds']:.1f} s).")
+
+
+if __name__ == '__main__':
+    main()
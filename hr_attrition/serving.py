@@ -0,0 +1,241 @@
+"""Local HTTP service answering single-employee and micro-batched attrition-risk requests.
+
+The saved model (see scoring.py) is loaded once at start-up. For the linear model, the
+fitted encoder and coefficients are then folded into plain lookup tables: every category
+value maps straight to its logit contribution, and every numeric column to one weight plus
+a constant folded into the intercept. Answering a request is then a few dict lookups and a
+dot product, with no DataFrame or sklearn overhead. Other models go through the saved
+pipeline, on a one-row (or micro-batch) frame typed with the cleaning schema.
+
+Records are JSON objects with the raw CSV fields. The ordinal fields (Education, the
+satisfaction fields, WorkLifeBalance, PerformanceRating, JobInvolvement) accept either the
+raw code or its label from the cleaning maps (``education_map``, ``satisfaction_map``,
+``worklife_balance_map``, ``performance_map``).
+
+    python -m hr_attrition.serving --port 8765
+    curl -s localhost:8765/predict -d '{"Age": 35, "OverTime": "Yes", ...}'
+    curl -s localhost:8765/metrics
+
+``POST /predict`` takes one record (``{"risk": ...}``) or a list (``{"risks": [...]}``);
+``GET /metrics`` returns request counts and the latency histogram with p50/p90/p99 of every
+prediction request, overall and per response status (errors included).
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from . import cleaning
+from .modeling import EXCLUDED_FEATURES
+from .scoring import MODEL_FILE, load_model
+
+DEFAULT_PORT = 8765
+# Latency buckets: powers of two from 16 µs up to ~1 s (upper bounds, in seconds)
+LATENCY_BUCKETS = [2 ** exponent * 1e-6 for exponent in range(4, 21)]
+# Raw fields every record must carry, whichever scorer answers it
+FEATURE_COLUMNS = [column for column in cleaning.SCHEMA if column not in EXCLUDED_FEATURES]
+
+
+def check_fields(records):
+    """Raise ``KeyError`` naming the first of ``FEATURE_COLUMNS`` that a record lacks."""
+    for record in records:
+        for column in FEATURE_COLUMNS:
+            if column not in record:
+                raise KeyError(column)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket latency histogram with approximate percentiles.
+
+    Latencies recorded with a ``status`` are also kept in a histogram of their own per status.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = np.asarray(bounds)
+        self.counts = np.zeros(len(bounds) + 1, dtype=np.int64)  # Last bucket: above the largest bound
+        self.total = 0.0
+        self.max = 0.0
+        self.by_status = {}
+        self._lock = threading.Lock()
+
+    def record(self, seconds, status=None):
+        with self._lock:
+            self.counts[np.searchsorted(self.bounds, seconds)] += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            if status is not None and status not in self.by_status:
+                self.by_status[status] = LatencyHistogram(self.bounds)
+        if status is not None:
+            self.by_status[status].record(seconds)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the ``q``-th percentile (the max for the overflow bucket)."""
+        count = self.counts.sum()
+        if not count:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q / 100 * count))
+        return float(self.bounds[bucket]) if bucket < len(self.bounds) else self.max
+
+    def snapshot(self):
+        with self._lock:
+            count = int(self.counts.sum())
+            statuses = dict(self.by_status)
+            summary = {
+                'count': count,
+                'mean_ms': self.total / count * 1e3 if count else 0.0,
+                'p50_ms': self.percentile(50) * 1e3,
+                'p90_ms': self.percentile(90) * 1e3,
+                'p99_ms': self.percentile(99) * 1e3,
+                'max_ms': self.max * 1e3,
+                'buckets': [{'le_ms': bound * 1e3, 'count': int(n)}
+                            for bound, n in zip(self.bounds, self.counts) if n]
+                           + ([{'le_ms': None, 'count': int(self.counts[-1])}] if self.counts[-1] else []),
+            }
+        if statuses:
+            summary['by_status'] = {str(status): statuses[status].snapshot() for status in sorted(statuses)}
+        return summary
+
+
+class LinearScorer:
+    """Logistic-regression pipeline compiled into per-column lookup tables."""
+
+    def __init__(self, pipeline):
+        encoder, model = pipeline.named_steps['encode'], pipeline.named_steps['model']
+        transformers = {name: (transformer, columns) for name, transformer, columns in encoder.transformers_}
+        onehot, categorical = transformers['onehot']
+        scaler, numeric = transformers['scale']
+        coef = model.coef_[0]
+
+        self.tables = {}
+        position = 0
+        for column, categories in zip(categorical, onehot.categories_):
+            weights = coef[position:position + len(categories)]
+            table = dict(zip(categories.tolist(), weights.tolist()))
+            # Ordinal fields also accept their raw codes, through the same maps the cleaning uses
+            for code, label in cleaning.ORDINAL_MAPS.get(column, {}).items():
+                if label in table:
+                    table[code] = table[str(code)] = table[label]
+            self.tables[column] = table
+            position += len(categories)
+
+        # coef * (x - mean) / scale == weight * x - weight * mean
+        self.numeric = list(numeric)
+        self.weights = coef[position:] / scaler.scale_
+        self.intercept = float(model.intercept_[0] - self.weights @ scaler.mean_)
+
+    def predict(self, records):
+        check_fields(records)
+        values = np.array([[record[column] for column in self.numeric] for record in records], dtype=np.float64)
+        logits = values @ self.weights + self.intercept
+        for row, record in enumerate(records):
+            # Unseen categories contribute nothing, like OneHotEncoder(handle_unknown='ignore')
+            logits[row] += sum(table.get(record[column], 0.0) for column, table in self.tables.items())
+        return 1 / (1 + np.exp(-logits))
+
+
+class PipelineScorer:
+    """Fallback for non-linear models: score records through the saved pipeline."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def predict(self, records):
+        check_fields(records)  # from_records would score a missing field as NaN
+        raw = pd.DataFrame.from_records(records, columns=FEATURE_COLUMNS)
+        for column, mapping in cleaning.ORDINAL_MAPS.items():
+            # Accept labels as well as codes: translate labels back to codes before cleaning
+            codes = {label: code for code, label in mapping.items()}
+            raw[column] = raw[column].map(lambda value: codes.get(value, value)).astype(int)
+        return self.pipeline.predict_proba(cleaning.clean(raw))[:, 1]
+
+
+def make_scorer(pipeline):
+    model = pipeline.named_steps['model']
+    return LinearScorer(pipeline) if hasattr(model, 'coef_') else PipelineScorer(pipeline)
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep connections alive between requests
+    disable_nagle_algorithm = True  # Small responses must not wait for delayed ACKs
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            self._predict()
+        except Exception as error:
+            # An unexpected failure is still answered, and timed, as a 500
+            self._reply(500, {'error': f"internal error: {type(error).__name__}: {error}"})
+        finally:
+            # Every request is timed, slow errors included, under the status it was answered with
+            self.server.latency.record(time.perf_counter() - start, self.status)
+
+    def _predict(self):
+        if self.path != '/predict':
+            return self._reply(404, {'error': f"unknown endpoint {self.path}"})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            records = payload if isinstance(payload, list) else [payload]
+            risks = self.server.scorer.predict(records).round(6).tolist() if records else []
+        except KeyError as error:
+            return self._reply(400, {'error': f"missing field {error}"})
+        except (ValueError, TypeError) as error:
+            return self._reply(400, {'error': str(error)})
+        self._reply(200, {'risks': risks} if isinstance(payload, list) else {'risk': risks[0]})
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._reply(200, {'model': self.server.model_name, 'latency': self.server.latency.snapshot()})
+        elif self.path == '/health':
+            self._reply(200, {'status': 'ok'})
+        else:
+            self._reply(404, {'error': f"unknown endpoint {self.path}"})
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.status = status
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Per-request access logging would dominate the latency budget
+
+
+def make_server(model_path=MODEL_FILE, host='127.0.0.1', port=DEFAULT_PORT):
+    """Create (but do not start) the prediction server with the model and tables loaded."""
+    pipeline = load_model(model_path)
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.scorer = make_scorer(pipeline)
+    server.model_name = type(pipeline.named_steps['model']).__name__
+    server.latency = LatencyHistogram()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--model', default=MODEL_FILE, help='saved model (default: %(default)s)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.model, args.host, args.port)
+    print(f"Serving {server.model_name} attrition risk on http://{args.host}:{args.port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        latency = server.latency.snapshot()
+        print(f"Answered {latency['count']} requests (p50 {latency['p50_ms']:.3f} ms, "
+              f"p99 {latency['p99_ms']:.3f} ms, max {latency['max_ms']:.3f} ms).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+"""Chunked ingestion of the employee CSV with mergeable, bounded-memory aggregates.
+
+``StreamingAggregates`` answers the same questions as ``aggregates.AggregateCache`` (count
+tables, value counts, group means, describe tables, correlations) but never holds more than one
+cleaned chunk in memory. Every statistic it keeps can be updated chunk by chunk and merged with
+another instance, so partial results from several files or workers combine exactly:
+
+* counts per category x category (e.g. every dimension x Attrition),
+* count / mean / sum of squared deviations / min / max per group (merged with Chan's formula),
+* ``correlation.CorrelationSums`` co-moment sums for the numeric correlation matrix,
+* ``QuantileSketch`` value histograms for the quartiles of the ``describe()`` tables.
+
+Only duplicate detection grows with the data (8 bytes + a count per distinct row hash); it
+can be switched off with ``track_duplicates=False``.
+
+Rows can also be taken out again with ``remove`` (see incremental.py, which applies HRIS
+delta files). Counts, sums, M2, co-moment sums, row-hash counts and sketch histograms are all
+subtracted exactly. Minima and maxima cannot be, so after a removal they are read from the
+value histograms instead, which are exact for every column of the HR extract.
+"""
+import numpy as np
+import pandas as pd
+
+from .aggregates import count_tables, normalize_table
+from .correlation import CorrelationSums
+from .cleaning import read_clean
+from .group_stats import DESCRIBE_INDEX
+
+# Extra category x category tables and per-group describe tables the text report asks for
+REPORT_PAIRS = [('JobRole', 'JobSatisfaction'), ('JobInvolvement', 'PerformanceRating')]
+REPORT_GROUP_STATS = [('MonthlyIncome', 'JobLevel'), ('MonthlyIncome', 'Department'),
+                      ('MonthlyIncome', 'JobRole'), ('MonthlyIncome', 'JobSatisfaction')]
+
+# Group label used for whole-stream (ungrouped) moments
+OVERALL = 0
+
+
+def _plain(series):
+    """Chunk column with categoricals decoded to plain labels, so chunks align on values."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(series.cat.categories.dtype)
+    return series
+
+
+class QuantileSketch:
+    """Mergeable histogram of distinct values for approximate quantiles.
+
+    Quantiles are exact (same linear interpolation as pandas) while the sketch holds at most
+    ``capacity`` distinct values, which covers every integer column of the HR extract. Beyond
+    that, values are snapped to a grid whose spacing doubles until they fit again, so the
+    error of any quantile is bounded by half the grid spacing.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.resolution = 0.0
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._add(*np.unique(self._snap(values), return_counts=True))
+
+    def remove(self, values):
+        """Take previously added ``values`` out of the histogram again."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            removed, counts = np.unique(self._snap(values), return_counts=True)
+            positions = np.searchsorted(self.values, removed)
+            if (positions >= len(self.values)).any() or (self.values[np.minimum(positions, len(self.values) - 1)] != removed).any():
+                raise ValueError("Cannot remove values that were never added to the sketch")
+            self.counts[positions] -= counts
+            keep = self.counts > 0
+            self.values, self.counts = self.values[keep], self.counts[keep]
+
+    def merge(self, other):
+        if other.resolution > self.resolution:
+            self.resolution = other.resolution
+            self._add(np.empty(0), np.empty(0, dtype=np.int64))
+        self._add(other.values, other.counts)
+
+    def _snap(self, values):
+        if not self.resolution:
+            return values
+        return np.round(values / self.resolution) * self.resolution
+
+    def _add(self, values, counts):
+        values = self._snap(np.concatenate((self.values, values)))
+        unique, inverse = np.unique(values, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate((self.counts, counts)), minlength=len(unique))
+        self.values, self.counts = unique, counts.astype(np.int64)
+        while len(self.values) > self.capacity:
+            span = self.values[-1] - self.values[0]
+            self.resolution = self.resolution * 2 if self.resolution else span / self.capacity
+            self._add(np.empty(0), np.empty(0, dtype=np.int64))
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        if not self.n:
+            return np.nan
+        position = (self.n - 1) * q
+        cumulative = np.cumsum(self.counts)
+        lower = self.values[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = self.values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+
+
+class GroupMoments:
+    """Mergeable count / sum / M2 / min / max of numeric columns per group label.
+
+    Means come from the exact running sums; the sum of squared deviations (M2) is merged with
+    Chan et al.'s parallel formula, which stays accurate where sum-of-squares would cancel.
+    """
+
+    def __init__(self):
+        self.count = self.sum = self.m2 = self.min = self.max = None
+
+    def update(self, frame, keys):
+        # Accumulate in float64: the schema's int8/int16 columns would overflow in a grouped sum
+        grouped = frame.astype(np.float64).groupby(keys, observed=True)
+        count = grouped.count().astype(float)
+        self.merge_frames(count, grouped.sum(), grouped.var(ddof=0) * count, grouped.min(), grouped.max())
+
+    def remove(self, frame, keys):
+        """Subtract the moments of rows that were previously added (Chan's formula in reverse).
+
+        Extremes cannot be subtracted, so ``min`` and ``max`` become None after a removal.
+        """
+        grouped = frame.astype(np.float64).groupby(keys, observed=True)
+        n_b = grouped.count().astype(float).reindex(self.count.index).fillna(0)
+        sum_b = grouped.sum().reindex(self.count.index).fillna(0)
+        m2_b = (grouped.var(ddof=0) * grouped.count()).reindex(self.count.index).fillna(0)
+        n = self.count - n_b
+        delta = (sum_b / n_b).fillna(0) - ((self.sum - sum_b) / n).fillna(0)
+        m2 = self.m2 - m2_b - (delta ** 2 * n * n_b / self.count).fillna(0)
+        keep = (n > 0).any(axis=1)
+        self.count, self.sum = n[keep], (self.sum - sum_b)[keep]
+        self.m2 = m2[keep].clip(lower=0).where(self.count > 1, 0.0)
+        self.min = self.max = None
+
+    def merge(self, other):
+        if other.count is not None:
+            self.merge_frames(other.count, other.sum, other.m2, other.min, other.max)
+
+    def merge_frames(self, count, total, m2, minimum, maximum):
+        if self.count is None:
+            self.count, self.sum, self.m2, self.min, self.max = count, total, m2, minimum, maximum
+            return
+        index = self.count.index.union(count.index)
+        n_a, n_b = self.count.reindex(index).fillna(0), count.reindex(index).fillna(0)
+        sum_a, sum_b = self.sum.reindex(index).fillna(0), total.reindex(index).fillna(0)
+        n = n_a + n_b
+        delta = (sum_b / n_b).fillna(0) - (sum_a / n_a).fillna(0)
+        self.m2 = (self.m2.reindex(index).fillna(0) + m2.reindex(index).fillna(0)
+                   + (delta ** 2 * n_a * n_b / n).fillna(0))
+        if self.min is None or minimum is None:
+            self.min = self.max = None  # Extremes were lost to a removal on one side
+        else:
+            self.min = np.fmin(self.min.reindex(index), minimum.reindex(index))
+            self.max = np.fmax(self.max.reindex(index), maximum.reindex(index))
+        self.count, self.sum = n, sum_a + sum_b
+
+    @property
+    def mean(self):
+        return self.sum / self.count
+
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1))
+
+
+class StreamingAggregates:
+    """Report aggregates accumulated from cleaned chunks; see the module docstring."""
+
+    def __init__(self, dimensions=(), target='Attrition', pairs=REPORT_PAIRS,
+                 group_stats=REPORT_GROUP_STATS, track_duplicates=True, sketch_capacity=4096):
+        self.dimensions = list(dimensions)
+        self.target = target
+        self.pairs = list(pairs)
+        self.group_stats = list(group_stats)
+        self.track_duplicates = track_duplicates
+        self.sketch_capacity = sketch_capacity
+        self.columns = None
+        self.numeric_columns = None
+        self.category_orders = {}
+        self.categorical_columns = []
+        self.n_rows = 0
+        self.n_chunks = 0
+        self.missing = None
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+        self.row_hash_counts = np.empty(0, dtype=np.int64)
+        self.value_count_tables = {}
+        self.pair_tables = {}
+        self.moments = {}
+        self.sketches = {}
+        self.correlations = None
+
+    # --- Updating -----------------------------------------------------------------------
+
+    def update(self, chunk):
+        self._accumulate(chunk, 1)
+        self.n_chunks += 1
+
+    def remove(self, chunk):
+        """Take rows that were previously passed to ``update`` out of every statistic."""
+        self._accumulate(chunk, -1)
+
+    def _accumulate(self, chunk, sign):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.numeric_columns = list(chunk.select_dtypes(include=np.number).columns)
+            self.missing = pd.Series(0, index=self.columns, dtype=np.int64)
+            self.correlations = CorrelationSums(self.numeric_columns)
+            # Ordered categoricals (the schema's ordinal fields, AgeGroup) keep their category order
+            self.category_orders = {column: list(chunk[column].cat.categories) for column in self.columns
+                                    if isinstance(chunk[column].dtype, pd.CategoricalDtype) and chunk[column].cat.ordered}
+            self.categorical_columns = [column for column in self.columns
+                                        if isinstance(chunk[column].dtype, pd.CategoricalDtype)]
+        self.n_rows += sign * len(chunk)
+        self.missing += sign * chunk.isnull().sum()
+
+        if self.track_duplicates:
+            hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            self._add_hashes(hashes, np.full(len(hashes), sign, dtype=np.int64))
+
+        numeric = chunk[self.numeric_columns]
+        for column in self.columns:
+            if column not in self.numeric_columns or column in self.dimensions:
+                self._add_table(self.value_count_tables, column, sign * _plain(chunk[column]).value_counts())
+
+        for column, table in count_tables(chunk, self.dimensions, self.target).items():
+            self._add_table(self.pair_tables, (column, self.target), sign * table)
+        for a, b in self.pairs:
+            self._add_table(self.pair_tables, (a, b), sign * count_tables(chunk, [a], b)[a])
+
+        # Moments and sketches are added with update() and taken out with remove()
+        apply = 'update' if sign > 0 else 'remove'
+        for by in [None, self.target] + sorted({by for _, by in self.group_stats}):
+            keys = np.full(len(chunk), OVERALL) if by is None else _plain(chunk[by])
+            getattr(self.moments.setdefault(by, GroupMoments()), apply)(numeric, keys)
+
+        for column in self.numeric_columns:
+            getattr(self._sketch(column, None, None), apply)(numeric[column].to_numpy())
+        for value, by in self.group_stats:
+            for label, values in chunk[value].groupby(_plain(chunk[by])):
+                getattr(self._sketch(value, by, label), apply)(values.to_numpy())
+
+        self.correlations.update_frame(numeric, sign)
+
+    def merge(self, other):
+        """Fold another stream's aggregates (e.g. another file or worker) into this one."""
+        if other.columns is None:
+            return
+        if self.columns is None:
+            self.columns, self.numeric_columns = other.columns, other.numeric_columns
+            self.category_orders, self.categorical_columns = other.category_orders, other.categorical_columns
+            self.missing = pd.Series(0, index=self.columns, dtype=np.int64)
+            self.correlations = CorrelationSums(self.numeric_columns)
+        self.n_rows += other.n_rows
+        self.n_chunks += other.n_chunks
+        self.missing += other.missing
+        if self.track_duplicates:
+            self._add_hashes(other.row_hashes, other.row_hash_counts)
+        for store, other_store in ((self.value_count_tables, other.value_count_tables),
+                                   (self.pair_tables, other.pair_tables)):
+            for key, table in other_store.items():
+                self._add_table(store, key, table)
+        for by, moments in other.moments.items():
+            self.moments.setdefault(by, GroupMoments()).merge(moments)
+        for key, sketch in other.sketches.items():
+            self.sketches.setdefault(key, QuantileSketch(self.sketch_capacity)).merge(sketch)
+        self.correlations.merge(other.correlations)
+
+    def _add_hashes(self, hashes, counts):
+        # Multiset of row hashes: distinct hashes with how often each occurs
+        unique, inverse = np.unique(np.concatenate((self.row_hashes, hashes)), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate((self.row_hash_counts, counts)), minlength=len(unique))
+        keep = counts > 0
+        self.row_hashes, self.row_hash_counts = unique[keep], counts[keep].astype(np.int64)
+
+    def _add_table(self, store, key, table):
+        # Chunks carry their own category sets, so align on plain labels before adding
+        table = table.copy()
+        table.index = pd.Index(list(table.index), name=table.index.name)
+        if table.ndim == 2:
+            table.columns = pd.Index(list(table.columns), name=table.columns.name)
+        if key in store:
+            table = store[key].add(table, fill_value=0).fillna(0).astype(np.int64)
+        # Removals can empty a label; drop it as a fresh count would never have seen it
+        if table.ndim == 2:
+            table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        else:
+            table = table[table > 0]
+        store[key] = table
+
+    def _sketch(self, column, by, label):
+        return self.sketches.setdefault((column, by, label), QuantileSketch(self.sketch_capacity))
+
+    # --- Same read interface as aggregates.AggregateCache ------------------------------------
+
+    def _sorted(self, table, axis=0):
+        """Sort labels like the in-memory frame would: category order if ordered, else sorted.
+
+        Labels of categorical columns come back as a CategoricalIndex, as the in-memory tables
+        have them (seaborn, for one, draws the bars of a categorical axis in category order).
+        """
+        name = table.axes[axis].name
+        order = self.category_orders.get(name)
+        if order is None:
+            table = table.sort_index(axis=axis)
+        else:
+            table = table.reindex([label for label in order if label in table.axes[axis]], axis=axis)
+        if name in self.categorical_columns:
+            labels = table.axes[axis]
+            table = table.set_axis(pd.CategoricalIndex(labels, categories=labels if order is None else order,
+                                                       ordered=order is not None, name=name), axis=axis)
+        return table
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.columns)
+
+    def duplicate_count(self):
+        if not self.track_duplicates:
+            raise ValueError("Duplicate detection was disabled for this stream (track_duplicates=False)")
+        return self.n_rows - len(self.row_hashes)  # Every repeat of a distinct row is a duplicate
+
+    def missing_counts(self):
+        return self.missing.copy()
+
+    def describe(self, column=None):
+        columns = self.numeric_columns if column is None else [column]
+        overall = self.moments[None]
+        table = pd.DataFrame({name: self._describe_values(overall, None, name, OVERALL) for name in columns},
+                             index=DESCRIBE_INDEX)
+        return table if column is None else table[column]
+
+    def _describe_values(self, moments, by, column, label):
+        sketch = self.sketches[(column, by, None if by is None else label)]
+        # After a removal the extremes come from the (exact) value histogram
+        minimum = sketch.quantile(0.0) if moments.min is None else moments.min.loc[label, column]
+        maximum = sketch.quantile(1.0) if moments.max is None else moments.max.loc[label, column]
+        return [moments.count.loc[label, column], moments.mean.loc[label, column],
+                moments.std().loc[label, column], minimum,
+                sketch.quantile(0.25), sketch.quantile(0.5), sketch.quantile(0.75), maximum]
+
+    def value_counts(self, column, normalize=False):
+        counts = self._sorted(self.value_count_tables[column]).sort_values(ascending=False, kind='stable')
+        counts = counts.rename_axis(column).rename('proportion' if normalize else 'count')
+        return counts / counts.sum() if normalize else counts
+
+    def counts(self, column, target='Attrition'):
+        try:
+            table = self.pair_tables[(column, target)]
+        except KeyError:
+            raise KeyError(f"{column} x {target} counts were not tracked while streaming; "
+                           f"add the column to dimensions or pairs") from None
+        return self._sorted(self._sorted(table), axis=1)
+
+    def crosstab(self, column, target='Attrition', normalize='index'):
+        return normalize_table(self.counts(column, target), normalize)
+
+    def rate_table(self, column, target='Attrition'):
+        return self.crosstab(column, target, 'index') * 100
+
+    def group_mean(self, value, by='Attrition'):
+        return self._sorted(self.moments[by].mean[value]).rename_axis(by)
+
+    def group_describe(self, value, by):
+        if (value, by) not in self.group_stats:
+            raise KeyError(f"{value} by {by} was not tracked while streaming; add it to group_stats")
+        moments = self.moments[by]
+        labels = self._sorted(moments.count).index
+        return pd.DataFrame([self._describe_values(moments, by, value, label) for label in labels],
+                            index=labels.rename(by), columns=DESCRIBE_INDEX)
+
+    def corr_matrix(self, columns=None, method='pearson'):
+        """Pearson matrix of the numeric columns; rank methods need the row-level data."""
+        if method != 'pearson':
+            raise ValueError(f"{method} correlation needs the row-level data; streamed aggregates only keep Pearson sums")
+        matrix = self.correlations.pearson()
+        return matrix if columns is None else matrix.loc[list(columns), list(columns)]
+
+    def corr(self, a, b, method='pearson'):
+        if a in self.numeric_columns and b in self.numeric_columns:
+            return self.corr_matrix([a, b], method).loc[a, b]
+        if method != 'pearson':
+            raise ValueError(f"{method} correlation needs the row-level data; streamed aggregates only keep Pearson sums")
+        # Categorical pair: correlate category codes (sorted label order) from the joint count table
+        table = self.counts(a, b).to_numpy(dtype=float)
+        codes_a, codes_b = np.arange(table.shape[0]), np.arange(table.shape[1])
+        n = table.sum()
+        mean_a = table.sum(axis=1) @ codes_a / n
+        mean_b = table.sum(axis=0) @ codes_b / n
+        cov = (codes_a - mean_a) @ table @ (codes_b - mean_b)
+        var_a = table.sum(axis=1) @ (codes_a - mean_a) ** 2
+        var_b = table.sum(axis=0) @ (codes_b - mean_b) ** 2
+        return cov / np.sqrt(var_a * var_b)
+
+
+def stream_aggregates(path, chunksize, **options):
+    """Read ``path`` in cleaned chunks of ``chunksize`` rows and return the merged aggregates."""
+    aggregates = StreamingAggregates(**options)
+    for chunk in read_clean(path, chunksize=chunksize):
+        aggregates.update(chunk)
+    return aggregates
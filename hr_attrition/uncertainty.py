@@ -0,0 +1,158 @@
+"""Bootstrap confidence intervals and permutation tests for the attrition-by-group tables.
+
+Sections 2 and 5 quote attrition rates per group ("Sales Representatives face an attrition rate
+of X%") and compare them ("more than double", "significantly higher"). This module puts numbers
+on that: a percentile bootstrap interval for every group's attrition rate and, for every table,
+a permutation p-value of its chi-square statistic (does attrition depend on the grouping at all?).
+
+Both only need the ``group x Attrition`` count table, never the rows:
+
+* Resampling the employees with replacement only changes how many of them land in each
+  (group, outcome) cell, and those cell counts are multinomial with the observed cell shares.
+  A batch of bootstrap resamples is therefore one ``multinomial`` draw, a ``resamples x cells``
+  matrix, instead of ``resamples x employees`` random row indices.
+* Shuffling the Attrition labels across employees keeps the group sizes and deals the leavers
+  out over the groups, so a batch of permutations is one ``multivariate_hypergeometric`` draw.
+
+The cost is thus independent of the number of employees and the same tables work from an
+``AggregateCache`` or a ``StreamingAggregates``. Resamples run in batches of
+``BATCH_RESAMPLES``; every batch has its own seed derived from ``seed`` and the column name, so the
+results are the same however the batches are spread over worker processes:
+
+    python -m hr_attrition.uncertainty --columns JobRole,OverTime --resamples 1000000 --workers 4
+"""
+import argparse
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import DATA_FILE, POSITIVE, TARGET
+
+N_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+SEED = 0
+# Resamples drawn per task; bounds each task's matrices to BATCH_RESAMPLES x cells values
+BATCH_RESAMPLES = 10_000
+
+
+def _leavers_and_sizes(counts):
+    """Leavers and employees per group of a ``group x Attrition`` count table (empty groups dropped)."""
+    counts = counts.loc[counts.sum(axis=1) > 0]
+    leavers = counts[POSITIVE].to_numpy(dtype=np.int64) if POSITIVE in counts.columns else np.zeros(len(counts), np.int64)
+    return counts.index, leavers, counts.sum(axis=1).to_numpy(dtype=np.int64)
+
+
+def chi_square(leavers, sizes):
+    """Pearson chi-square statistic of ``groups x {Yes, No}`` tables; ``leavers`` is ``(..., groups)``.
+
+    All tables share the group ``sizes`` and their total number of leavers (as permutations do).
+    """
+    rate = leavers.sum(axis=-1, keepdims=True) / sizes.sum()
+    expected = sizes * rate
+    return ((leavers - expected) ** 2 / (expected * (1 - rate))).sum(axis=-1)
+
+
+def _resample_batch(leavers, sizes, n_resamples, seed, observed):
+    """Bootstrap rates (``n_resamples x groups``, %) and the number of permutations at least as extreme."""
+    rng = np.random.default_rng(seed)
+    n_groups = len(sizes)
+    draws = rng.multinomial(sizes.sum(), np.concatenate([leavers, sizes - leavers]) / sizes.sum(), size=n_resamples)
+    resampled_sizes = draws[:, :n_groups] + draws[:, n_groups:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # NaN where a small group drew nobody; such resamples are left out of its interval
+        rates = draws[:, :n_groups] / resampled_sizes * 100
+    extreme = 0
+    if observed is not None:
+        permuted = rng.multivariate_hypergeometric(sizes, int(leavers.sum()), size=n_resamples)
+        # The tolerance keeps permutations that tie the observed table from being lost to rounding
+        extreme = int((chi_square(permuted, sizes) >= observed * (1 - 1e-9)).sum())
+    return rates, extreme
+
+
+def _batches(column, n_resamples, seed):
+    sizes = [BATCH_RESAMPLES] * (n_resamples // BATCH_RESAMPLES)
+    if n_resamples % BATCH_RESAMPLES:
+        sizes.append(n_resamples % BATCH_RESAMPLES)
+    seeds = np.random.SeedSequence([seed, zlib.crc32(str(column).encode())]).spawn(len(sizes))
+    return list(zip(sizes, seeds))
+
+
+def rate_uncertainty(tables, n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=SEED, max_workers=1):
+    """Bootstrap intervals and permutation tests of ``{column: group x Attrition count table}``.
+
+    Every ``(column, batch)`` pair is an independent task; ``max_workers=1`` (the default, as the
+    draws take milliseconds) runs them in this process and ``max_workers=None`` uses every core.
+    Returns ``{'resamples', 'confidence', 'intervals', 'tests'}``:
+
+    * ``intervals``: rate, ci_low, ci_high (%) and employees per (dimension, group),
+    * ``tests``: chi_square and p_value per dimension (NaN when nobody or everybody left).
+    """
+    prepared, tasks = {}, []
+    for column, counts in tables.items():
+        groups, leavers, sizes = _leavers_and_sizes(counts)
+        testable = len(sizes) > 1 and 0 < leavers.sum() < sizes.sum()
+        observed = chi_square(leavers, sizes) if testable else None
+        prepared[column] = (groups, leavers, sizes, observed)
+        tasks += [(column, leavers, sizes, size, batch_seed, observed)
+                  for size, batch_seed in _batches(column, n_resamples, seed)]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = [_resample_batch(*task[1:]) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_resample_batch, *zip(*[task[1:] for task in tasks])))
+
+    tail = (1 - confidence) / 2 * 100
+    intervals, tests = [], {}
+    for column, (groups, leavers, sizes, observed) in prepared.items():
+        batches = [result for task, result in zip(tasks, results) if task[0] == column]
+        rates = np.concatenate([batch_rates for batch_rates, _ in batches])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = leavers / sizes * 100
+        low, high = np.nanpercentile(rates, [tail, 100 - tail], axis=0)
+        intervals.append(pd.DataFrame({'rate': rate, 'ci_low': low, 'ci_high': high, 'employees': sizes},
+                                      index=pd.MultiIndex.from_arrays([[column] * len(groups), list(groups)],
+                                                                      names=['dimension', 'group'])))
+        extreme = sum(count for _, count in batches)
+        tests[column] = {'chi_square': observed if observed is not None else np.nan,
+                         'p_value': (extreme + 1) / (n_resamples + 1) if observed is not None else np.nan}
+    return {'resamples': n_resamples, 'confidence': confidence,
+            'intervals': pd.concat(intervals) if intervals else pd.DataFrame(columns=['rate', 'ci_low', 'ci_high', 'employees']),
+            'tests': pd.DataFrame.from_dict(tests, orient='index').rename_axis('dimension')}
+
+
+def attrition_uncertainty(agg, columns, target=TARGET, **options):
+    """``rate_uncertainty`` of the ``column x target`` count tables of an aggregate source."""
+    return rate_uncertainty({column: agg.counts(column, target) for column in columns}, **options)
+
+
+def main(argv=None):
+    from .aggregates import AggregateCache
+    from .frame_cache import load_clean
+    from .report import attrition_dimensions
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--data', default=DATA_FILE, help='employee CSV (default: %(default)s)')
+    parser.add_argument('--columns', default=','.join(attrition_dimensions),
+                        help='comma-separated grouping columns (default: every report dimension)')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES, help='(default: %(default)s)')
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE, help='(default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=SEED, help='(default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=1, help='processes, 0 for all cores (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    columns = [column for column in args.columns.split(',') if column]
+    agg = AggregateCache(load_clean(args.data), dimensions=columns)
+    result = attrition_uncertainty(agg, columns, n_resamples=args.resamples, confidence=args.confidence,
+                                   seed=args.seed, max_workers=args.workers or None)
+    print(result['intervals'].round(2).to_markdown(numalign="left", stralign="left"))
+    print()
+    print(result['tests'].round(4).to_markdown(numalign="left", stralign="left"))
+
+
+if __name__ == '__main__':
+    main()
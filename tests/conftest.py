@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from hr_attrition.cleaning import DATA_FILE, read_clean
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DATA_FILE)
+
+
+@pytest.fixture(scope='session')
+def data_path():
+    return DATA
+
+
+@pytest.fixture(scope='session')
+def df():
+    """The cleaned employee frame, shared by every test; tests must not modify it."""
+    return read_clean(DATA)
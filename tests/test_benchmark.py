@@ -0,0 +1,15 @@
+from hr_attrition.benchmark import compare, run_pipeline
+from hr_attrition.report import SECTIONS, report_file
+
+
+def test_pipeline_records_the_report_sections(data_path, tmp_path):
+    run = run_pipeline(data_path, str(tmp_path / 'output'), charts=False)
+    assert list(run['stages']) == (['csv_load', 'cleaning', 'aggregates']
+                                   + [f'section:{key}' for key in SECTIONS] + ['report_write'])
+    assert all(timing['seconds'] >= 0 and timing['peak_rss'] > 0 for timing in run['stages'].values())
+    assert (tmp_path / 'output' / report_file()).exists()
+
+    slower = {'sizes': {'1470': {**run, 'stages': {'cleaning': {**run['stages']['cleaning'],
+                                                               'seconds': run['stages']['cleaning']['seconds'] + 1}}}}}
+    regressions = compare(slower, {'sizes': {'1470': run}})
+    assert [(regression['stage'], regression['metric']) for regression in regressions] == [('cleaning', 'seconds')]
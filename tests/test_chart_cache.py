@@ -0,0 +1,50 @@
+from dataclasses import replace
+
+import pytest
+
+from hr_attrition import chart_engine
+from hr_attrition.aggregates import AggregateCache
+from hr_attrition.chart_engine import ChartSpec, render_charts
+from hr_attrition.report import attrition_rates
+
+
+@pytest.fixture
+def specs(df):
+    agg = AggregateCache(df)
+    return [ChartSpec('department.png', 'bar', attrition_rates(agg, 'Department'), 'Attrition by Department',
+                      'Department', 'Attrition Rate (%)'),
+            ChartSpec('age.png', 'hist', df['Age'], 'Age Distribution', 'Age', 'Count', options={'bins': 15})]
+
+
+def render(specs, tmp_path, run):
+    output_dir = tmp_path / run
+    output_dir.mkdir()
+    return render_charts(specs, str(output_dir), max_workers=1, cache_dir=str(tmp_path / 'cache'))
+
+
+def test_unchanged_specs_are_copied_from_the_cache(specs, tmp_path, monkeypatch):
+    first = render(specs, tmp_path, 'first')
+    assert (first['cache_hits'], first['cache_misses'], first['charts_rendered']) == (0, 2, 2)
+    monkeypatch.setattr(chart_engine, 'render_chart', lambda spec, output_dir: pytest.fail('rendered a cached chart'))
+    second = render(specs, tmp_path, 'second')
+    assert (second['cache_hits'], second['cache_misses'], second['charts_rendered']) == (2, 0, 0)
+    for spec in specs:
+        assert (tmp_path / 'second' / spec.filename).read_bytes() == (tmp_path / 'first' / spec.filename).read_bytes()
+
+
+def test_changed_spec_field_is_a_miss(specs, tmp_path):
+    render(specs, tmp_path, 'first')
+    changed = [replace(specs[0], title='Attrition by Department, revised'), specs[1]]
+    summary = render(changed, tmp_path, 'second')
+    assert (summary['cache_hits'], summary['cache_misses']) == (1, 1)
+    data = specs[0].data.copy()
+    data.iloc[0, 0] += 1
+    summary = render([replace(specs[0], data=data)], tmp_path, 'third')
+    assert (summary['cache_hits'], summary['cache_misses']) == (0, 1)
+
+
+def test_library_upgrade_is_a_miss(specs, tmp_path, monkeypatch):
+    render(specs, tmp_path, 'first')
+    monkeypatch.setattr(chart_engine.sns, '__version__', '0.0.0')
+    summary = render(specs, tmp_path, 'second')
+    assert (summary['cache_hits'], summary['cache_misses']) == (0, 2)
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from hr_attrition.cleaning import SCHEMA, clean, read_clean
+
+
+@pytest.fixture(scope='module')
+def raw(data_path):
+    return pd.read_csv(data_path, nrows=20)
+
+
+def test_read_clean_narrows_to_schema(df):
+    for column in ['Age', 'DailyRate', 'MonthlyIncome', 'YearsAtCompany']:
+        assert df[column].dtype == SCHEMA[column]
+
+
+@pytest.mark.parametrize('chunksize', [None, 5])
+def test_out_of_range_value_raises_instead_of_wrapping(raw, tmp_path, chunksize):
+    path = tmp_path / 'employees.csv'
+    raw.assign(Age=raw['Age'].where(raw.index != 12, 300)).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='Age value 300 is outside the int8 range'):
+        result = read_clean(path, chunksize=chunksize)
+        if chunksize:
+            list(result)
+
+
+def test_clean_checks_raw_frames(raw):
+    with pytest.raises(ValueError, match='DistanceFromHome value -40000'):
+        clean(raw.assign(DistanceFromHome=-40000))
+    assert clean(raw)['Age'].tolist() == raw['Age'].tolist()
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hr_attrition.correlation import CorrelationEngine, CorrelationSums, column_values, stream_correlations
+
+
+@pytest.fixture(scope='module')
+def engine(df):
+    return CorrelationEngine(df)
+
+
+@pytest.mark.parametrize('chunksize', [7, 50, 1000])
+def test_streamed_pearson_matches_in_memory(engine, data_path, chunksize):
+    expected = engine.matrix()
+    streamed = stream_correlations(data_path, chunksize)
+    assert list(streamed.columns) == list(expected.columns)
+    np.testing.assert_allclose(streamed.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman', 'kendall'])
+def test_engine_matches_pandas(df, engine, method):
+    columns = ['Age', 'MonthlyIncome', 'TotalWorkingYears', 'JobInvolvement', 'PerformanceRating', 'Department']
+    values = pd.DataFrame({column: column_values(df[column]) for column in columns})
+    np.testing.assert_allclose(engine.matrix(columns, method).to_numpy(), values.corr(method).to_numpy(), atol=1e-10)
+
+
+def test_removing_rows_matches_never_adding_them(df):
+    columns = ['Age', 'MonthlyIncome', 'YearsAtCompany', 'AgeGroup']
+    kept, removed = df.iloc[:1000], df.iloc[1000:]
+    sums = CorrelationSums(columns)
+    sums.update_frame(df)
+    sums.update_frame(removed, sign=-1)
+    expected = CorrelationSums(columns)
+    expected.update_frame(kept)
+    np.testing.assert_allclose(sums.pearson().to_numpy(), expected.pearson().to_numpy(), atol=1e-10)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hr_attrition.cube import build_cube, dimension_series, stream_cube
+
+QUERIES = [
+    ([], {}),
+    (['OverTime'], {}),
+    (['JobRole'], {'Department': 'Sales'}),
+    (['OverTime', 'JobRole', 'AgeGroup'], {}),
+    (['AgeGroup', 'Gender'], {'Department': ['Sales', 'Human Resources'], 'OverTime': 'Yes'}),
+    (['YearsAtCompanyGroup', 'WorkLifeBalance'], {'MaritalStatus': 'Single'}),
+    (['EducationField', 'JobSatisfaction', 'EnvironmentSatisfaction', 'BusinessTravel'], {}),
+]
+
+
+@pytest.fixture(scope='module')
+def cubes(df, data_path):
+    return {'base only': build_cube(df, budget=0), 'with views': build_cube(df),
+            'streamed': stream_cube(data_path, chunksize=200)}
+
+
+def expected(df, by, where):
+    """The query answered with a pandas filter and groupby over the rows."""
+    frame = df.assign(YearsAtCompanyGroup=dimension_series(df, 'YearsAtCompanyGroup'))
+    for dimension, values in where.items():
+        frame = frame[frame[dimension].isin(values if isinstance(values, list) else [values])]
+    frame = frame.assign(leaver=(frame['Attrition'] == 'Yes').astype(np.int64))
+    grouped = frame.groupby(by, observed=True) if by else frame.groupby(lambda _: 'All')
+    result = grouped.agg(employees=('leaver', 'size'), leavers=('leaver', 'sum'),
+                         MonthlyIncome_sum=('MonthlyIncome', 'sum'))
+    result['attrition_rate'] = result['leavers'] / result['employees'] * 100
+    result['MonthlyIncome_mean'] = result['MonthlyIncome_sum'] / result['employees']
+    return result
+
+
+@pytest.mark.parametrize('by, where', QUERIES)
+def test_query_matches_groupby(df, cubes, by, where):
+    truth = expected(df, by, where)
+    for name, cube in cubes.items():
+        result = cube.query(by, where)
+        assert len(result) == len(truth), name
+        assert [tuple(np.atleast_1d(label)) for label in result.index] == [tuple(np.atleast_1d(label)) for label in truth.index], name
+        for column in ['employees', 'leavers']:
+            np.testing.assert_array_equal(result[column].to_numpy(), truth[column].to_numpy(), err_msg=name)
+        for column in ['attrition_rate', 'MonthlyIncome_sum', 'MonthlyIncome_mean']:
+            np.testing.assert_allclose(result[column].to_numpy(), truth[column].to_numpy(), rtol=1e-12, err_msg=name)
+
+
+def test_views_answer_queries(cubes):
+    cube = cubes['with views']
+    hits = cube.stats()['hits']
+    cube.query(['OverTime', 'JobRole'])
+    assert cube.stats()['views'] > 0 and cube.stats()['hits'] == hits + 1
+    assert cubes['base only'].stats()['views'] == 0
+
+
+def test_unknown_category_is_rejected(cubes):
+    with pytest.raises(KeyError):
+        cubes['with views'].query(['JobRole'], {'Department': 'Marketing'})
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, contingency
+from sklearn.metrics import mutual_info_score
+
+from hr_attrition import drivers as drivers_module
+from hr_attrition.drivers import binned_codes, driver_columns, rank_drivers, rank_tables
+
+
+@pytest.fixture(scope='module')
+def drivers(df):
+    return rank_drivers(df)
+
+
+def crosstab(df, column):
+    codes, _ = binned_codes(df[column])
+    present = codes >= 0
+    return pd.crosstab(codes[present], df['Attrition'].to_numpy()[present])
+
+
+def test_statistics_match_scipy_and_sklearn(df, drivers):
+    for column in driver_columns(df):
+        table = crosstab(df, column)
+        row = drivers.loc[column]
+        chi_square, p_value, dof, _ = chi2_contingency(table, correction=False)
+        assert row['employees'] == table.to_numpy().sum()
+        assert row['dof'] == dof
+        assert row['chi_square'] == pytest.approx(chi_square, rel=1e-9)
+        assert row['p_value'] == pytest.approx(p_value, rel=1e-6, abs=1e-300)
+        assert row['cramers_v'] == pytest.approx(contingency.association(table, method='cramer'), rel=1e-9)
+        codes = np.repeat(np.arange(len(table)), table.sum(axis=1))
+        outcomes = np.concatenate([np.repeat(table.columns, counts) for counts in table.to_numpy()])
+        assert row['mutual_information'] == pytest.approx(mutual_info_score(codes, outcomes), rel=1e-9)
+
+
+def test_ranking_is_sorted_and_complete(df):
+    for rank_by in ['mutual_information', 'uncertainty', 'cramers_v', 'chi_square']:
+        ranked = rank_drivers(df, rank_by=rank_by)
+        assert set(ranked.index) == set(driver_columns(df))
+        assert ranked[rank_by].is_monotonic_decreasing
+
+
+def test_small_blocks_match_one_block(df, drivers, monkeypatch):
+    monkeypatch.setattr(drivers_module, 'BLOCK_COLUMNS', 4)
+    pd.testing.assert_frame_equal(rank_drivers(df), drivers)
+
+
+def test_count_tables_match_rows(df, drivers):
+    categorical = ['OverTime', 'JobRole', 'MaritalStatus', 'AgeGroup']
+    from_tables = rank_tables({column: pd.crosstab(df[column], df['Attrition']) for column in categorical})
+    pd.testing.assert_frame_equal(from_tables.sort_index(), drivers.loc[categorical].sort_index(), check_dtype=False)
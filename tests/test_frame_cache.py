@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+import pytest
+
+from hr_attrition import cleaning, frame_cache
+from hr_attrition.frame_cache import cache_path, load_clean
+
+
+@pytest.fixture
+def source(data_path, tmp_path):
+    path = tmp_path / 'employees.csv'
+    path.write_bytes(open(data_path, 'rb').read())
+    return str(path)
+
+
+def entries(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith('.feather'))
+
+
+def test_unchanged_source_is_served_from_the_cache(source, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    expected = load_clean(source, cache_dir)
+    assert entries(cache_dir) == [os.path.basename(cache_path(source, cache_dir))]
+    # A hit never reads the CSV again
+    monkeypatch.setattr(cleaning, 'read_clean', lambda path: pytest.fail('cleaned the CSV on a cache hit'))
+    pd.testing.assert_frame_equal(load_clean(source, cache_dir), expected)
+
+
+def test_source_change_replaces_the_entry(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    load_clean(source, cache_dir)
+    before = entries(cache_dir)
+    with open(source) as csv_file:
+        lines = csv_file.readlines()
+    with open(source, 'w') as csv_file:
+        csv_file.writelines(lines[:-10])
+    df = load_clean(source, cache_dir)
+    assert len(df) == len(lines) - 11
+    assert entries(cache_dir) != before and len(entries(cache_dir)) == 1
+
+
+def test_cleaning_rule_change_replaces_the_entry(source, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    load_clean(source, cache_dir)
+    before = entries(cache_dir)
+    fingerprint = frame_cache.cleaning_fingerprint()
+    monkeypatch.setattr(cleaning, 'CLEANING_VERSION', cleaning.CLEANING_VERSION + 1)
+    assert frame_cache.cleaning_fingerprint() != fingerprint
+    load_clean(source, cache_dir)
+    assert entries(cache_dir) != before and len(entries(cache_dir)) == 1
+
+    monkeypatch.setitem(cleaning.ORDINAL_MAPS, 'PerformanceRating', {3: 'Solid', 4: 'Outstanding'})
+    assert frame_cache.cleaning_fingerprint() != fingerprint
+    assert os.path.basename(cache_path(source, cache_dir)) not in entries(cache_dir)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hr_attrition.aggregates import AggregateCache
+from hr_attrition.group_stats import DESCRIBE_INDEX, HistogramColumn, SortedColumn, describe_frame
+
+GROUPINGS = ['JobLevel', 'Department', 'JobRole', 'JobSatisfaction', 'Attrition', 'AgeGroup']
+
+
+@pytest.fixture(scope='module')
+def sparse():
+    """Floats with NaNs, grouped by a categorical with an empty category and missing labels."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 20, 500)
+    values[rng.random(500) < 0.1] = np.nan
+    groups = pd.Categorical(rng.choice(['a', 'b', 'c', None], 500), categories=['a', 'b', 'c', 'empty'])
+    return pd.DataFrame({'value': values, 'group': groups})
+
+
+@pytest.mark.parametrize('method', ['exact', 'approximate'])
+def test_describe_matches_pandas(df, method):
+    # Every column of the extract is integral, so the approximate quartiles are exact too
+    pd.testing.assert_frame_equal(describe_frame(df, method), df.describe())
+    cache = AggregateCache(df, quantiles=method)
+    pd.testing.assert_series_equal(cache.describe('MonthlyIncome'), df['MonthlyIncome'].describe())
+
+
+@pytest.mark.parametrize('method', ['exact', 'approximate'])
+@pytest.mark.parametrize('by', GROUPINGS)
+def test_group_describe_matches_pandas(df, method, by):
+    expected = df.groupby(by, observed=False)['MonthlyIncome'].describe()
+    result = AggregateCache(df, quantiles=method).group_describe('MonthlyIncome', by)
+    pd.testing.assert_frame_equal(result, expected, check_names=False, check_index_type=False)
+
+
+def test_sorted_column_with_missing_values_and_groups(sparse):
+    column = SortedColumn(sparse['value'])
+    pd.testing.assert_series_equal(column.describe(), sparse['value'].describe())
+    expected = sparse.groupby('group', observed=False)['value'].describe()
+    result = column.describe_by(sparse['group'].cat.codes.to_numpy(), expected.index)
+    pd.testing.assert_frame_equal(result, expected, check_names=False, check_index_type=False)
+    assert result.loc['empty', 'count'] == 0 and result.loc['empty'].drop('count').isna().all()
+
+
+def test_histogram_column_within_half_a_grid_step(sparse):
+    column = HistogramColumn(sparse['value'], capacity=64)
+    expected = sparse.groupby('group', observed=False)['value'].describe()
+    result = column.describe_by(sparse['group'].cat.codes.to_numpy(), expected.index)
+    exact = ['count', 'mean', 'std']
+    pd.testing.assert_frame_equal(result[exact], expected[exact], check_names=False, check_index_type=False)
+    approximate = [statistic for statistic in DESCRIBE_INDEX if statistic not in exact]
+    assert (result[approximate] - expected[approximate]).abs().max().max() <= column.resolution / 2 + 1e-9
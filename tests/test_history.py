@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from hr_attrition.history import append_snapshot, partition_path, read_manifest, snapshot_metrics, trends
+
+MONTHS = ['2024-04', '2024-05', '2024-06']
+
+
+@pytest.fixture
+def store(df, tmp_path):
+    """Three monthly snapshots of the extract, each a little smaller than the next."""
+    history_dir = str(tmp_path / 'history')
+    for number, month in enumerate(MONTHS):
+        append_snapshot(df.iloc[:len(df) - 100 * (len(MONTHS) - 1 - number)], month, history_dir, source=f"{month}.csv")
+    return history_dir
+
+
+def test_append_records_every_month(df, store):
+    manifest = read_manifest(store)
+    assert list(manifest) == MONTHS
+    assert manifest['2024-06'] == {'rows': len(df), 'source': '2024-06.csv'}
+    with pytest.raises(ValueError, match='already holds a snapshot for 2024-05'):
+        append_snapshot(df, '2024-05', store)
+    with pytest.raises(ValueError, match='YYYY-MM'):
+        append_snapshot(df, '2024-13', store)
+
+
+def test_replace_overwrites_the_partition(df, store):
+    append_snapshot(df.iloc[:10], '2024-05', store, replace=True)
+    assert read_manifest(store)['2024-05']['rows'] == 10
+    assert trends(store, metrics=['employees'])['values'].loc[('employees', 'All', 'All'), '2024-05'] == 10
+
+
+def test_trends_match_each_snapshot(df, store):
+    result = trends(store)
+    assert result['months'] == MONTHS
+    latest = snapshot_metrics(df)
+    pd.testing.assert_series_equal(result['values']['2024-06'].dropna(), latest.dropna(), check_names=False)
+    expected = result['values'].diff(axis=1).iloc[:, 1:]
+    pd.testing.assert_frame_equal(result['changes'], expected)
+    assert result['changes'].loc[('employees', 'All', 'All')].tolist() == [100, 100]
+
+
+def test_months_are_pruned_before_any_file_is_opened(store):
+    # A broken partition outside the range must never be read
+    with open(partition_path(store, '2024-04'), 'wb') as partition:
+        partition.write(b'not feather')
+    result = trends(store, start='2024-05', end='2024-06', metrics=['employees'])
+    assert result['months'] == ['2024-05', '2024-06']
+    assert trends(store, start='2025-01')['months'] == []
+
+
+def test_dimension_missing_from_an_older_month_is_a_value_error(df, store):
+    append_snapshot(df.drop(columns='OverTime').iloc[:50], '2024-04', store, replace=True)
+    with pytest.raises(ValueError, match='2024-04 snapshot has no column OverTime'):
+        trends(store, metrics=['attrition_rate'], dimensions=['OverTime'])
+    assert trends(store, start='2024-05', metrics=['attrition_rate'], dimensions=['OverTime'])['months'] == MONTHS[1:]
+    with pytest.raises(ValueError, match='no column Shoe'):
+        trends(store, metrics=['attrition_rate'], dimensions=['Shoe'])
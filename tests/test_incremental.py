@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from hr_attrition import report
+from hr_attrition.aggregates import AggregateCache
+from hr_attrition.charts import TENURE_GROUP_COLUMNS, tenure_groups
+from hr_attrition.cleaning import ID_COLUMN
+from hr_attrition.incremental import OPERATION_COLUMN, IncrementalState
+
+SECTIONS = ['cleaning', 'attrition', 'demographics', 'compensation', 'satisfaction', 'performance']
+
+
+@pytest.fixture(scope='module')
+def raw(data_path):
+    return pd.read_csv(data_path, encoding='utf-8-sig')
+
+
+def delta(rows, operation):
+    return rows.assign(**{OPERATION_COLUMN: operation})
+
+
+def mixed_delta(raw):
+    updated = raw.iloc[10:40].assign(OverTime='Yes', MonthlyIncome=lambda rows: rows['MonthlyIncome'] + 500)
+    inserted = raw.iloc[100:120].assign(**{ID_COLUMN: lambda rows: rows[ID_COLUMN] + 100_000})
+    deleted = raw.iloc[200:215][[ID_COLUMN]]
+    return pd.concat([delta(updated, 'update'), delta(inserted, 'Insert'), delta(deleted, 'delete')], ignore_index=True)
+
+
+def assert_matches_rebuild(state):
+    df = state.snapshot.reset_index(drop=True)
+    rebuilt = report.run_report(df, AggregateCache(df, dimensions=report.attrition_dimensions), sections=SECTIONS, resamples=0)
+    maintained = report.run_report(None, state.aggregates, sections=SECTIONS, resamples=0)
+    assert report.format_report(maintained) == report.format_report(rebuilt)
+    tenure = AggregateCache(tenure_groups(df), dimensions=TENURE_GROUP_COLUMNS)
+    for column in TENURE_GROUP_COLUMNS:
+        pd.testing.assert_frame_equal(state.tenure_aggregates.rate_table(column), tenure.rate_table(column),
+                                      check_dtype=False, check_categorical=False)
+
+
+def test_deltas_match_a_rebuild(raw, data_path):
+    state = IncrementalState.build(data_path)
+    assert state.apply_delta(mixed_delta(raw)) == {'insert': 20, 'update': 30, 'delete': 15}
+    assert len(state.snapshot) == len(raw) + 20 - 15
+    assert_matches_rebuild(state)
+
+    # A delta of deletes only carries no employee records to clean
+    deletes = delta(raw.iloc[300:303][[ID_COLUMN]], 'delete')
+    assert state.apply_delta(deletes) == {'insert': 0, 'update': 0, 'delete': 3}
+    assert not state.snapshot.index.isin(deletes[ID_COLUMN]).any()
+    assert_matches_rebuild(state)
+
+
+def test_saved_changes_replay_on_load(raw, data_path, tmp_path, monkeypatch):
+    state = IncrementalState.build(data_path)
+    state.save(tmp_path)
+    state.apply_delta(mixed_delta(raw))
+    state.save(tmp_path)
+    state.apply_delta(delta(raw.iloc[300:303][[ID_COLUMN]], 'delete'))
+    state.save(tmp_path)
+    assert len(state.change_files) == 2
+    loaded = IncrementalState.load(tmp_path)
+    pd.testing.assert_frame_equal(loaded.snapshot, state.snapshot)
+    assert_matches_rebuild(loaded)
+
+    # Past COMPACT_FRACTION, the changes are folded into a new base snapshot and the old files removed
+    monkeypatch.setattr('hr_attrition.incremental.COMPACT_FRACTION', 0.0)
+    loaded.save(tmp_path)
+    assert loaded.change_files == [] and sorted(path.name for path in tmp_path.iterdir()) == ['snapshot-00001.pkl', 'state.pkl']
+    pd.testing.assert_frame_equal(IncrementalState.load(tmp_path).snapshot, state.snapshot)
+
+
+def test_invalid_deltas_are_rejected(raw, data_path):
+    state = IncrementalState.build(data_path)
+    with pytest.raises(ValueError, match='Cannot insert existing'):
+        state.apply_delta(delta(raw.iloc[:1], 'insert'))
+    with pytest.raises(ValueError, match='Unknown delta operations'):
+        state.apply_delta(delta(raw.iloc[:1], 'upsert'))
@@ -0,0 +1,17 @@
+from hr_attrition import report
+from hr_attrition.aggregates import AggregateCache
+from hr_attrition.instrumentation import Instrumentation
+
+SECTIONS = ['attrition', 'compensation', 'performance']
+
+
+def test_instrumented_report_matches_plain(df):
+    agg = AggregateCache(df, dimensions=report.attrition_dimensions)
+    instrumentation = Instrumentation()
+    instrumented = report.run_report(df, agg, sections=SECTIONS, resamples=200, instrumentation=instrumentation)
+    plain = report.run_report(df, agg, sections=SECTIONS, resamples=200)
+    assert report.format_report(instrumented) == report.format_report(plain)
+    table = instrumentation.table()
+    assert list(table.index) == [f'section:{key}' for key in SECTIONS]
+    assert (table['rows'] == len(df)).all()
+    assert (table['wall_seconds'] >= 0).all()
@@ -0,0 +1,26 @@
+import re
+
+from hr_attrition import report
+from hr_attrition.aggregates import AggregateCache
+from hr_attrition.streaming import stream_aggregates
+
+AGGREGATE_SECTIONS = ['cleaning', 'attrition', 'demographics', 'compensation', 'satisfaction', 'performance']
+
+
+def report_text(df, agg, **options):
+    return report.format_report(report.run_report(df, agg, sections=AGGREGATE_SECTIONS, resamples=200, **options))
+
+
+def test_streamed_report_matches_in_memory(df, data_path):
+    in_memory = report_text(df, AggregateCache(df, dimensions=report.attrition_dimensions))
+    for chunksize in (97, 500):
+        streamed = stream_aggregates(data_path, chunksize, dimensions=report.attrition_dimensions)
+        assert report_text(None, streamed) == in_memory
+
+
+def test_slice_report_leaves_out_missing_groups(df):
+    managers = df[df['JobRole'] == 'Manager']
+    text = report_text(managers, AggregateCache(managers, dimensions=report.attrition_dimensions))
+    prose = [line for line in text.splitlines() if not line.startswith('|')]
+    assert not [line for line in prose if re.search(r'\bnan\b', line)]
+    assert 'Sales Representatives face' not in text
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hr_attrition import cleaning
+from hr_attrition.cleaning import ID_COLUMN, read_clean
+from hr_attrition.modeling import features
+from hr_attrition.scoring import SCORE_COLUMN, load_model, score_file, train_model
+
+
+@pytest.fixture
+def model_path(tmp_path, monkeypatch):
+    # The cleaned-frame cache goes to the working directory, so keep it out of the repository
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path / 'model.pkl')
+
+
+@pytest.mark.parametrize('chunksize', [100, 10_000])
+def test_batch_scores_match_the_pipeline(data_path, model_path, tmp_path, chunksize):
+    pipeline = train_model(data_path, 'Logistic Regression', model_path)
+    summary = score_file(data_path, tmp_path / 'scores.csv', model_path, chunksize=chunksize)
+    scores = pd.read_csv(tmp_path / 'scores.csv')
+
+    df = read_clean(data_path, index_col=ID_COLUMN)
+    assert summary['rows'] == len(df) == len(scores)
+    assert scores[ID_COLUMN].tolist() == df.index.tolist()
+    expected = pipeline.predict_proba(features(df))[:, 1]
+    np.testing.assert_allclose(scores[SCORE_COLUMN], expected, atol=5e-7)
+
+
+def test_model_from_other_cleaning_rules_is_refused(data_path, model_path, monkeypatch):
+    train_model(data_path, 'Logistic Regression', model_path)
+    load_model(model_path)
+    monkeypatch.setattr(cleaning, 'CLEANING_VERSION', cleaning.CLEANING_VERSION + 1)
+    with pytest.raises(ValueError, match='trained under different cleaning rules'):
+        load_model(model_path)
@@ -0,0 +1,99 @@
+import json
+import pickle
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hr_attrition.cleaning import ORDINAL_MAPS
+from hr_attrition.frame_cache import cleaning_fingerprint
+from hr_attrition.modeling import candidate_models, feature_frame, features, make_pipeline
+from hr_attrition.serving import LatencyHistogram, LinearScorer, PipelineScorer, make_server
+
+ROWS = 200
+
+
+@pytest.fixture(scope='module')
+def pipeline(df):
+    X, y = feature_frame(df)
+    return make_pipeline(X, candidate_models()['Logistic Regression']).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def records(data_path):
+    raw = pd.read_csv(data_path, encoding='utf-8-sig', nrows=ROWS)
+    records = raw.to_dict('records')
+    # Every other record gives its ordinal fields as labels rather than codes
+    for record in records[::2]:
+        for column, mapping in ORDINAL_MAPS.items():
+            record[column] = mapping[record[column]]
+    return records
+
+
+def test_scorers_match_the_pipeline(df, pipeline, records):
+    expected = pipeline.predict_proba(features(df.iloc[:ROWS]))[:, 1]
+    np.testing.assert_allclose(LinearScorer(pipeline).predict(records), expected, rtol=1e-9)
+    np.testing.assert_allclose(PipelineScorer(pipeline).predict(records), expected, rtol=1e-9)
+
+
+def test_scorers_reject_the_same_missing_field(pipeline, records):
+    incomplete = [records[0], {key: value for key, value in records[1].items() if key != 'JobRole'}]
+    errors = []
+    for scorer in (LinearScorer(pipeline), PipelineScorer(pipeline)):
+        with pytest.raises(KeyError) as error:
+            scorer.predict(incomplete)
+        errors.append(str(error.value))
+    assert errors == ["'JobRole'", "'JobRole'"]
+
+
+def test_histogram_keeps_every_status():
+    histogram = LatencyHistogram()
+    for seconds, status in [(0.001, 200), (0.002, 200), (0.5, 400), (3.0, 500)]:
+        histogram.record(seconds, status)
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 4 and snapshot['max_ms'] == 3000.0
+    assert {status: values['count'] for status, values in snapshot['by_status'].items()} == {'200': 2, '400': 1, '500': 1}
+    assert snapshot['p99_ms'] == 3000.0  # The overflow bucket reports the max
+
+
+def test_server_answers_and_times_every_request(pipeline, records, tmp_path):
+    model_path = tmp_path / 'model.pkl'
+    with open(model_path, 'wb') as model_file:
+        pickle.dump({'name': 'Logistic Regression', 'pipeline': pipeline, 'cleaning': cleaning_fingerprint()}, model_file)
+    server = make_server(model_path, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def post(payload):
+        request = urllib.request.Request(f"{url}/predict", data=json.dumps(payload).encode())
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    try:
+        status, body = post(records[1])
+        assert status == 200 and body['risk'] == pytest.approx(LinearScorer(pipeline).predict(records[1:2])[0], abs=1e-6)
+        status, body = post(records[:3])
+        assert status == 200 and len(body['risks']) == 3
+        incomplete = {key: value for key, value in records[1].items() if key != 'Age'}
+        assert post(incomplete) == (400, {'error': "missing field 'Age'"})
+        assert post([]) == (200, {'risks': []})
+
+        def fail(records):
+            raise RuntimeError('scorer broke')
+
+        server.scorer.predict = fail
+        assert post(records[1]) == (500, {'error': 'internal error: RuntimeError: scorer broke'})
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            latency = json.loads(response.read())['latency']
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert latency['count'] == 5
+    assert {status: values['count'] for status, values in latency['by_status'].items()} == {'200': 3, '400': 1, '500': 1}
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+from hr_attrition.survival import cox, design_matrix, kaplan_meier
+
+
+def brute_force_curve(durations, events):
+    """Kaplan-Meier survival at every distinct duration, one risk set at a time."""
+    survival, curve = 1.0, {}
+    for time in np.unique(durations):
+        at_risk = (durations >= time).sum()
+        survival *= 1 - (events & (durations == time)).sum() / at_risk
+        curve[time] = survival
+    return pd.Series(curve)
+
+
+def brute_force_log_likelihood(beta, X, durations, events, ties):
+    """Cox partial log-likelihood with Breslow or Efron ties, one event time at a time."""
+    xb = X @ beta
+    total = 0.0
+    for time in np.unique(durations[events]):
+        tied = events & (durations == time)
+        risk = np.exp(xb[durations >= time]).sum()
+        tied_risk = np.exp(xb[tied]).sum()
+        total += xb[tied].sum()
+        for l in range(tied.sum()):
+            total -= np.log(risk - (l / tied.sum() if ties == 'efron' else 0) * tied_risk)
+    return total
+
+
+@pytest.mark.parametrize('strata', [[], ['OverTime'], ['Department', 'MaritalStatus']])
+def test_kaplan_meier_matches_brute_force(df, strata):
+    curves = kaplan_meier(df, strata=strata)['curves']
+    groups = df.groupby(strata, observed=True) if strata else [('All', df)]
+    for label, group in groups:
+        expected = brute_force_curve(group['YearsAtCompany'].to_numpy(), (group['Attrition'] == 'Yes').to_numpy())
+        label = label if isinstance(label, tuple) else (label,)
+        actual = curves['survival'].xs(label, level=list(range(len(label)))) if strata else curves['survival'].xs('All')
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('ties', ['efron', 'breslow'])
+def test_cox_maximizes_brute_force_likelihood(df, ties):
+    covariates = ['OverTime', 'MonthlyIncome', 'JobSatisfaction']
+    fit = cox(df, covariates, ties=ties)
+    design = design_matrix(df, covariates).to_numpy()
+    X = (design - design.mean(axis=0)) / design.std(axis=0)  # Standardized, so that BFGS converges tightly
+    durations, events = df['YearsAtCompany'].to_numpy(), (df['Attrition'] == 'Yes').to_numpy()
+
+    beta = fit['coefficients']['coef'].to_numpy() * design.std(axis=0)
+    assert fit['log_likelihood'] == pytest.approx(brute_force_log_likelihood(beta, X, durations, events, ties), abs=1e-8)
+    optimum = minimize(lambda b: -brute_force_log_likelihood(b, X, durations, events, ties), np.zeros(X.shape[1]),
+                       method='BFGS', options={'gtol': 1e-8})
+    np.testing.assert_allclose(beta, optimum.x, atol=1e-4)
+    assert fit['log_likelihood'] == pytest.approx(-optimum.fun, abs=1e-8)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency
+
+from hr_attrition import report
+from hr_attrition.aggregates import AggregateCache
+from hr_attrition.uncertainty import attrition_uncertainty
+
+COLUMNS = ['JobRole', 'OverTime', 'MaritalStatus']
+
+
+@pytest.fixture(scope='module')
+def agg(df):
+    return AggregateCache(df, dimensions=report.attrition_dimensions)
+
+
+def test_chi_square_and_rates_match_the_crosstab(df, agg):
+    result = attrition_uncertainty(agg, COLUMNS, n_resamples=2_000)
+    for column in COLUMNS:
+        table = pd.crosstab(df[column], df['Attrition'])
+        assert result['tests'].loc[column, 'chi_square'] == pytest.approx(chi2_contingency(table, correction=False)[0], rel=1e-9)
+        intervals = result['intervals'].loc[column]
+        np.testing.assert_allclose(intervals['rate'].to_numpy(), (table['Yes'] / table.sum(axis=1) * 100).to_numpy())
+        np.testing.assert_array_equal(intervals['employees'].to_numpy(), table.sum(axis=1).to_numpy())
+        assert (intervals['ci_low'] <= intervals['rate']).all() and (intervals['rate'] <= intervals['ci_high']).all()
+    assert result['tests']['p_value'].between(0, 1).all()
+
+
+def test_results_do_not_depend_on_the_workers(agg):
+    # Three batches of BATCH_RESAMPLES or less, each with its own seed
+    serial = attrition_uncertainty(agg, COLUMNS, n_resamples=25_000, max_workers=1)
+    parallel = attrition_uncertainty(agg, COLUMNS, n_resamples=25_000, max_workers=2)
+    pd.testing.assert_frame_equal(serial['intervals'], parallel['intervals'])
+    pd.testing.assert_frame_equal(serial['tests'], parallel['tests'])
+
+
+def test_no_resamples_leaves_the_tables_out(df, agg):
+    results = report.run_report(df, agg, sections=['attrition', 'satisfaction'], resamples=0)
+    assert results['attrition']['uncertainty'] is None and results['satisfaction']['uncertainty'] is None
+    text = report.format_report(results)
+    assert 'Statistical Confidence' not in text and 'permutation p' not in text